@@ -0,0 +1,58 @@
+/* Migration 001: Lookup indexes
+Apply with `psql -d <database> -f Database/Migrations/001-Lookup-Indexes.sql`.
+Each migration runs in one transaction and records its version in
+schema_migrations, so applying a migration twice fails without changes.
+
+The schema only had primary keys and a few UNIQUE constraints, so every
+lookup by owner, by area or by office was a sequential scan. These indexes
+cover the filters in PlayerObject, ItemObject, AcolyteObject, Checks,
+AssociationObject, Finances and the Reminders scheduler.
+(players.user_id is already covered by "Players_user_id_key".)
+*/
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version integer PRIMARY KEY,
+    name text NOT NULL,
+    applied_at timestamp without time zone DEFAULT now() NOT NULL
+);
+
+INSERT INTO schema_migrations (version, name) VALUES (1, 'Lookup indexes');
+
+/*
+Inventories: every inventory page, equip check and gear lookup filters on
+the owner.
+*/
+CREATE INDEX items_user_id_idx ON items (user_id);
+CREATE INDEX armor_user_id_idx ON armor (user_id);
+CREATE INDEX accessories_user_id_idx ON accessories (user_id);
+
+/*
+A player owns at most one row per acolyte; extra copies increment `copies`.
+The unique index serves the (user_id, acolyte_name) lookup in
+AcolyteObject and its leading column serves lookups by user_id alone. If
+this fails, merge the duplicate rows first.
+*/
+CREATE UNIQUE INDEX acolytes_user_id_acolyte_name_key
+    ON acolytes (user_id, acolyte_name);
+
+-- Association member lists, ranks and the leaderboard's membership counts
+CREATE INDEX players_assc_idx ON players (assc);
+
+/*
+"Latest row per key" lookups: the current mayor/comptroller, the owner of
+an area and an area's last battle all use WHERE key = $1 ORDER BY id DESC
+LIMIT 1, which becomes a single index probe.
+*/
+CREATE INDEX officeholders_office_id_idx ON officeholders (office, id DESC);
+CREATE INDEX area_control_area_id_idx ON area_control (area, id DESC);
+CREATE INDEX area_attacks_area_id_idx ON area_attacks (area, id DESC);
+
+-- Taxes collected since the current mayor took office
+CREATE INDEX tax_transactions_time_idx ON tax_transactions ("time");
+
+-- The scheduler's window refill, and /remind list
+CREATE INDEX reminders_endtime_idx ON reminders (endtime);
+CREATE INDEX reminders_user_id_endtime_idx ON reminders (user_id, endtime);
+
+COMMIT;
@@ -0,0 +1,45 @@
+/* Migration 002: Dictionary version
+Apply to the DICTIONARY database with
+`psql -d <dictionary> -f Database/Migrations/002-Dictionary-Version.sql`.
+
+The word index artifact (Utilities/WordIndex.py) is tagged with the version
+of the dictionary it was built from. Fingerprinting word_list on every boot
+means reading the whole table, so keep the version in a one-row table
+instead, replaced by a trigger whenever word_list changes. The version is
+random rather than a counter so that two dictionaries restored from
+different dumps never share one.
+*/
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version integer PRIMARY KEY,
+    name text NOT NULL,
+    applied_at timestamp without time zone DEFAULT now() NOT NULL
+);
+
+INSERT INTO schema_migrations (version, name)
+    VALUES (2, 'Dictionary version');
+
+CREATE TABLE dictionary_version (
+    only_row boolean PRIMARY KEY DEFAULT true CHECK (only_row),
+    version text NOT NULL
+);
+
+INSERT INTO dictionary_version (version)
+    VALUES (md5(random()::text || clock_timestamp()::text));
+
+CREATE FUNCTION bump_dictionary_version() RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    UPDATE dictionary_version
+    SET version = md5(random()::text || clock_timestamp()::text);
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER word_list_bump_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON word_list
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_dictionary_version();
+
+COMMIT;
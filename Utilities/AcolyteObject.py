@@ -4,9 +4,44 @@ import asyncpg
 
 from copy import deepcopy
 from itertools import chain
+from typing import Dict, List
 
 from Utilities import Checks
 
+
+# Static `acolyte_list` data keyed by acolyte name. The table only changes
+# when new acolytes are added to the game, so it is read once on startup.
+_catalog : Dict[str, asyncpg.Record] = {}
+
+async def load_catalog(conn : asyncpg.Connection):
+    """(Re)load the acolyte catalog from the `acolyte_list` table. Run this
+    on startup and again after any change is made to the table.
+    """
+    psql = """
+            SELECT name, attack, crit, hp, effect, story, image, effect_num
+            FROM acolyte_list
+            ORDER BY uid;
+            """
+    records = await conn.fetch(psql)
+    _catalog.clear()
+    _catalog.update({record['name'] : record for record in records})
+
+async def ensure_catalog(conn : asyncpg.Connection):
+    """Load the acolyte catalog if it has not been loaded yet."""
+    if not _catalog:
+        await load_catalog(conn)
+
+def get_catalog_names() -> List[str]:
+    """Returns the names of every acolyte in the game."""
+    return list(_catalog)
+
+def _get_catalog_entry(name : str) -> asyncpg.Record:
+    try:
+        return _catalog[name]
+    except KeyError:
+        raise Checks.AcolyteDoesNotExist(name)
+
+
 class EmptyAcolyte: # TODO: change to 'Acolyte'
     """Empty acolyte for placeholding purposes. It is convenient for the bot
     to assume that a player or some other agent always has an acolyte equipped,
@@ -64,7 +99,30 @@ class InfoAcolyte(EmptyAcolyte):
         self.effect = info['effect'].replace("{x}", "[{}/{}/{}]")
         self.story = info['story']
         self.image = info['image']
-        self._effect_num = info['effect_num']
+        # Copy since _generate_effect edits this and info may be shared
+        self._effect_num = [list(nums) for nums in info['effect_num']]
+
+    @classmethod
+    def from_catalog(cls, name : str) -> "InfoAcolyte":
+        """Load an acolyte by its name from the in-memory acolyte catalog.
+
+        Parameters
+        ----------
+        name : str
+            the name of the acolyte being created
+
+        Returns
+        -------
+        InfoAcolyte
+
+        Raises
+        ------
+        Checks.AcolyteDoesNotExist
+            If there is no acolyte with the given name
+        """
+        acolyte = cls(name, _get_catalog_entry(name))
+        acolyte._generate_effect()
+        return acolyte
 
     @classmethod
     async def from_name(cls, conn : asyncpg.Connection, name : str) -> "InfoAcolyte":
@@ -73,33 +131,17 @@ class InfoAcolyte(EmptyAcolyte):
         Parameters
         ----------
         conn : asyncpg.Connection
-            a connection to the database
+            a connection to the database, used only if the acolyte catalog
+            has not been loaded yet
         name : str
             the name of the acolyte being created
 
         Returns
         -------
         InfoAcolyte
-        """        
-        psql = """
-                SELECT attack, crit, hp, effect, story, image, effect_num
-                FROM acolyte_list
-                WHERE name = $1;
-                """
-        info = await conn.fetchrow(psql, name)
-
-        if info is None:
-            raise Checks.AcolyteDoesNotExist(name)
-
-        cls = cls(name, info)
-        
-        # Effects have to be generated top-down, but as far as I can tell,
-        # I am forced to create these objects in the opposite direction
-        # This prevents the effect from being generated before the copies
-        # attribute is correctly populated in the case of OwnedAcolyte creation.
-        if not isinstance(cls, OwnedAcolyte):
-            cls._generate_effect()
-        return cls
+        """
+        await ensure_catalog(conn)
+        return cls.from_catalog(name)
     
     def _generate_effect(self):
         """Rewrites the effect string into the readable version."""
@@ -121,7 +163,7 @@ class OwnedAcolyte(InfoAcolyte):
             the ID of the acolyte being loaded
         """
         psql = """
-                SELECT user_id, acolyte_name, copies
+                SELECT acolyte_id, user_id, acolyte_name, copies
                 FROM acolytes
                 WHERE acolyte_id = $1;
                 """  
@@ -129,13 +171,32 @@ class OwnedAcolyte(InfoAcolyte):
         if info is None:
             raise Checks.EmptyObject
 
-        cls = await super().from_name(conn, info['acolyte_name'])
-        cls.id = id
-        cls.owner_id = info['user_id']
-        cls.copies = info['copies']
-        cls._generate_effect()
-        return cls
-    
+        await ensure_catalog(conn)
+        return cls.from_record(info)
+
+    @classmethod
+    def from_record(cls, record : asyncpg.Record) -> "OwnedAcolyte":
+        """Build an acolyte from a row of the `acolytes` table. Base stats
+        come from the acolyte catalog, so no queries are made.
+
+        Parameters
+        ----------
+        record : asyncpg.Record
+            a mapping with the keys acolyte_id, user_id, acolyte_name, copies
+
+        Raises
+        ------
+        Checks.AcolyteDoesNotExist
+            If the acolyte's name is not in the acolyte catalog
+        """
+        name = record['acolyte_name']
+        acolyte = cls(name, _get_catalog_entry(name))
+        acolyte.id = record['acolyte_id']
+        acolyte.owner_id = record['user_id']
+        acolyte.copies = record['copies']
+        acolyte._generate_effect()
+        return acolyte
+
     @classmethod
     async def from_name(cls, conn : asyncpg.Connection, id : int, name : str) -> "OwnedAcolyte":
         """Load an acolyte by a player's ID and the acolyte's name
@@ -155,7 +216,7 @@ class OwnedAcolyte(InfoAcolyte):
             If the player passed does not have any copies of the acolyte
         """
         psql = """
-                SELECT acolyte_id, copies
+                SELECT acolyte_id, user_id, acolyte_name, copies
                 FROM acolytes
                 WHERE user_id = $1 AND acolyte_name = $2;
                 """
@@ -163,12 +224,8 @@ class OwnedAcolyte(InfoAcolyte):
         if info is None:
             raise Checks.AcolyteNotOwned
         
-        cls = await super().from_name(conn, name)
-        cls.id = info['acolyte_id']
-        cls.owner_id = id
-        cls.copies = info['copies']
-        cls._generate_effect()
-        return cls
+        await ensure_catalog(conn)
+        return cls.from_record(info)
 
     @classmethod
     async def create_acolyte(cls, conn : asyncpg.Connection, owner_id : int, 
@@ -195,12 +252,15 @@ class OwnedAcolyte(InfoAcolyte):
             if current.copies >= 3:
                 raise Checks.DuplicateAcolyte(current.id)
             else:
+                # Recheck the copies in case another command added one
                 psql = """
                         UPDATE acolytes
                         SET copies = copies + 1
-                        WHERE acolyte_id = $1;
+                        WHERE acolyte_id = $1 AND copies < 3
+                        RETURNING copies;
                         """
-                await conn.execute(psql, current.id)
+                if await conn.fetchval(psql, current.id) is None:
+                    raise Checks.DuplicateAcolyte(current.id)
                 current.copies += 1
                 # Run from_name again to regenerate the effect str to reflect
                 # the new copy count
@@ -1,95 +1,219 @@
+import asyncio
 import asyncpg
-from typing import List
+import bisect
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger("discord.ayesha.ranks")
+
+# Player stats with a leaderboard. Each gets a sorted rank index.
+RANKED_STATS = ("xp", "gold", "gravitas", "bosswins", "pve_limit", "pvpwins")
+# Changes made through Player are applied to the indexes as they happen. The
+# periodic rebuild picks up those made by other SQL and other processes.
+RANK_REFRESH_INTERVAL = 600 # Seconds between rebuilds of the rank indexes
+RANK_QUERY_TIMEOUT = 60 # Seconds
+
+
+class RankIndex:
+    """A sorted index of every player's value in a single stat. Entries are 
+    kept as (-value, user_id) so that the list is in leaderboard order and 
+    ties are broken consistently. Rank lookups are a binary search.
+
+    The records, of user_id and value, must already be in that order: 
+    value descending, then user_id.
+    """
+    def __init__(self, stat : str, records : List[asyncpg.Record]):
+        self.stat = stat
+        self._entries = [(-value, user_id) for user_id, value in records]
+        self._values = {user_id : value for user_id, value in records}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_rank(self, user_id : int) -> Optional[int]:
+        """Returns the 1-indexed rank of the player, or None if they are not
+        in the index.
+        """
+        try:
+            key = (-self._values[user_id], user_id)
+        except KeyError:
+            return None
+        return bisect.bisect_left(self._entries, key) + 1
+
+    def get_top(self, n : int) -> List[Tuple[int, int]]:
+        """Returns a list of (user_id, value) for the top n players."""
+        return [(user_id, -value) for value, user_id in self._entries[:n]]
+
+    def update(self, user_id : int, value : int):
+        """Move a player to their new position after their stat changes."""
+        old = self._values.get(user_id)
+        if old is not None:
+            i = bisect.bisect_left(self._entries, (-old, user_id))
+            del self._entries[i]
+        self._values[user_id] = value
+        bisect.insort(self._entries, (-value, user_id))
+
+
+def _build_indexes(ordered : Dict[str, List[asyncpg.Record]], 
+        names : List[asyncpg.Record]) -> tuple:
+    indexes = {stat : RankIndex(stat, ordered[stat]) for stat in RANKED_STATS}
+    return indexes, dict(names)
+
+
+class RankService:
+    """Holds a RankIndex for each stat in RANKED_STATS, built from a single
+    snapshot of the players table. Player applies its changes to the indexes
+    with `update()` as they are made. Once `start()` is called, a background
+    task rebuilds the indexes every RANK_REFRESH_INTERVAL seconds to pick up
+    any other changes. The database sorts each stat and the indexes are 
+    assembled in a thread, so that commands are not held up; changes made 
+    while a rebuild runs are applied on top of it.
+    """
+    def __init__(self):
+        self._indexes : Dict[str, RankIndex] = {}
+        self._names : Dict[int, str] = {}
+        self._loaded_at = None
+        self._lock = asyncio.Lock()
+        self._task : Optional[asyncio.Task] = None
+        # Changes made during a rebuild, to be applied once it is done
+        self._changes : Optional[List[tuple]] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    async def refresh(self, conn : asyncpg.Connection):
+        """Rebuild every rank index from the players table."""
+        async with self._lock:
+            await self._rebuild(conn)
+
+    async def ensure_loaded(self, conn : asyncpg.Connection):
+        """Build the indexes if they have never been built, as when the
+        startup load failed. Concurrent callers wait on the same build.
+        """
+        if self.is_loaded:
+            return
+        async with self._lock:
+            if not self.is_loaded:
+                await self._rebuild(conn)
+
+    async def _rebuild(self, conn : asyncpg.Connection):
+        self._changes = []
+        try:
+            # Read every stat from the same snapshot of the table
+            async with conn.transaction(
+                    isolation="repeatable_read", readonly=True):
+                ordered = {}
+                for stat in RANKED_STATS:
+                    psql = f"""
+                            SELECT user_id, COALESCE({stat}, 0) AS value
+                            FROM players
+                            ORDER BY value DESC, user_id;
+                            """
+                    ordered[stat] = await conn.fetch(
+                        psql, timeout=RANK_QUERY_TIMEOUT)
+                psql = """
+                        SELECT user_id, user_name
+                        FROM players;
+                        """
+                names = await conn.fetch(psql, timeout=RANK_QUERY_TIMEOUT)
+            self._indexes, self._names = await asyncio.to_thread(
+                _build_indexes, ordered, names)
+            for change in self._changes:
+                self._apply(*change)
+            self._loaded_at = time.monotonic()
+        finally:
+            self._changes = None
+
+    def start(self, pool : asyncpg.Pool):
+        """Start rebuilding the indexes in the background if not already."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(pool))
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _run(self, pool : asyncpg.Pool):
+        while True:
+            await asyncio.sleep(RANK_REFRESH_INTERVAL)
+            try:
+                async with pool.acquire() as conn:
+                    await self.refresh(conn)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Could not rebuild the rank indexes.")
+
+    def get_rank(self, stat : str, user_id : int) -> Optional[int]:
+        return self._indexes[stat].get_rank(user_id)
+
+    def get_top(self, stat : str, n : int = 10) -> List[Tuple[str, int]]:
+        """Returns a list of (user_name, value) for the top n players."""
+        return [(self._names.get(user_id), value) 
+            for user_id, value in self._indexes[stat].get_top(n)]
+
+    def update(self, user_id : int, stat : str, value : int, 
+            name : Optional[str] = None):
+        """Record a change to a player's stat without waiting for a refresh.
+        Does nothing if the indexes have not been built yet.
+        """
+        if self._changes is not None:
+            self._changes.append((user_id, stat, value, name))
+        self._apply(user_id, stat, value, name)
+
+    def _apply(self, user_id : int, stat : str, value : int, 
+            name : Optional[str]):
+        if stat in self._indexes:
+            self._indexes[stat].update(user_id, value)
+            if name is not None:
+                self._names[user_id] = name
+
+    def sync_player(self, player):
+        """Update every index with the stats of a freshly loaded Player so
+        that their own rank agrees with the values they are shown.
+        """
+        name = player.char_name
+        self.update(player.disc_id, "xp", player.xp, name)
+        self.update(player.disc_id, "gold", player.gold, name)
+        self.update(player.disc_id, "gravitas", player.gravitas, name)
+        self.update(player.disc_id, "bosswins", player.boss_wins, name)
+        self.update(player.disc_id, "pve_limit", player.pve_limit, name)
+        self.update(player.disc_id, "pvpwins", player.pvp_wins, name)
+
+
+rank_service = RankService()
 
 async def get_xp_rank(conn : asyncpg.Connection, user_id : int) -> int:
     """Returns the rank in xp for the player given"""
-    psql = """
-            WITH ranks AS (
-                SELECT ROW_NUMBER() OVER (ORDER BY xp DESC) AS rank, 
-                    user_id, user_name, xp
-                FROM players
-            )
-            SELECT rank, user_id, user_name, xp
-            FROM ranks
-            WHERE user_id = $1
-            LIMIT 1;
-            """
-    return await conn.fetchval(psql, user_id, timeout=0.2)
+    await rank_service.ensure_loaded(conn)
+    return rank_service.get_rank("xp", user_id)
 
 async def get_gold_rank(conn : asyncpg.Connection, user_id : int) -> int:
     """Returns the rank in gold for the player given"""
-    psql = """
-            WITH ranks AS (
-                SELECT ROW_NUMBER() OVER (ORDER BY gold DESC) AS rank, 
-                    user_id, user_name, gold
-                FROM players
-            )
-            SELECT rank, user_id, user_name, gold
-            FROM ranks
-            WHERE user_id = $1
-            LIMIT 1;
-            """
-    return await conn.fetchval(psql, user_id, timeout=0.2)
+    await rank_service.ensure_loaded(conn)
+    return rank_service.get_rank("gold", user_id)
 
 async def get_gravitas_rank(conn : asyncpg.Connection, user_id : int) -> int:
     """Returns the rank in gravitas for the player given"""
-    psql = """
-            WITH ranks AS (
-                SELECT ROW_NUMBER() OVER (ORDER BY gravitas DESC) AS rank, 
-                    user_id, user_name, gravitas
-                FROM players
-            )
-            SELECT rank, user_id, user_name, gravitas
-            FROM ranks
-            WHERE user_id = $1
-            LIMIT 1;
-            """
-    return await conn.fetchval(psql, user_id, timeout=0.2)
+    await rank_service.ensure_loaded(conn)
+    return rank_service.get_rank("gravitas", user_id)
 
 async def get_bosswins_rank(conn : asyncpg.Connection, user_id : int) -> int:
     """Returns the rank in bosswins for the player given"""
-    psql = """
-            WITH ranks AS (
-                SELECT ROW_NUMBER() OVER (ORDER BY bosswins DESC) AS rank, 
-                    user_id, user_name, bosswins
-                FROM players
-            )
-            SELECT rank, user_id, user_name, bosswins
-            FROM ranks
-            WHERE user_id = $1
-            LIMIT 1;
-            """
-    return await conn.fetchval(psql, user_id, timeout=0.2)
+    await rank_service.ensure_loaded(conn)
+    return rank_service.get_rank("bosswins", user_id)
 
 async def get_boss_level_rank(conn : asyncpg.Connection, user_id : int) -> int:
     """Returns the rank in order of players.pve_limit"""
-    psql = """
-            WITH ranks AS (
-                SELECT ROW_NUMBER() OVER (ORDER BY pve_limit DESC) AS rank, 
-                    user_id, user_name, pve_limit
-                FROM players
-            )
-            SELECT rank, user_id, user_name, pve_limit
-            FROM ranks   
-            WHERE user_id = $1
-            LIMIT 1;
-            """
-    return await conn.fetchval(psql, user_id, timeout=0.2)
+    await rank_service.ensure_loaded(conn)
+    return rank_service.get_rank("pve_limit", user_id)
 
 async def get_pvpwins_rank(conn : asyncpg.Connection, user_id : int) -> int:
     """Returns the rank in pvpwins for the player given"""
-    psql = """
-            WITH ranks AS (
-                SELECT ROW_NUMBER() OVER (ORDER BY pvpwins DESC) AS rank, 
-                    user_id, user_name, pvpwins
-                FROM players
-            )
-            SELECT rank, user_id, user_name, pvpwins
-            FROM ranks
-            WHERE user_id = $1
-            LIMIT 1;
-            """
-    return await conn.fetchval(psql, user_id, timeout=0.2)
+    await rank_service.ensure_loaded(conn)
+    return rank_service.get_rank("pvpwins", user_id)
 
 def stringify_rank(rank : int) -> str:
     """Converts the rank into a str. eg Rank 1 --> 1st"""
@@ -151,59 +275,126 @@ async def get_combat_info(conn : asyncpg.Connection):
     return await conn.fetchrow(psql)
 
 async def get_top_xp(conn : asyncpg.Connection):
-    """Returns a list of records containing the top 10 players by xp
-    Record: user_name, xp 
+    """Returns a list of tuples containing the top 10 players by xp
+    Tuple: user_name, xp
     """
-    psql = """
-            SELECT user_name, xp
-            FROM players
-            ORDER BY xp DESC LIMIT 10;
-            """
-    return await conn.fetch(psql)
+    await rank_service.ensure_loaded(conn)
+    return rank_service.get_top("xp")
 
 async def get_top_gold(conn : asyncpg.Connection):
-    """Returns a list of records containing the top 10 players by gold
-    Record: user_name, gold
+    """Returns a list of tuples containing the top 10 players by gold
+    Tuple: user_name, gold
     """
-    psql = """
-            SELECT user_name, gold
-            FROM players
-            ORDER BY gold DESC LIMIT 10;
-            """
-    return await conn.fetch(psql)
+    await rank_service.ensure_loaded(conn)
+    return rank_service.get_top("gold")
 
 async def get_top_pve(conn : asyncpg.Connection):
-    """Returns a list of records containing the top 10 players by PvE wins
-    Record: user_name, bosswins
+    """Returns a list of tuples containing the top 10 players by PvE wins
+    Tuple: user_name, bosswins
     """
-    psql = """
-            SELECT user_name, bosswins
-            FROM players
-            ORDER BY bosswins DESC LIMIT 10;
-            """
-    return await conn.fetch(psql)
+    await rank_service.ensure_loaded(conn)
+    return rank_service.get_top("bosswins")
 
 async def get_top_pvp(conn : asyncpg.Connection):
-    """Returns a list of records containing the top 10 players by PvP wins
-    Record: user_name, pvpwins
+    """Returns a list of tuples containing the top 10 players by PvP wins
+    Tuple: user_name, pvpwins
     """
-    psql = """
-            SELECT user_name, pvpwins
-            FROM players
-            ORDER BY pvpwins DESC LIMIT 10;
-            """
-    return await conn.fetch(psql)
+    await rank_service.ensure_loaded(conn)
+    return rank_service.get_top("pvpwins")
 
 async def get_top_gravitas(conn : asyncpg.Connection):
-    """Returns a list of records containing the top 10 players by gravitas
-    Record: user_name, gravitas
+    """Returns a list of tuples containing the top 10 players by gravitas
+    Tuple: user_name, gravitas
     """
-    psql = """
-            SELECT user_name, gravitas
-            FROM players
-            ORDER BY gravitas DESC LIMIT 10;
-            """
-    return await conn.fetch(psql)
+    await rank_service.ensure_loaded(conn)
+    return rank_service.get_top("gravitas")
+
+LEADERBOARD_CACHE_TTL = 5 # Seconds a leaderboard snapshot is reused for
+
+
+class LeaderboardCache:
+    """Caches the bot-wide statistics shown by /leaderboard. The aggregates
+    are computed by one query and the top 10 lists come from the rank 
+    service, so a burst of /leaderboard calls shares a single evaluation.
+    """
+    def __init__(self):
+        self._snapshot = None
+        self._loaded_at = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_stale(self) -> bool:
+        return (self._loaded_at is None or 
+            time.monotonic() - self._loaded_at > LEADERBOARD_CACHE_TTL)
+
+    async def _load(self, conn : asyncpg.Connection) -> dict:
+        psql = """
+                WITH player_stats AS (
+                    SELECT 
+                        COUNT(*) AS players,
+                        SUM(gold) AS g,
+                        SUM(rubidics) AS r,
+                        SUM(bosswins) AS b,
+                        SUM(pvpfights)/2 AS p
+                    FROM players
+                ),
+                acolyte_stats AS (
+                    SELECT acolytes.acolyte_name, 
+                        COUNT(acolytes.acolyte_name) AS c
+                    FROM acolytes
+                    RIGHT JOIN players
+                        ON acolytes.acolyte_id = players.acolyte1
+                            OR acolytes.acolyte_id = players.acolyte2
+                    GROUP BY acolytes.acolyte_name
+                    ORDER BY c DESC
+                    LIMIT 3
+                )
+                SELECT player_stats.*,
+                    ARRAY(SELECT acolyte_name FROM acolyte_stats 
+                        ORDER BY c DESC) AS acolyte_names,
+                    ARRAY(SELECT c FROM acolyte_stats 
+                        ORDER BY c DESC) AS acolyte_counts
+                FROM player_stats;
+                """
+        record = await conn.fetchrow(psql)
+        await rank_service.ensure_loaded(conn)
+        return {
+            "players" : record['players'],
+            "econ" : {"g" : record['g'], "r" : record['r']},
+            "combat" : {"b" : record['b'], "p" : record['p']},
+            "acolytes" : [{"acolyte_name" : name, "c" : count} 
+                for name, count in zip(
+                    record['acolyte_names'], record['acolyte_counts'])],
+            "top_xp" : rank_service.get_top("xp"),
+            "top_gold" : rank_service.get_top("gold"),
+            "top_pve" : rank_service.get_top("bosswins"),
+            "top_pvp" : rank_service.get_top("pvpwins"),
+            "top_gravitas" : rank_service.get_top("gravitas")
+        }
+
+    async def get(self, conn : asyncpg.Connection) -> dict:
+        """Returns the current snapshot, reloading it if it is stale.
+        Concurrent callers wait on the same reload.
+        """
+        if not self.is_stale:
+            return self._snapshot
+        async with self._lock:
+            if self.is_stale:
+                self._snapshot = await self._load(conn)
+                self._loaded_at = time.monotonic()
+        return self._snapshot
+
+
+leaderboard_cache = LeaderboardCache()
+
+async def get_leaderboard_snapshot(conn : asyncpg.Connection) -> dict:
+    """Returns a dict of all the bot-wide information on the leaderboard.
+    Keys: players, econ (g, r), combat (b, p), acolytes (list of 3 with keys
+    acolyte_name, c), top_xp, top_gold, top_pve, top_pvp, top_gravitas
+    (lists of (user_name, value) tuples)
+    Snapshots are shared between callers for LEADERBOARD_CACHE_TTL seconds.
+    """
+    return await leaderboard_cache.get(conn)
 
 def stringify_gains(item : str, total : int, sources : List[tuple]):
     """
@@ -3,7 +3,11 @@ import discord
 import aiohttp
 import asyncpg
 
+import time
+from typing import Dict
+
 from Utilities import Checks, Vars
+from Utilities.CacheBus import cache_bus
 
 
 class Association:
@@ -122,8 +126,9 @@ class Association:
                 WHERE assc = $1;
                 """
         members = await conn.fetch(psql, self.id)
-        from Utilities.PlayerObject import get_player_by_id as gpbi
-        return [await gpbi(conn, id['user_id']) for id in members]
+        from Utilities.PlayerObject import get_players_by_ids
+        return await get_players_by_ids(
+            conn, [record['user_id'] for record in members])
 
     async def increase_xp(self, conn : asyncpg.Connection, xp : int):
         """Increase the association's xp by the given amount."""
@@ -225,6 +230,8 @@ class Association:
         await conn.execute(psql1, self.leader)
         await conn.execute(psql2, leader_id)
         await conn.execute(psql3, leader_id, self.id)        
+        Checks.check_cache.invalidate(self.leader)
+        Checks.check_cache.invalidate(leader_id)
         
         self.leader = leader_id
 
@@ -266,6 +273,7 @@ class Association:
 
         await conn.execute(psql1, self.id)
         await conn.execute(psql2, self.id)
+        Checks.check_cache.invalidate_association(self.id)
 
         # Brotherhood champion deletion is probably unneccessary
         if self.type == "Guild":
@@ -310,7 +318,7 @@ class Association:
         if self.type != "Brotherhood":
             raise Checks.NotInSpecifiedAssociation("Brotherhood")
 
-        from Utilities.PlayerObject import get_player_by_id # evil emoji
+        from Utilities.PlayerObject import get_players_by_ids # evil emoji
 
         psql = """
                 SELECT champ1, champ2, champ3
@@ -318,15 +326,11 @@ class Association:
                 WHERE assc_id = $1;
                 """
         champs = await conn.fetchrow(psql, self.id)
-        champ_list = [None, None, None]
-        if champs['champ1'] is not None:
-            champ_list[0] = await get_player_by_id(conn, champs['champ1'])
-        if champs['champ2'] is not None:
-            champ_list[1] = await get_player_by_id(conn, champs['champ2'])
-        if champs['champ3'] is not None:
-            champ_list[2] = await get_player_by_id(conn, champs['champ3'])      
+        champ_ids = [champs['champ1'], champs['champ2'], champs['champ3']]
+        loaded = {player.disc_id : player for player in 
+            await get_players_by_ids(conn, filter(None, champ_ids))}
 
-        return champ_list
+        return [loaded.get(champ_id) for champ_id in champ_ids]
 
     async def set_champion(self, conn : asyncpg.Connection, player_id : int, 
             slot : int):
@@ -410,6 +414,7 @@ class Association:
                 VALUES ($1, $2);
                 """
         await conn.execute(psql, area, self.id)
+        territory_service.invalidate()
 
 
 async def get_assc_by_id(conn : asyncpg.Connection, 
@@ -465,22 +470,81 @@ async def create_assc(conn : asyncpg.Connection, name : str, type : str,
     assc_id = await conn.fetchval(
         psql1, name, type, leader, Vars.DEFAULT_ICON, base)
     await conn.execute(psql2, assc_id, leader)
+    Checks.check_cache.invalidate(leader)
     if type == "Brotherhood":
         await conn.execute(psql3, assc_id)
     return await get_assc_by_id(conn, assc_id)
 
+# --- TERRITORY SERVICE ---
+# /work reads the controller of the player's location on every use, and 
+# /territories reads all of them, so control of every area is cached together.
+# set_territory_controller invalidates the cache; the TTL covers changes made
+# by other processes and to the controlling associations themselves.
+TERRITORY_CACHE_TTL = 300 # Seconds
+
+
+class TerritoryService:
+    """Caches a snapshot of the association controlling each territory,
+    loaded with a single query.
+    """
+    def __init__(self):
+        self._snapshot = None # (loaded_at, Dict[str, Association])
+
+    @property
+    def is_stale(self) -> bool:
+        return (self._snapshot is None or 
+            time.monotonic() - self._snapshot[0] > TERRITORY_CACHE_TTL)
+
+    async def refresh(self, conn : asyncpg.Connection):
+        """Reload the latest controller of every area."""
+        psql = """
+                SELECT DISTINCT ON (area_control.area)
+                    area_control.area,
+                    associations.assc_id, associations.assc_name, 
+                    associations.assc_type, associations.assc_xp, 
+                    associations.leader_id, associations.assc_desc,
+                    associations.assc_icon, associations.join_status, 
+                    associations.base, associations.base_set, 
+                    associations.min_level
+                FROM area_control
+                LEFT JOIN associations
+                    ON associations.assc_id = area_control.owner
+                ORDER BY area_control.area, area_control.id DESC;
+                """
+        records = await conn.fetch(psql)
+        controllers = {
+            record['area'] : Association(
+                record if record['assc_id'] is not None else None)
+            for record in records}
+        self._snapshot = (time.monotonic(), controllers)
+
+    async def get_snapshot(self, conn : asyncpg.Connection
+            ) -> Dict[str, Association]:
+        """Returns a dict of each area that has ever been controlled and the
+        Association controlling it, which is empty if it is unowned. Treat 
+        the returned objects as read-only; they are shared between callers.
+        """
+        if self.is_stale:
+            await self.refresh(conn)
+        return self._snapshot[1]
+
+    async def get_controller(self, conn : asyncpg.Connection, 
+            area : str) -> Association:
+        return (await self.get_snapshot(conn)).get(area) or Association()
+
+    def invalidate(self):
+        self._snapshot = None
+        cache_bus.publish("territories", "invalidate")
+
+
+territory_service = TerritoryService()
+cache_bus.register("territories", territory_service)
+
 async def get_territory_controller(conn : asyncpg.Connection, area : str):
     """Returns the Association object of the brotherhood in control of 
     the given area.
     """
-    psql = """
-            SELECT owner
-            FROM area_control
-            WHERE area = $1
-            ORDER BY id DESC
-            LIMIT 1;
-            """
-    return await get_assc_by_id(conn, await conn.fetchval(psql, area))
+    return await territory_service.get_controller(conn, area)
 
 async def log_area_attack(conn : asyncpg.Connection, area : str,
         attacker : int, defender : int, winner : int):
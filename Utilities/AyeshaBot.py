@@ -1,56 +1,180 @@
 import discord
 from discord.ext import commands
 
+import asyncio
 import traceback
+from typing import Optional, TYPE_CHECKING
 
 import asyncpg
 
-from Utilities import config, Vars
+from Utilities import (AcolyteObject, Analytics, AssociationObject, config, 
+    Finances, Vars)
+from Utilities.CacheBus import cache_bus
+from Utilities.Database import AyeshaConnection
+from Utilities.Delivery import DeliveryPipeline
+from Utilities.LagMonitor import LagMonitor
+from Utilities.Metrics import Metrics, METRICS_PORT
+from Utilities.RequestContext import current_context, RequestContext
+from Utilities.Startup import StartupReport
+from Utilities.WordIndex import WordIndex
+if TYPE_CHECKING:
+    from Utilities.Cluster import ClusterSpec
+
+DB_POOL_SIZE = 10 # Connections per pool when not running as a cluster
 
 class Ayesha(commands.AutoShardedBot):
-    """Ayesha bot class with added properties"""
+    """Ayesha bot class with added properties
+
+    Parameters
+    ----------
+    cogs : list
+        the cogs to load
+    cluster : Optional[ClusterSpec]
+        the shards and pool sizes to run with when this is one worker of a
+        cluster; if None, the bot runs every shard in this process
+    """
 
-    def __init__(self, cogs : list):
+    def __init__(self, cogs : list, cluster : Optional["ClusterSpec"] = None):
         self.init_cogs = cogs
+        self.cluster = cluster
+        self.startup = StartupReport()
 
-        self.acolyte_list = []
+        self.word_index = None
 
         self.recent_voters = {}
         self.trading_players = {}
         self.training_players = {}
 
-        super().__init__(command_prefix = "%", case_insensitive = True)
+        shards = {}
+        db_pool_size = dictionary_pool_size = DB_POOL_SIZE
+        if cluster is not None:
+            shards = {"shard_ids" : cluster.shard_ids,
+                "shard_count" : cluster.shard_count}
+            db_pool_size = cluster.db_pool_size
+            dictionary_pool_size = cluster.dictionary_pool_size
+
+        super().__init__(command_prefix = "%", case_insensitive = True, 
+            **shards)
 
         # Create connection pools of the bot databases
-        self.db = self.loop.run_until_complete(create_db_pool())
-        self.dictionary = self.loop.run_until_complete(create_dictionary_pool())
-
-        # Load the bot cogs
-        for cog in self.init_cogs:
-            try:
-                self.load_extension(cog, store=False)
-                print(f"Loaded cog {cog}.")
-            except:
-                print(f"Failed to load cog {cog}.")
-                traceback.print_exc()
+        with self.startup.stage("pools"):
+            self.db, self.dictionary = self.loop.run_until_complete(
+                asyncio.gather(create_db_pool(db_pool_size), 
+                    create_dictionary_pool(dictionary_pool_size)))
+            # Other workers of the cluster must see this one's invalidations
+            if cluster is not None:
+                self.loop.run_until_complete(
+                    cache_bus.start(self.db, connect_db))
+
+        # Queue for DMs and announcements sent outside of a command
+        self.delivery = DeliveryPipeline(self)
+        # Runtime statistics, served at /metrics
+        self.metrics = Metrics(self)
+        # Watches for code blocking the event loop
+        self.lag_monitor = LagMonitor()
+
+        # Release each command's shared connection once it is done
+        self.add_listener(self.close_request, 
+            "on_application_command_completion")
+        self.add_listener(self.close_request_on_error, 
+            "on_application_command_error")
+        # ...and the one the checks used before the command body runs
+        self.before_invoke(self.release_after_checks)
+
+        # Load the bot cogs. Loading a cog both imports it and runs its setup
+        with self.startup.stage("cogs"):
+            for cog in self.init_cogs:
+                try:
+                    with self.startup.step("cogs", cog):
+                        self.load_extension(cog, store=False)
+                    print(f"Loaded cog {cog}.")
+                except:
+                    print(f"Failed to load cog {cog}.")
+                    traceback.print_exc()
+
+        # Fill the game data caches before connecting to receive commands
+        with self.startup.stage("warmup"):
+            self.loop.run_until_complete(self.warmup())
+
+    async def warmup(self):
+        """Load the data that commands read from memory, each over its own
+        connection so that the loads run concurrently.
+
+        A failed load is reported and skipped if its data is also loaded on
+        first use. Only the word index, which has no such fallback, stops
+        the bot from starting.
+        """
+        async def load(name, pool, loader, required=False):
+            with self.startup.step("warmup", name):
+                try:
+                    async with pool.acquire() as conn:
+                        await loader(conn)
+                except Exception:
+                    if required:
+                        raise
+                    print(f"Failed to warm up the {name}; it will be "
+                        f"loaded when first used.")
+                    traceback.print_exc()
+
+        async def load_word_index(conn):
+            self.word_index = await WordIndex.load_cached(conn)
+
+        await asyncio.gather(
+            load("acolyte catalog", self.db, AcolyteObject.load_catalog),
+            load("word index", self.dictionary, load_word_index, 
+                required=True),
+            load("territory snapshot", self.db, 
+                AssociationObject.territory_service.refresh),
+            load("rank indexes", self.db, Analytics.rank_service.refresh))
+
+    @property
+    def acolyte_list(self) -> list:
+        """The names of every acolyte, for autocompletion."""
+        return AcolyteObject.get_catalog_names()
+
+    @property
+    def cluster_id(self) -> int:
+        return 0 if self.cluster is None else self.cluster.cluster_id
+
+    @property
+    def is_primary(self) -> bool:
+        """Whether this process runs the jobs that must run only once, such
+        as weekly payouts. Always true unless running as a cluster.
+        """
+        return self.cluster_id == 0
 
     async def on_ready(self):
         gp = "Slash commands added!"
         self.loop.create_task(self.change_presence(activity=discord.Game(gp)))
 
-        # Create general lists for autocomplete
-        psql = "SELECT name FROM acolyte_list;"
-        async with self.db.acquire() as conn:
-            self.acolyte_list = [r['name'] for r in await conn.fetch(psql)]
+        self.delivery.start()
+        self.lag_monitor.start()
+        Finances.tax_service.start(self.db)
+        Analytics.rank_service.start(self.db)
+        # The primary's metrics are served by the Vote cog's web server;
+        # other workers of a cluster serve theirs on the ports after it
+        if not self.is_primary or "cogs.Vote" not in self.init_cogs:
+            await self.metrics.start_server(METRICS_PORT + self.cluster_id)
 
-        # Get Discord objects for later use
-        self.announcement_channel = await self.fetch_channel(
-            Vars.ANNOUNCEMENT_CHANNEL)
+        # Get Discord objects for later use, from the cache if possible
+        self.announcement_channel = \
+            self.get_channel(Vars.ANNOUNCEMENT_CHANNEL) \
+            or await self.fetch_channel(Vars.ANNOUNCEMENT_CHANNEL)
         self.raider_role = self.announcement_channel.guild.get_role(
             Vars.RAIDER_ROLE)
 
+        if not self.startup.has_stage("connect"): # Only on the first ready
+            self.startup.end_stage("connect")
+            print(self.startup.format())
+
         print("Ayesha is online.")
 
+    async def close(self):
+        # Write out the buffered tax log before shutting down
+        await Finances.tax_service.stop()
+        await cache_bus.stop()
+        await super().close()
+
     async def on_interaction(self, interaction : discord.Interaction):
         if interaction.user.id in self.trading_players:
             return await interaction.response.send_message(
@@ -67,20 +191,68 @@ class Ayesha(commands.AutoShardedBot):
 
         return await super().on_interaction(interaction)
 
+    async def get_application_context(self, interaction : discord.Interaction,
+            cls=None) -> discord.ApplicationContext:
+        """Attaches a RequestContext to every command invocation."""
+        ctx = await super().get_application_context(interaction, cls=cls)
+        ctx.request = RequestContext(self.db, interaction.user.id)
+        # The command runs in this task, so it and the queries it makes
+        # can look up what they are running for
+        current_context.set(ctx)
+        self.lag_monitor.track(ctx)
+        return ctx
+
+    async def release_after_checks(self, ctx : discord.ApplicationContext):
+        """Give back the connection the checks used. Most command bodies 
+        take their own from `bot.db`, and holding both at once can exhaust 
+        the pool; bodies using `ctx.request` acquire a new one.
+        """
+        if hasattr(ctx, "request"):
+            await ctx.request.release()
+
+    async def close_request(self, ctx : discord.ApplicationContext):
+        if hasattr(ctx, "request"):
+            self.metrics.observe_command(
+                ctx.command.qualified_name, ctx.request.elapsed)
+            await ctx.request.close(ctx.command.qualified_name)
+
+    async def close_request_on_error(self, ctx : discord.ApplicationContext, 
+            error : Exception):
+        self.metrics.count_error(ctx.command.qualified_name, error)
+        await self.close_request(ctx)
+
+    async def reload_acolyte_catalog(self):
+        """Reload the acolyte catalog. Run this after editing acolyte_list."""
+        async with self.db.acquire() as conn:
+            await AcolyteObject.load_catalog(conn)
+
     def is_admin(self, ctx):
         return ctx.author.id in config.ADMINS
 
 
 # Connect to database
-async def create_db_pool():
+async def create_db_pool(size : int = DB_POOL_SIZE):
     return await asyncpg.create_pool(
+        database = config.DATABASE['name'],
+        user = config.DATABASE['user'],
+        password = config.DATABASE['password'],
+        min_size = size,
+        max_size = size,
+        connection_class = AyeshaConnection)
+
+# A connection outside of the pool, for listening to notifications
+async def connect_db():
+    return await asyncpg.connect(
         database = config.DATABASE['name'],
         user = config.DATABASE['user'],
         password = config.DATABASE['password'])
 
 # Word Chain database
-async def create_dictionary_pool():
+async def create_dictionary_pool(size : int = DB_POOL_SIZE):
     return await asyncpg.create_pool(
         database = config.DICTIONARY['name'],
         user = config.DICTIONARY['user'],
-        password = config.DICTIONARY['password'])
\ No newline at end of file
+        password = config.DICTIONARY['password'],
+        min_size = size,
+        max_size = size,
+        connection_class = AyeshaConnection)
\ No newline at end of file
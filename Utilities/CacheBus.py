@@ -0,0 +1,135 @@
+import asyncpg
+
+import asyncio
+import json
+import logging
+import os
+from typing import Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger("discord.ayesha.cache")
+
+CHANNEL = "ayesha_cache"
+RECONNECT_DELAY = 1 # Seconds, doubled after each failed attempt
+MAX_RECONNECT_DELAY = 60
+
+
+class CacheBus:
+    """Relays cache invalidations between the processes of a cluster over
+    Postgres LISTEN/NOTIFY, so that a change made through one worker is not
+    hidden by another worker's cache until its TTL runs out.
+
+    Caches register under a name and call `publish()` from their
+    invalidation methods. Other processes receiving the message call the
+    same method on their own copy of the cache. Until `start()` is called,
+    as when the bot runs as a single process, `publish()` does nothing.
+
+    The bus listens on a connection of its own rather than one from the
+    pool, and reconnects with backoff if it is lost. Invalidations missed
+    while disconnected are covered by the caches' TTLs.
+    """
+    def __init__(self):
+        self._caches : Dict[str, object] = {}
+        self._pool : Optional[asyncpg.Pool] = None
+        self._connect : Optional[Callable[[], Awaitable]] = None
+        self._conn : Optional[asyncpg.Connection] = None
+        self._lost = asyncio.Event()
+        self._task : Optional[asyncio.Task] = None
+        self._receiving = False
+        self._tasks = set()
+
+    @property
+    def running(self) -> bool:
+        return self._conn is not None and not self._conn.is_closed()
+
+    def register(self, name : str, cache : object):
+        self._caches[name] = cache
+
+    async def start(self, pool : asyncpg.Pool,
+            connect : Callable[[], Awaitable[asyncpg.Connection]]):
+        """Start listening for invalidations.
+
+        Parameters
+        ----------
+        pool : asyncpg.Pool
+            the pool invalidations are published over
+        connect : Callable[[], Awaitable[asyncpg.Connection]]
+            opens the connection to listen on, outside of the pool
+        """
+        if self._task is not None:
+            return
+        self._pool = pool
+        self._connect = connect
+        await self._listen()
+        self._task = asyncio.create_task(self._reconnect())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        conn, self._conn = self._conn, None
+        if conn is not None and not conn.is_closed():
+            await conn.close()
+
+    async def _listen(self):
+        self._lost.clear()
+        conn = await self._connect()
+        conn.add_termination_listener(self._on_termination)
+        await conn.add_listener(CHANNEL, self._on_notification)
+        self._conn = conn
+
+    async def _reconnect(self):
+        """Open a new connection whenever the listening one is lost."""
+        while True:
+            await self._lost.wait()
+            delay = RECONNECT_DELAY
+            while True:
+                try:
+                    await self._listen()
+                    logger.info("Reconnected the cache invalidation listener.")
+                    break
+                except (asyncpg.PostgresError, OSError, 
+                        asyncio.TimeoutError) as e:
+                    logger.warning(f"Could not reconnect the cache "
+                        f"invalidation listener: {e}; retrying in {delay} s.")
+                    await asyncio.sleep(delay)
+                    delay = min(MAX_RECONNECT_DELAY, delay * 2)
+
+    def publish(self, name : str, method : str, *args):
+        """Tell the other processes to call `method(*args)` on their copy of
+        the cache registered as `name`. Arguments must be JSON serializable.
+        """
+        if self._receiving or self._task is None:
+            return
+        payload = json.dumps([os.getpid(), name, method, args])
+        task = asyncio.get_running_loop().create_task(self._notify(payload))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _notify(self, payload : str):
+        try:
+            await self._pool.execute(
+                "SELECT pg_notify($1, $2);", CHANNEL, payload)
+        except (asyncpg.PostgresError, OSError) as e:
+            logger.warning(f"Could not publish invalidation {payload}: {e}")
+
+    def _on_notification(self, conn, pid, channel, payload):
+        sender, name, method, args = json.loads(payload)
+        cache = self._caches.get(name)
+        if sender == os.getpid() or cache is None:
+            return
+        # Applying the invalidation must not publish it again
+        self._receiving = True
+        try:
+            getattr(cache, method)(*args)
+        finally:
+            self._receiving = False
+
+    def _on_termination(self, conn):
+        if conn is not self._conn: # Closed by stop()
+            return
+        logger.warning("Lost the cache invalidation connection.")
+        self._conn = None
+        self._lost.set()
+
+
+cache_bus = CacheBus()
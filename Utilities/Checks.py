@@ -4,9 +4,14 @@ import discord
 
 from discord.ext import commands
 
+import asyncpg
+import time
+from collections import OrderedDict
+
+from Utilities.CacheBus import cache_bus
 from Utilities.config import ADMINS
 
-from typing import TYPE_CHECKING
+from typing import Optional, TYPE_CHECKING
 if TYPE_CHECKING:
     from datetime import timedelta
 
@@ -83,6 +88,11 @@ class InvalidArmorMaterial(Exception):
 class NotAccessoryOwner(Exception):
     pass
 
+class ItemChanged(Exception):
+    """Raised when an item was altered between a command quoting a price 
+    for it and the player confirming the transaction."""
+    pass
+
 class InvalidAccessoryPrefix(Exception):
     pass
 
@@ -194,129 +204,173 @@ class AlreadyClaimedDaily(Exception):
         self.time_to_midnight = time_to_midnight
 
 
-# --- NOW FOR THE ACTUAL CHECKS :) ---
+# --- CHECK CACHE ---
+# Checks run before nearly every command, so the state they read is cached
+# per user. Anything that changes this state must invalidate the cache.
+CHECK_CACHE_TTL = 300 # Seconds
+CHECK_CACHE_SIZE = 50000 # Players held at once, least recently used dropped
 
-async def not_player(ctx):
-    async with ctx.bot.db.acquire() as conn:
+
+class CheckCache:
+    """Caches the player state read by the checks below: whether they have 
+    a character, their adventure, and their association and rank. The 
+    current officeholders are also cached. Entries expire after 
+    CHECK_CACHE_TTL seconds, but the methods that change this state 
+    invalidate them immediately. At most CHECK_CACHE_SIZE players are held;
+    past that the least recently used are dropped.
+    """
+    def __init__(self):
+        # user_id : (loaded_at, record or None), least recently used first
+        self._players : OrderedDict = OrderedDict()
+        self._offices = None # (loaded_at, {office : officeholder})
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Returns the fraction of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+    def _is_fresh(self, loaded_at : float) -> bool:
+        return time.monotonic() - loaded_at < CHECK_CACHE_TTL
+
+    async def get_player(self, ctx) -> Optional[asyncpg.Record]:
+        """Returns a record with the author's user_id, adventure, destination,
+        assc, assc_type, and guild_rank, or None if they have no character.
+        """
+        entry = self._players.get(ctx.author.id)
+        if entry is not None:
+            if self._is_fresh(entry[0]):
+                self.hits += 1
+                self._players.move_to_end(ctx.author.id)
+                return entry[1]
+            del self._players[ctx.author.id]
+
+        self.misses += 1
         psql = """
-                SELECT user_id
+                SELECT players.user_id, players.adventure, 
+                    players.destination, players.assc, players.guild_rank,
+                    associations.assc_type
                 FROM players
-                WHERE user_id = $1;
+                LEFT JOIN associations
+                    ON players.assc = associations.assc_id
+                WHERE players.user_id = $1;
                 """
-        result = await conn.fetchval(psql, ctx.author.id)
-        
-    if result is None:
+        async with ctx.request.acquire() as conn:
+            record = await conn.fetchrow(psql, ctx.author.id)
+        self._players[ctx.author.id] = (time.monotonic(), record)
+        self._players.move_to_end(ctx.author.id)
+        if len(self._players) > CHECK_CACHE_SIZE:
+            self._players.popitem(last=False)
+        return record
+
+    async def get_officeholder(self, ctx, office : str) -> Optional[int]:
+        """Returns the ID of the current holder of the given office."""
+        if self._offices is not None and self._is_fresh(self._offices[0]):
+            self.hits += 1
+            return self._offices[1].get(office)
+
+        self.misses += 1
+        psql = """
+                SELECT DISTINCT ON (office) office, officeholder
+                FROM officeholders
+                ORDER BY office, id DESC;
+                """
+        async with ctx.request.acquire() as conn:
+            records = await conn.fetch(psql)
+        offices = {record['office'] : record['officeholder'] 
+            for record in records}
+        self._offices = (time.monotonic(), offices)
+        return offices.get(office)
+
+    def invalidate(self, user_id : int):
+        """Drop the cached state of a single player."""
+        self._players.pop(user_id, None)
+        cache_bus.publish("checks", "invalidate", user_id)
+
+    def invalidate_association(self, assc_id : int):
+        """Drop the cached state of every member of an association."""
+        for user_id, (_, record) in list(self._players.items()):
+            if record is not None and record['assc'] == assc_id:
+                del self._players[user_id]
+        cache_bus.publish("checks", "invalidate_association", assc_id)
+
+    def invalidate_offices(self):
+        """Drop the cached officeholders."""
+        self._offices = None
+        cache_bus.publish("checks", "invalidate_offices")
+
+
+check_cache = CheckCache()
+cache_bus.register("checks", check_cache)
+
+
+# --- NOW FOR THE ACTUAL CHECKS :) ---
+
+async def not_player(ctx):
+    if await check_cache.get_player(ctx) is None:
         return True
     raise HasChar(ctx.author, 
         message='Player has a character and failed not_player check.')
 
 async def is_player(ctx):
-    async with ctx.bot.db.acquire() as conn:
-        psql = """
-                SELECT user_id
-                FROM players
-                WHERE user_id = $1;
-                """
-        result = await conn.fetchval(psql, ctx.author.id)
-
-    if result is None:
+    if await check_cache.get_player(ctx) is None:
         raise PlayerHasNoChar
     return True
 
 async def is_not_travelling(ctx):
-    async with ctx.bot.db.acquire() as conn:
-        from Utilities.PlayerObject import get_player_by_id
-        player = await get_player_by_id(conn, ctx.author.id)
-        
-    if player.adventure is None:
+    record = await check_cache.get_player(ctx)
+    if record is None:
+        raise PlayerHasNoChar
+    if record['adventure'] is None:
         return True
-    raise CurrentlyTraveling(player.adventure, player.destination)
+    raise CurrentlyTraveling(record['adventure'], record['destination'])
 
 async def is_travelling(ctx):
-    async with ctx.bot.db.acquire() as conn:
-        psql = """
-                SELECT adventure
-                FROM players
-                WHERE user_id = $1;
-                """
-        result = await conn.fetchval(psql, ctx.author.id)
-
-    if result is None:
+    record = await check_cache.get_player(ctx)
+    if record is None or record['adventure'] is None:
         raise NotCurrentlyTraveling
     return True
 
-# Auxiliary function - don't use in commands
-async def _get_assc(ctx):
-    async with ctx.bot.db.acquire() as conn:
-        psql = """
-                SELECT players.assc, associations.assc_type
-                FROM players
-                LEFT JOIN associations
-                    ON players.assc = associations.assc_id
-                WHERE user_id = $1;
-                """
-        return await conn.fetchrow(psql, ctx.author.id)
-
 async def in_association(ctx):
-    record = await _get_assc(ctx)
-    if record['assc'] is None:
+    record = await check_cache.get_player(ctx)
+    if record is None or record['assc'] is None:
         raise NotInAssociation
     return True
 
 async def not_in_association(ctx):
-    record = await _get_assc(ctx)
-    if record['assc'] is not None:
+    record = await check_cache.get_player(ctx)
+    if record is not None and record['assc'] is not None:
         raise InAssociation
     return True
 
+async def _in_assc_type(ctx, assc_type : str):
+    record = await check_cache.get_player(ctx)
+    if record is None or record['assc_type'] is None:
+        raise NotInAssociation(assc_type)
+    if record['assc_type'] == assc_type:
+        return True
+    raise NotInAssociation(assc_type, record['assc_type'])
+
 async def in_brotherhood(ctx):
-    record = await _get_assc(ctx)
-    try:
-        if record['assc_type'] == "Brotherhood":
-            return True
-    except TypeError:
-        raise NotInAssociation("Brotherhood")
-    raise NotInAssociation("Brotherhood", record['assc_type'])
+    return await _in_assc_type(ctx, "Brotherhood")
 
 async def in_college(ctx):
-    record = await _get_assc(ctx)
-    try:
-        if record['assc_type'] == "College":
-            return True
-    except TypeError:
-        raise NotInAssociation("College")
-    raise NotInAssociation("College", record['assc_type'])
+    return await _in_assc_type(ctx, "College")
 
 async def in_guild(ctx):
-    record = await _get_assc(ctx)
-    try:
-        if record['assc_type'] == "Guild":
-            return True
-    except TypeError:
-        raise NotInAssociation("Guild")
-    raise NotInAssociation("Guild", record['assc_type'])
+    return await _in_assc_type(ctx, "Guild")
 
 async def is_assc_leader(ctx):
-    psql = """
-            SELECT guild_rank 
-            FROM players
-            WHERE user_id = $1;
-            """
-    async with ctx.bot.db.acquire() as conn:
-        rank = await conn.fetchval(psql, ctx.author.id)
-    if rank != "Leader":
+    record = await check_cache.get_player(ctx)
+    if record is None or record['guild_rank'] != "Leader":
         raise IncorrectAssociationRank("Leader")
     return True
 
 async def is_assc_officer(ctx):
-    psql = """
-            SELECT guild_rank 
-            FROM players
-            WHERE user_id = $1;
-            """
-    async with ctx.bot.db.acquire() as conn:
-        rank = await conn.fetchval(psql, ctx.author.id)
-    if rank not in ("Leader", "Officer"):
+    record = await check_cache.get_player(ctx)
+    if record is None or record['guild_rank'] not in ("Leader", "Officer"):
         raise IncorrectAssociationRank("Officer")
     return True
 
@@ -327,27 +381,11 @@ def is_admin(ctx):
         raise NotAdmin
 
 async def is_mayor(ctx):
-    psql = """
-            SELECT officeholder
-            FROM officeholders
-            WHERE office = 'Mayor'
-            ORDER BY id DESC
-            LIMIT 1;
-            """
-    async with ctx.bot.db.acquire() as conn:
-        if ctx.author.id == await conn.fetchval(psql):
-            return True
-        raise NotMayor
+    if ctx.author.id == await check_cache.get_officeholder(ctx, "Mayor"):
+        return True
+    raise NotMayor
 
 async def is_comptroller(ctx):
-    psql = """
-            SELECT officeholder
-            FROM officeholders
-            WHERE office = 'Comptroller'
-            ORDER BY id DESC
-            LIMIT 1;
-            """
-    async with ctx.bot.db.acquire() as conn:
-        if ctx.author.id == await conn.fetchval(psql):
-            return True
-        raise NotComptroller
\ No newline at end of file
+    if ctx.author.id == await check_cache.get_officeholder(ctx, "Comptroller"):
+        return True
+    raise NotComptroller
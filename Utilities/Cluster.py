@@ -0,0 +1,355 @@
+import aiohttp
+from aiohttp import web
+
+import asyncio
+import logging
+import math
+import multiprocessing
+import os
+import queue
+import signal
+import time
+from typing import Callable, List, Optional
+
+from Utilities import config
+from Utilities.AyeshaBot import Ayesha
+from Utilities.Metrics import get_pool_stats
+
+logger = logging.getLogger("discord.ayesha.cluster")
+
+# Connections to each database shared out between the workers of a cluster.
+# Set DB_CONNECTION_BUDGET and DICTIONARY_CONNECTION_BUDGET in config to
+# change them.
+DB_CONNECTION_BUDGET = getattr(config, "DB_CONNECTION_BUDGET", 40)
+DICTIONARY_CONNECTION_BUDGET = getattr(
+    config, "DICTIONARY_CONNECTION_BUDGET", 10)
+MIN_POOL_SIZE = 2
+# The supervisor serves the cluster's health at /health on this port. Set
+# CLUSTER_HEALTH_PORT in config to change it.
+HEALTH_PORT = getattr(config, "CLUSTER_HEALTH_PORT", 8079)
+
+HEALTH_INTERVAL = 5 # Seconds between a worker's health reports
+HEALTH_TIMEOUT = 60 # A worker silent for this long is restarted
+READY_TIMEOUT = 300 # Seconds given to a worker to start reporting
+RESTART_DELAY = 5 # Seconds, doubled for each crash before becoming ready
+MAX_RESTART_DELAY = 300
+STOP_TIMEOUT = 30 # Seconds given to workers to close before being killed
+
+
+class ClusterSpec:
+    """What a single worker process of the cluster runs.
+
+    Attributes
+    ----------
+    cluster_id : int
+        the worker's index. Worker 0 is the primary, which runs the jobs
+        that must only run once, such as the weekly office elections
+    shard_ids : List[int]
+        the contiguous range of shards the worker connects
+    shard_count : int
+        the total number of shards across every worker
+    cogs : List[str]
+        the cogs the worker loads
+    db_pool_size : int
+        the connections the worker opens to the bot database
+    dictionary_pool_size : int
+        the connections the worker opens to the dictionary database
+    """
+    def __init__(self, cluster_id : int, shard_ids : List[int],
+            shard_count : int, cogs : List[str], db_pool_size : int,
+            dictionary_pool_size : int):
+        self.cluster_id = cluster_id
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
+        self.cogs = cogs
+        self.db_pool_size = db_pool_size
+        self.dictionary_pool_size = dictionary_pool_size
+
+    def __repr__(self):
+        return (f"<ClusterSpec {self.cluster_id}: shards "
+            f"{self.shard_ids[0]}-{self.shard_ids[-1]} of {self.shard_count}>")
+
+
+def plan_clusters(cogs : List[str], workers : int,
+        shard_count : int) -> List[ClusterSpec]:
+    """Split the shards into `workers` contiguous ranges of nearly equal
+    size, and the connection budgets evenly between the workers. One of each
+    worker's connections to the bot database is kept out of its pool for
+    the cache bus to listen on.
+
+    Raises
+    ------
+    ValueError
+        There are fewer shards than workers
+    """
+    if not 0 < workers <= shard_count:
+        raise ValueError(
+            f"Cannot split {shard_count} shards between {workers} workers.")
+    db_pool_size = max(MIN_POOL_SIZE, DB_CONNECTION_BUDGET // workers - 1)
+    dictionary_pool_size = max(
+        MIN_POOL_SIZE, DICTIONARY_CONNECTION_BUDGET // workers)
+
+    specs = []
+    size, extra = divmod(shard_count, workers)
+    start = 0
+    for cluster_id in range(workers):
+        end = start + size + (cluster_id < extra)
+        specs.append(ClusterSpec(cluster_id, list(range(start, end)),
+            shard_count, cogs, db_pool_size, dictionary_pool_size))
+        start = end
+    return specs
+
+
+async def get_shard_count(token : str) -> int:
+    """Returns the number of shards Discord recommends for the bot."""
+    url = "https://discord.com/api/v10/gateway/bot"
+    async with aiohttp.ClientSession() as session:
+        async with session.get(
+                url, headers={"Authorization" : f"Bot {token}"}) as resp:
+            resp.raise_for_status()
+            data = await resp.json()
+    return data['shards']
+
+
+# --- WORKERS ---
+def get_worker_health(bot : Ayesha, spec : ClusterSpec) -> dict:
+    """Returns the health report a worker sends to the supervisor."""
+    latencies = [latency for _, latency in bot.latencies
+        if math.isfinite(latency)]
+    return {
+        "cluster_id" : spec.cluster_id,
+        "pid" : os.getpid(),
+        "ready" : bot.is_ready(),
+        "shards" : len(bot.shards),
+        "guilds" : len(bot.guilds),
+        "latency" : max(latencies, default=None),
+        "lag" : bot.lag_monitor.lag,
+        "stalls" : bot.lag_monitor.stall_count,
+        "db_pool" : get_pool_stats(bot.db)
+    }
+
+async def report_health(bot : Ayesha, spec : ClusterSpec,
+        reports : multiprocessing.Queue):
+    while True:
+        reports.put(get_worker_health(bot, spec))
+        await asyncio.sleep(HEALTH_INTERVAL)
+
+def run_worker(spec : ClusterSpec, reports : multiprocessing.Queue):
+    """Run the bot on the worker's shards, sending health reports to the
+    supervisor until it is closed. This is the worker process's target.
+    """
+    # Each worker logs to its own file, e.g. discord.1.log
+    root, ext = os.path.splitext(config.LOG_FILE)
+    base_logger = logging.getLogger('discord')
+    base_logger.setLevel(logging.INFO)
+    handler = logging.FileHandler(filename=f"{root}.{spec.cluster_id}{ext}",
+                                  encoding='utf-8',
+                                  mode='w')
+    handler.setFormatter(logging.Formatter(
+        '%(asctime)s:%(levelname)s:%(name)s: %(message)s'))
+    base_logger.addHandler(handler)
+
+    bot = Ayesha(spec.cogs, cluster=spec)
+    bot.loop.create_task(report_health(bot, spec, reports))
+    bot.run(config.TOKEN)
+
+
+# --- SUPERVISOR ---
+class _Worker:
+    """The supervisor's record of a worker process."""
+    def __init__(self, spec : ClusterSpec):
+        self.spec = spec
+        self.process : Optional[multiprocessing.Process] = None
+        self.health : Optional[dict] = None
+        self.started_at = 0.0
+        self.last_report : Optional[float] = None
+        self.restart_at = math.inf # Until it is first started
+        self.crashes = 0 # Since the worker last became ready
+        self.restarts = 0
+
+    @property
+    def ready(self) -> bool:
+        return self.health is not None and self.health['ready']
+
+
+class Supervisor:
+    """Runs each ClusterSpec in a worker process of its own and keeps it
+    running.
+
+    Workers are started one at a time, each once the previous one has
+    connected, so that they do not all identify with the gateway at once.
+    Workers send a health report every HEALTH_INTERVAL seconds. A worker
+    that exits, or that goes HEALTH_TIMEOUT seconds without a report, is
+    restarted after a delay that doubles with each crash until it connects
+    again. The health of the whole cluster is served as JSON at /health.
+
+    Parameters
+    ----------
+    specs : List[ClusterSpec]
+        the workers to run, from `plan_clusters`
+    target : Callable[[ClusterSpec, multiprocessing.Queue], None], optional
+        the function each worker process runs, by default `run_worker`.
+        It is passed the worker's spec and the queue to put its health
+        reports on
+    port : int, optional
+        the port to serve /health on, by default HEALTH_PORT. If None, the
+        health is only available from `get_health()`
+    """
+    def __init__(self, specs : List[ClusterSpec],
+            target : Callable = run_worker,
+            port : Optional[int] = HEALTH_PORT):
+        self.workers = {spec.cluster_id : _Worker(spec) for spec in specs}
+        self.target = target
+        self.port = port
+        # Forking a process with a running event loop is unsafe
+        self._context = multiprocessing.get_context("spawn")
+        self._reports = self._context.Queue()
+        self._stopping : Optional[asyncio.Event] = None
+
+    def run(self):
+        """Run the cluster until the supervisor receives SIGINT or SIGTERM."""
+        asyncio.run(self.main())
+
+    async def main(self):
+        self._stopping = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self._stopping.set)
+            except NotImplementedError: # Windows
+                pass
+
+        runner = None
+        if self.port is not None:
+            app = web.Application()
+            app.router.add_get("/health", self.handle)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            await web.TCPSite(runner, "0.0.0.0", self.port).start()
+
+        try:
+            for worker in self.workers.values():
+                self._start(worker)
+                await self._wait_until_ready(worker)
+            while not self._stopping.is_set():
+                self.poll()
+                await asyncio.sleep(1)
+        finally:
+            self.stop_workers()
+            if runner is not None:
+                await runner.cleanup()
+
+    def stop(self):
+        if self._stopping is not None:
+            self._stopping.set()
+
+    async def _wait_until_ready(self, worker : _Worker):
+        while not worker.ready and not self._stopping.is_set():
+            if time.monotonic() - worker.started_at > READY_TIMEOUT:
+                logger.warning(f"Cluster {worker.spec.cluster_id} did not "
+                    f"connect within {READY_TIMEOUT} s; starting the next.")
+                return
+            self.poll()
+            await asyncio.sleep(1)
+
+    def _start(self, worker : _Worker):
+        spec = worker.spec
+        worker.process = self._context.Process(target=self.target,
+            args=(spec, self._reports), name=f"ayesha-{spec.cluster_id}")
+        worker.process.start()
+        worker.health = None
+        worker.started_at = time.monotonic()
+        worker.last_report = None
+        logger.info(f"Started {spec!r} as process {worker.process.pid}.")
+
+    def poll(self):
+        """Record the workers' reports and restart any that have exited or
+        gone silent.
+        """
+        self._read_reports()
+        now = time.monotonic()
+        for worker in self.workers.values():
+            cluster_id = worker.spec.cluster_id
+            if worker.process is None: # Waiting to be restarted
+                if now >= worker.restart_at:
+                    worker.restarts += 1
+                    self._start(worker)
+
+            elif not worker.process.is_alive():
+                worker.crashes += 1
+                delay = min(MAX_RESTART_DELAY,
+                    RESTART_DELAY * 2 ** (worker.crashes - 1))
+                logger.warning(f"Cluster {cluster_id} exited with code "
+                    f"{worker.process.exitcode}; restarting in {delay} s.")
+                worker.process = None
+                worker.health = None
+                worker.restart_at = now + delay
+
+            else:
+                timeout = READY_TIMEOUT if worker.last_report is None \
+                    else HEALTH_TIMEOUT
+                silent = now - (worker.last_report or worker.started_at)
+                if silent > timeout:
+                    logger.warning(f"Cluster {cluster_id} has not reported "
+                        f"in {silent:.0f} s; killing it.")
+                    worker.process.kill() # Restarted on the next poll
+
+    def _read_reports(self):
+        while True:
+            try:
+                report = self._reports.get_nowait()
+            except queue.Empty:
+                return
+            worker = self.workers.get(report['cluster_id'])
+            if worker is None or worker.process is None \
+                    or worker.process.pid != report['pid']:
+                continue # From a process that has since been replaced
+            worker.health = report
+            worker.last_report = time.monotonic()
+            if report['ready']:
+                worker.crashes = 0
+
+    def stop_workers(self):
+        """Ask every worker to close, killing those that do not in time."""
+        processes = [worker.process for worker in self.workers.values()
+            if worker.process is not None and worker.process.is_alive()]
+        for process in processes:
+            process.terminate()
+        deadline = time.monotonic() + STOP_TIMEOUT
+        for process in processes:
+            process.join(max(0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.kill()
+                process.join()
+
+    def get_health(self) -> dict:
+        """Returns the health of every worker and totals for the cluster."""
+        now = time.monotonic()
+        clusters = []
+        for worker in self.workers.values():
+            spec, health = worker.spec, worker.health or {}
+            clusters.append({
+                "cluster_id" : spec.cluster_id,
+                "shards" : [spec.shard_ids[0], spec.shard_ids[-1]],
+                "pid" : worker.process.pid if worker.process else None,
+                "alive" : bool(worker.process and worker.process.is_alive()),
+                "ready" : worker.ready,
+                "restarts" : worker.restarts,
+                "last_report" : None if worker.last_report is None
+                    else round(now - worker.last_report, 1),
+                **{key : value for key, value in health.items()
+                    if key not in ("cluster_id", "pid", "ready", "shards")}
+            })
+        ready = sum(1 for worker in self.workers.values() if worker.ready)
+        return {
+            "status" : "ok" if ready == len(self.workers) else "degraded",
+            "workers" : len(self.workers),
+            "workers_ready" : ready,
+            "guilds" : sum(c.get("guilds", 0) for c in clusters),
+            "clusters" : clusters
+        }
+
+    async def handle(self, request : web.Request) -> web.Response:
+        health = self.get_health()
+        return web.json_response(
+            health, status=200 if health['status'] == "ok" else 503)
@@ -0,0 +1,281 @@
+"""Balance-testing harness for PvE bosses.
+
+Builds synthetic player loadouts from the tables in Vars and simulates them
+against every boss difficulty in a range, spread over a process pool. No
+database connection is made. Run it with
+
+    python -m Utilities.Combat.Balance --levels 10 30 50 --difficulty 60
+
+to write a win-rate table to balance.csv.
+"""
+import argparse
+import csv
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from Utilities import Vars
+from Utilities.AcolyteObject import EmptyAcolyte
+from Utilities.AssociationObject import Association
+from Utilities.Combat import Simulation
+from Utilities.Combat.Belligerent import Boss, CombatPlayer
+from Utilities.ItemObject import Accessory, Armor, Weapon
+from Utilities.PlayerObject import Player
+
+ARMOR_MATERIALS = list(Vars.ARMOR_DEFENSE["Helmet"])
+ACCESSORY_MATERIALS = list(Vars.ACCESSORY_BONUS["Lucky"])
+
+CSV_COLUMNS = (
+    "loadout", "level", "occupation", "difficulty", "battles", "win_rate",
+    "mean_turns", "mean_hp_left"
+)
+
+
+class Loadout:
+    """A synthetic player build. Only plain values are stored so that
+    loadouts can be sent to worker processes.
+
+    Parameters
+    ----------
+    name : str
+        a label for the loadout in the output
+    level : int
+        the player's level
+    occupation : str, optional
+        a key of Vars.OCCUPATIONS, by default None
+    origin : str, optional
+        a key of Vars.ORIGINS, by default "Aramithea"
+    weapon_type : str, optional
+        one of Vars.WEAPON_TYPES, by default "Spear"
+    weapon_attack, weapon_crit : int, optional
+        the weapon's stats, by default 20 and 0
+    armor : str, optional
+        a material in Vars.ARMOR_DEFENSE worn in every slot, or None
+    accessory_prefix, accessory_material : str, optional
+        keys of Vars.ACCESSORY_BONUS, or None for no accessory
+    """
+    def __init__(self,
+            name: str,
+            level: int,
+            occupation: str = None,
+            origin: str = "Aramithea",
+            weapon_type: str = "Spear",
+            weapon_attack: int = 20,
+            weapon_crit: int = 0,
+            armor: Optional[str] = None,
+            accessory_prefix: Optional[str] = None,
+            accessory_material: Optional[str] = None
+    ):
+        self.name = name
+        self.level = level
+        self.occupation = occupation
+        self.origin = origin
+        self.weapon_type = weapon_type
+        self.weapon_attack = weapon_attack
+        self.weapon_crit = weapon_crit
+        self.armor = armor
+        self.accessory_prefix = accessory_prefix
+        self.accessory_material = accessory_material
+
+    def __repr__(self) -> str:
+        return f"Loadout({self.name}, level {self.level})"
+
+    def to_player(self) -> Player:
+        """Returns an unsaved Player wearing this loadout."""
+        player = Player({
+            'user_id' : None, 'num' : None, 'user_name' : self.name,
+            'xp' : 0, 'equipped_item' : None, 'helmet' : None,
+            'bodypiece' : None, 'boots' : None, 'accessory' : None,
+            'acolyte1' : None, 'acolyte2' : None, 'assc' : None,
+            'guild_rank' : None, 'gold' : 0, 'occupation' : self.occupation,
+            'origin' : self.origin, 'loc' : None, 'pvpwins' : 0,
+            'pvpfights' : 0, 'bosswins' : 0, 'bossfights' : 0,
+            'rubidics' : 0, 'adventure' : None, 'destination' : None,
+            'gravitas' : 0, 'pve_limit' : 0, 'daily_streak' : 0,
+            'last_daily' : None
+        })
+        player.level = self.level
+        player.equipped_item = Weapon({
+            'item_id' : None, 'user_id' : None, 'weapon_name' : "Synthetic",
+            'weapontype' : self.weapon_type, 'attack' : self.weapon_attack,
+            'crit' : self.weapon_crit
+        })
+        for slot in ("Helmet", "Bodypiece", "Boots"):
+            armor = Armor() if self.armor is None else Armor({
+                'armor_id' : None, 'armor_type' : self.armor,
+                'armor_slot' : slot, 'user_id' : None
+            })
+            setattr(player, slot.lower(), armor)
+        player.accessory = Accessory() if self.accessory_prefix is None \
+            else Accessory({
+                'accessory_id' : None,
+                'accessory_type' : self.accessory_material,
+                'accessory_name' : "Synthetic", 'user_id' : None,
+                'prefix' : self.accessory_prefix
+            })
+        player.acolyte1 = EmptyAcolyte()
+        player.acolyte2 = EmptyAcolyte()
+        player.assc = Association()
+        player.resources = {}
+        return player
+
+    def to_belligerent(self) -> CombatPlayer:
+        return CombatPlayer(self.to_player())
+
+
+def default_loadouts(levels: Iterable[int]) -> List[Loadout]:
+    """Returns one loadout per occupation at each level given. Gear is scaled
+    with level: weapon ATK rises to the 150 cap at level 65, and armor moves
+    up the material list to its end at level 100.
+    """
+    loadouts = []
+    for level in levels:
+        weapon_attack = min(150, 20 + 2 * level)
+        armor = ARMOR_MATERIALS[
+            min(len(ARMOR_MATERIALS) - 1, level * len(ARMOR_MATERIALS) // 100)]
+        for occupation, info in Vars.OCCUPATIONS.items():
+            if occupation is None:
+                continue
+            weapon_type = info['weapon_bonus'][0] \
+                if info['weapon_bonus'] else "Spear"
+            loadouts.append(Loadout(
+                f"{occupation}-{level}", level, occupation,
+                weapon_type=weapon_type, weapon_attack=weapon_attack,
+                weapon_crit=10, armor=armor))
+    return loadouts
+
+
+def _run_cell(loadout: Loadout, difficulty: int, n: int, seed: int,
+        vectorized: Optional[bool]) -> dict:
+    """Simulate one loadout against one boss. Runs in a worker process."""
+    random.seed(seed)  # The scalar engine draws from `random`
+    player = loadout.to_belligerent()
+    result = Simulation.simulate(
+        player, Boss(difficulty), n, vectorized=vectorized, seed=seed)
+    wins = result.winners == 0
+    return {
+        "loadout" : loadout.name,
+        "level" : loadout.level,
+        "occupation" : loadout.occupation,
+        "difficulty" : difficulty,
+        "battles" : n,
+        "win_rate" : result.win_rate,
+        "mean_turns" : float(result.turns.mean()),
+        "mean_hp_left" : float(result.hp1[wins].mean()) if wins.any() else 0.0
+    }
+
+
+def sweep(
+        loadouts: List[Loadout],
+        difficulties: Iterable[int],
+        n: int = 1000,
+        workers: Optional[int] = None,
+        seed: Optional[int] = None,
+        vectorized: Optional[bool] = None
+) -> List[dict]:
+    """Simulate every loadout against every boss difficulty.
+
+    Parameters
+    ----------
+    loadouts : List[Loadout]
+        the player builds to test
+    difficulties : Iterable[int]
+        the boss levels to test against
+    n : int, optional
+        battles per loadout and difficulty, by default 1000
+    workers : Optional[int], optional
+        size of the process pool, by default the number of CPUs
+    seed : Optional[int], optional
+        seed from which each cell's seed is derived
+    vectorized : Optional[bool], optional
+        passed on to `Simulation.simulate`
+
+    Returns
+    -------
+    List[dict]
+        one row per loadout and difficulty, with the keys in CSV_COLUMNS
+
+    Raises
+    ------
+    RuntimeError
+        naming the loadout and difficulty of a cell whose simulation failed
+    """
+    cells = [(l, d) for l in loadouts for d in difficulties]
+    seeds = [int(s.generate_state(1)[0])
+        for s in np.random.SeedSequence(seed).spawn(len(cells))]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_run_cell, loadout, difficulty, n, s, vectorized)
+            for (loadout, difficulty), s in zip(cells, seeds)]
+        rows = []
+        for (loadout, difficulty), future in zip(cells, futures):
+            try:
+                rows.append(future.result())
+            except Exception as e:
+                raise RuntimeError(f"Simulating {loadout.name} against "
+                    f"difficulty {difficulty} failed.") from e
+        return rows
+
+
+def write_csv(rows: List[dict], path: str):
+    """Write sweep results with one row per loadout and difficulty."""
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_matrix_csv(rows: List[dict], path: str):
+    """Write sweep win rates as a matrix of loadouts by difficulty."""
+    difficulties = sorted({row["difficulty"] for row in rows})
+    matrix = {}
+    for row in rows:
+        matrix.setdefault(row["loadout"], {})[row["difficulty"]] = \
+            row["win_rate"]
+
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["loadout"] + difficulties)
+        for loadout, win_rates in matrix.items():
+            writer.writerow(
+                [loadout] + [win_rates.get(d, "") for d in difficulties])
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Simulate player loadouts against PvE bosses.")
+    parser.add_argument("--levels", type=int, nargs="+", default=[10, 30, 50],
+        help="player levels to build a loadout per occupation for")
+    parser.add_argument("--difficulty", type=int, default=50,
+        help="test boss levels 1 through this value")
+    parser.add_argument("-n", "--battles", type=int, default=1000,
+        help="battles per loadout and boss level")
+    parser.add_argument("--workers", type=int, default=None,
+        help="worker processes, by default one per CPU")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--scalar", action="store_true",
+        help="run every battle through CombatEngine itself")
+    parser.add_argument("--matrix", action="store_true",
+        help="write a loadout by difficulty win-rate matrix instead")
+    parser.add_argument("-o", "--output", default="balance.csv")
+    args = parser.parse_args(argv)
+
+    rows = sweep(
+        default_loadouts(args.levels),
+        range(1, args.difficulty + 1),
+        n=args.battles,
+        workers=args.workers,
+        seed=args.seed,
+        vectorized=False if args.scalar else None)
+    if args.matrix:
+        write_matrix_csv(rows, args.output)
+    else:
+        write_csv(rows, args.output)
+    print(f"Wrote {len(rows)} results to {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 import random
 
-from typing import Set, Optional, TYPE_CHECKING
+from typing import Dict, Set, Optional, TYPE_CHECKING
 if TYPE_CHECKING:
     from asyncpg import Connection
     from Utilities.Combat.Effects import BaseStatus
@@ -11,6 +11,7 @@ if TYPE_CHECKING:
 from Utilities import PlayerObject, Vars
 from Utilities.AcolyteObject import EmptyAcolyte
 from Utilities.AssociationObject import Association
+from Utilities.Combat.Hooks import Event, resolve_hooks
 from Utilities.ItemObject import Accessory, Weapon, Armor
 
 class Belligerent(ABC):
@@ -25,6 +26,8 @@ class Belligerent(ABC):
         turn in combat, before being reset to 1000
     self.status: Set[BaseStatus]
         a collection of the status effects applied to the Belligerent
+    self.hooks: Dict[Event, list]
+        the acolyte hooks that apply to the Belligerent, by event
     """
     @abstractmethod
     def __init__(self, 
@@ -55,6 +58,7 @@ class Belligerent(ABC):
         self.cooldown = 1000
         self.armor_pen = armor_pen
         self.status: Set[BaseStatus] = set()
+        self.hooks = {}
 
         # Related Objects - initialized in subclass
         self.weapon: Weapon
@@ -155,30 +159,22 @@ class CombatPlayer(Belligerent):
         self.player = player
         
         occupation = player.occupation
-        attack = player.get_attack()
-        crit_rate = player.get_crit_rate()
-        crit_damage = player.get_crit_damage()
-        hp = player.get_hp()
-        defense = player.get_defense()
-        speed = player.get_speed()
-        armor_pen = player.get_armor_pen()
-
-        # ON_PLAYER_LOAD event lol
-        try:
-            arsaces = player.get_acolyte("Arsaces")
-            attack += crit_rate * arsaces.get_effect_modifier(0)
-            hp += crit_rate * arsaces.get_effect_modifier(1)
-            crit_rate = 0
-        except AttributeError:
-            pass
-
-        try:
-            cheez = player.get_acolyte("Cheez")
-            crit_damage += int(crit_rate * cheez.get_effect_modifier(0) / 100)
-        except AttributeError:
-            pass
-
-        super().__init__(player.char_name, occupation, attack, crit_rate, crit_damage, hp, defense, speed, armor_pen) 
+        stats = {
+            "attack" : player.get_attack(),
+            "crit_rate" : player.get_crit_rate(),
+            "crit_damage" : player.get_crit_damage(),
+            "hp" : player.get_hp(),
+            "defense" : player.get_defense(),
+            "speed" : player.get_speed(),
+            "armor_pen" : player.get_armor_pen()
+        }
+
+        hooks = resolve_hooks((player.acolyte1, player.acolyte2))
+        for hook, acolyte in hooks.pop(Event.ON_PLAYER_LOAD, ()):
+            hook(acolyte, stats)
+
+        super().__init__(player.char_name, occupation, **stats)
+        self.hooks = hooks
         self.is_player = True
 
         # Initialize objs
@@ -0,0 +1,124 @@
+"""Allocation and timing benchmark for CombatEngine turns.
+
+Plays a synthetic player loadout against a boss through the scalar engine,
+choosing actions with `recommend_action` as automated battles do, until the
+given number of turns has been played. No database connection is made. Run
+it with
+
+    python -m Utilities.Combat.Benchmark --turns 100000
+
+to print the best time taken per turn over a few runs, and the memory and
+allocations held by each CombatTurn as measured by tracemalloc. Every turn
+is kept alive for the memory measurement so that their size is not hidden
+by reuse of freed blocks. To compare with another revision, check it out
+with `git worktree add` and run this file from there.
+"""
+import argparse
+import random
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+from Utilities.Combat.Balance import Loadout
+from Utilities.Combat.Belligerent import Boss
+from Utilities.Combat.CombatEngine import CombatEngine
+from Utilities.Combat.CombatTurn import CombatTurn
+
+
+def play(turns : int, loadout : Loadout, difficulty : int,
+        keep : Optional[List[CombatTurn]] = None) -> int:
+    """Play battles until at least `turns` turns have been played, appending
+    each CombatTurn to `keep` if given. Returns the number of turns played.
+    """
+    played = 0
+    while played < turns:
+        engine, result = CombatEngine.initialize(
+            loadout.to_belligerent(), Boss(difficulty))
+        while engine:
+            action = engine.recommend_action(engine.actor, result)[0]
+            result = engine.process_turn(action)
+            played += 1
+            if keep is not None:
+                keep.append(result)
+    return played
+
+
+def benchmark(turns : int = 100000, level : int = 30,
+        occupation : str = "Hunter", difficulty : int = 12,
+        repeat : int = 3, seed : Optional[int] = 0) -> Dict[str, float]:
+    """Time and trace `turns` turns of a level `level` player against a
+    boss of the given difficulty.
+
+    Parameters
+    ----------
+    turns : int, optional
+        the turns to play for each measurement, by default 100000
+    level : int, optional
+        the player's level, by default 30
+    occupation : str, optional
+        the player's occupation, by default "Hunter"
+    difficulty : int, optional
+        the boss's difficulty, by default 12
+    repeat : int, optional
+        the timed runs, of which the fastest is kept, by default 3
+    seed : Optional[int], optional
+        seed for the battles played, by default 0
+
+    Returns
+    -------
+    Dict[str, float]
+        the least µs taken per turn, the bytes and allocated blocks held per
+        turn kept, and the peak KiB traced
+    """
+    loadout = Loadout("Benchmark", level, occupation, armor="Iron")
+
+    timings = []
+    for _ in range(repeat):
+        random.seed(seed)
+        start = time.perf_counter()
+        played = play(turns, loadout, difficulty)
+        timings.append(time.perf_counter() - start)
+    result = {"turns" : played, "us_per_turn" : min(timings) / played * 10**6}
+
+    random.seed(seed)
+    kept = []
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        play(turns, loadout, difficulty, kept)
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    held = after.compare_to(before, "filename")
+    result["bytes_per_turn"] = sum(d.size_diff for d in held) / len(kept)
+    result["blocks_per_turn"] = sum(d.count_diff for d in held) / len(kept)
+    result["peak_kib"] = peak / 1024
+    return result
+
+
+def main(argv : Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Time and trace the allocations of combat turns.")
+    parser.add_argument("--turns", type=int, default=100000,
+        help="turns to play for each measurement")
+    parser.add_argument("--level", type=int, default=30)
+    parser.add_argument("--occupation", default="Hunter")
+    parser.add_argument("--difficulty", type=int, default=12,
+        help="the level of the boss fought")
+    parser.add_argument("--repeat", type=int, default=3,
+        help="timed runs, of which the fastest is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    result = benchmark(args.turns, args.level, args.occupation,
+        args.difficulty, args.repeat, args.seed)
+    print(f"{result['turns']} turns")
+    print(f"{result['us_per_turn']:.1f} µs per turn")
+    print(f"{result['bytes_per_turn']:.0f} bytes in "
+        f"{result['blocks_per_turn']:.1f} blocks held per turn")
+    print(f"{result['peak_kib']:.0f} KiB peak while tracing")
+
+
+if __name__ == "__main__":
+    main()
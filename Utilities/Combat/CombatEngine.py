@@ -4,10 +4,11 @@ import random
 from typing import List, Tuple, Dict, Optional
 
 from Utilities import PlayerObject, Vars
-from Utilities.Combat import Effects
+from Utilities.Combat import Effects, Hooks
 from Utilities.Combat.Action import Action
 from Utilities.Combat.Belligerent import Belligerent
 from Utilities.Combat.CombatTurn import CombatTurn
+from Utilities.Combat.Modifier import Source
 
 
 class CombatEngine:
@@ -97,8 +98,9 @@ class CombatEngine:
                 atk_dmg = random.randint(
                     self.actor.attack * 3 // 4, self.actor.attack * 5 // 4
                 )
-                result.attacks["Attack"].magnitude += atk_dmg
-                result.attacks["Attack"].multiplier += 1
+                attack = result.attacks[Source.ATTACK]
+                attack.magnitude += atk_dmg
+                attack.multiplier += 1
 
                 # Punish attacking an enemy that blocks
                 if any(isinstance(x, Effects.Brace) for x in target.status):
@@ -106,8 +108,8 @@ class CombatEngine:
                         self.target.attack * 3 // 16, 
                         self.target.attack * 5 // 16
                     )
-                    result.damages["Deflection"].magnitude = deflection
-                    result.damages["Deflection"].multiplier = 1
+                    result.damages[Source.DEFLECTION].magnitude = deflection
+                    result.damages[Source.DEFLECTION].multiplier = 1
             case Action.BRACE:
                 brace = Effects.Brace(actor)
                 actor.status.add(brace)
@@ -116,8 +118,9 @@ class CombatEngine:
                 atk_dmg = random.randint(
                     actor.attack * 3 // 4, actor.attack * 5 // 4
                 )
-                result.attacks["Attack"].magnitude += atk_dmg
-                result.attacks["Attack"].multiplier += 1
+                attack = result.attacks[Source.ATTACK]
+                attack.magnitude += atk_dmg
+                attack.multiplier += 1
 
                 def_break = Effects.Break(25, target=target, duration=2)
                 target.status.add(def_break)
@@ -128,8 +131,8 @@ class CombatEngine:
                 slow.on_application()
             case Action.HEAL:
                 heal = self.actor.max_hp * .2
-                result.heals["Heal"].magnitude += heal
-                result.heals["Heal"].multiplier += 1
+                result.heals[Source.HEAL].magnitude += heal
+                result.heals[Source.HEAL].multiplier += 1
             case Action.BIDE:
                 bide = Effects.Bide(actor)
                 actor.status.add(bide)
@@ -149,9 +152,9 @@ class CombatEngine:
 
         # Calculate final damage
         if self.turn >= self.turn_limit:
-            result.damages["Decay"].magnitude = 100
+            result.damages[Source.DECAY].magnitude = 100
             mult = 1 + ((self.turn - self.turn_limit) / 10)**2
-            result.damages["Decay"].multiplier = mult
+            result.damages[Source.DECAY].multiplier = mult
             
             for source in result.heals:
                 result.heals[source].multiplier /= 5
@@ -210,8 +213,8 @@ class CombatEngine:
         # Brace: Scale with low HP and high enemy HP
         weights[Action.BRACE] = max(30, 100 - (75*x)**(1/2))  # [30, 100]
 
-        # Thrust: Scale with high enemy DEF
-        weights[Action.THRUST] = 4 * (target.defense)**(1/2)  # [0, 40]
+        # Thrust: Scale with high enemy DEF, which breaks can make negative
+        weights[Action.THRUST] = 4 * max(target.defense, 0)**(1/2)  # [0, 40]
 
         # Heal: Scale with low HP
         if x >= 80:  # Heal is 20% so don't waste an action here
@@ -264,20 +267,8 @@ class CombatEngine:
         data.is_crit = True
         multiplier = self.actor.crit_damage / 100.0
 
-        # Applicable acolytes: Aulus, Ayesha
-        try:
-            aulus = data.actor.get_acolyte("Aulus")
-            data.actor.attack += aulus.get_effect_modifier(0)
-        except AttributeError:
-            pass
-
-        try:
-            ayesha = data.actor.get_acolyte("Ayesha")
-            heal = self.actor.attack * .01 * ayesha.get_effect_modifier(0)
-            data.heals["Ayesha"].magnitude += heal
-            data.heals["Ayesha"].multiplier += 1
-        except AttributeError:
-            pass
+        # ON_CRIT : Acolyte effects e.g. Aulus, Ayesha
+        self._dispatch(Hooks.Event.ON_CRIT, data.actor, data)
 
         # Accessory Effects
         if data.target.accessory.prefix == "Shiny":  # Reduces crit dmg
@@ -285,63 +276,37 @@ class CombatEngine:
             multiplier *= 1 - r
 
         # Apply crit bonuses
-        data.attacks["Attack"].multiplier += multiplier
+        data.attacks[Source.ATTACK].multiplier += multiplier
+
+    def _dispatch(self, 
+            event: Hooks.Event, 
+            belligerent: Belligerent, 
+            data: CombatTurn
+    ):
+        """Run the belligerent's acolyte hooks for the given event"""
+        for hook, acolyte in belligerent.hooks.get(event, ()):
+            hook(acolyte, data)
 
     def _run_events(self, data: CombatTurn):
         """Apply extra effects (e.g. acolytes) to the turn results"""
         # ON_DAMAGE : Apply to all damage types
         if data.attacks:
-            try:
-                paterius = data.actor.get_acolyte("Paterius")
-                buff = paterius.get_effect_modifier(0) * .01
-                for attack in data.attacks:
-                    data.attacks[attack].multiplier += buff
-                data.attacks["Paterius"].magnitude = 15
-                data.attacks["Paterius"].multiplier = 1
-            except AttributeError:
-                pass
+            self._dispatch(Hooks.Event.ON_DAMAGE, data.actor, data)
 
         # ON_ATTACK : Agent attacks
         if data.turn <= 3 and data.actor.occupation == "Hunter":
-            data.attacks["Attack"].multiplier += 1
+            data.attacks[Source.ATTACK].multiplier += 1
 
         if data.action == Action.ATTACK:
-            try:
-                alia = data.actor.get_acolyte("Alia")
-                buff = Effects.SpeedBoost(
-                    alia.get_effect_modifier(0),
-                    target=data.actor,
-                    duration=2
-                )
-                data.actor.status.add(buff)
-                buff.on_application()
-            except AttributeError:
-                pass
+            self._dispatch(Hooks.Event.ON_ATTACK, data.actor, data)
 
         # ON_BRACE : Agent blocks
         if data.action == Action.BRACE:
-            try:
-                demi = data.actor.get_acolyte("Demi")
-                damage = data.actor.defense * demi.get_effect_modifier(0) * .01
-                data.attacks["Demi"].magnitude = damage
-                data.attacks["Demi"].multiplier = 1
-            except AttributeError:
-                pass 
+            self._dispatch(Hooks.Event.ON_BRACE, data.actor, data)
 
         # ON_THRUST : Agent parries
         if data.action == Action.THRUST:
-            if random.randint(1, 4) == 1:
-                try:
-                    rea = data.actor.get_acolyte("Rea")
-                    bleed = Effects.Bleed(
-                        rea.get_effect_modifier(0),
-                        target=data.target,
-                        duration=3
-                    )
-                    data.target.status.add(bleed)
-                    bleed.on_application()
-                except AttributeError:
-                    pass
+            self._dispatch(Hooks.Event.ON_THRUST, data.actor, data)
 
         # ON_HEAL : Agent heals
         if data.action == Action.HEAL:
@@ -349,13 +314,7 @@ class CombatEngine:
                 for heal in data.heals:
                     data.heals[heal].multiplier += 1
             
-            try:
-                nyleptha = data.actor.get_acolyte("Nyleptha")
-                reduction = nyleptha.get_effect_modifier(0) * .01
-                for damage in data.damages:
-                    data.damages[damage].multiplier -= reduction
-            except AttributeError:
-                pass
+            self._dispatch(Hooks.Event.ON_HEAL, data.actor, data)
                 
         # ON_BIDE : Agent bides
         
@@ -367,55 +326,9 @@ class CombatEngine:
         if data.target.accessory.prefix == "Thorned":
             data.apply()  # TODO: The fact that I have to do this may justify protecting the damage sums with a setter
             d = Vars.ACCESSORY_BONUS["Thorned"][data.target.accessory.type] / 100
-            data.damages["Armor"].magnitude += d
-            data.damages["Armor"].multiplier |= 1  # Set to 1 if 0, else keep
-
-        # ON_COMBAT_END : After everything else has been calculated
-        try:
-            onion = data.actor.get_acolyte("Onion")
-            if self.turn == onion.get_effect_modifier(0):
-                data.actor.crit_rate *= 2
-        except AttributeError:
-            pass
-        try:
-            onion = data.target.get_acolyte("Onion")
-            if self.turn == onion.get_effect_modifier(0):
-                data.target.crit_rate *= 2
-        except AttributeError:
-            pass
-
-        try:
-            ajar = data.actor.get_acolyte("Ajar")
-            data.actor.attack += ajar.get_effect_modifier(1)
-            data.damages["Ajar"].magnitude = ajar.get_effect_modifier(2)
-            data.damages["Ajar"].multiplier = 1
-        except AttributeError:
-            pass
-
-        try:
-            # Lauren: If you take less than x dmg in a turn, increase ATK
-            data.apply()
-            lauren = data.target.get_acolyte("Lauren")
-            if data.attack_total < lauren.get_effect_modifier(1):
-                data.target.attack *= 1 + (lauren.get_effect_modifier(0) * .01)
-        except AttributeError:
-            pass
-
-        try:
-            thorp = data.actor.get_acolyte("Thorp")
-            modifier = 100 + thorp.get_effect_modifier(0)
-            match random.randint(1, 6):
-                case 1:
-                    data.actor.attack = (data.actor.attack * modifier) // 100
-                case 2:
-                    data.actor.crit_rate = (data.actor.crit_rate * modifier) // 100
-                case 3:
-                    data.actor.current_hp = (data.actor.current_hp * modifier) // 100
-                case 4:
-                    data.actor.defense = (data.actor.defense * modifier) // 100
-                case 5:
-                    data.actor.crit_damage = (data.actor.crit_damage * modifier) // 100
-                case 6:
-                    data.actor.speed = (data.actor.speed * modifier) // 100
-        except AttributeError:
-            pass
+            data.damages[Source.ARMOR].magnitude += d
+            data.damages[Source.ARMOR].multiplier |= 1  # Set to 1 if 0, else keep
+
+        # ON_TURN_END : After everything else has been calculated
+        self._dispatch(Hooks.Event.ON_TURN_END, data.actor, data)
+        self._dispatch(Hooks.Event.ON_ENEMY_TURN_END, data.target, data)
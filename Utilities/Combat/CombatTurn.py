@@ -1,10 +1,9 @@
 from __future__ import annotations
 
-from collections import defaultdict
-from typing import Dict, TYPE_CHECKING
+from typing import TYPE_CHECKING
 
 from Utilities.Combat.Action import Action, InvalidAction
-from Utilities.Combat.Modifier import Modifier
+from Utilities.Combat.Modifier import KINDS, ModifierTable
 
 if TYPE_CHECKING:
     from Utilities.Combat.Belligerent import Belligerent
@@ -24,12 +23,15 @@ class CombatTurn:
 
     Attributes
     ----------
-    attacks: defaultdict[str, Modifier]
+    modifiers: List[Optional[Modifier]]
+        the turn's modifiers indexed by Source.index, None for the sources
+        that did not contribute
+    attacks: ModifierTable
         a collection of sources that contributed to the damage dealt by the
         actor to the target
-    heals: defaultdict[str, Modifier]
+    heals: ModifierTable
         a list of sources that contributed to the actor's heals
-    damages: defaultdict[str, Modifier]
+    damages: ModifierTable
         a list of sources that caused damage to the actor this turn
     is_crit: bool
         whether the action this turn was a critical hit
@@ -47,6 +49,11 @@ class CombatTurn:
     Action.InvalidAction
         if the action provided is not one of the `Action.Action`s
     """
+    __slots__ = (
+        "actor", "target", "action", "turn", "modifiers", "is_crit",
+        "attack_total", "heal_total", "damage_total"
+    )
+
     def __init__(
             self, 
             actor: Belligerent, 
@@ -62,9 +69,7 @@ class CombatTurn:
         self.action = action
         self.turn = turn
 
-        self.attacks: Dict[str, Modifier] = defaultdict(Modifier)  # Apply all sources of possible attacks e.g. attack action, acolyte effects, etc
-        self.heals: Dict[str, Modifier] = defaultdict(Modifier)
-        self.damages: Dict[str, Modifier] = defaultdict(Modifier)  # Apply all sources of possible damage at turn start e.g. poison
+        self.modifiers = [None] * len(KINDS)  # Filled in by attacks, heals and damages as sources are applied
 
         self.is_crit = False
         self.attack_total = 0
@@ -83,6 +88,18 @@ class CombatTurn:
     def __repr__(self) -> str:
         return self.__str__()
     
+    @property
+    def attacks(self) -> ModifierTable:  # Apply all sources of possible attacks e.g. attack action, acolyte effects, etc
+        return ModifierTable(self.modifiers, "attacks")
+
+    @property
+    def heals(self) -> ModifierTable:
+        return ModifierTable(self.modifiers, "heals")
+
+    @property
+    def damages(self) -> ModifierTable:  # Apply all sources of possible damage at turn start e.g. poison
+        return ModifierTable(self.modifiers, "damages")
+
     @property
     def description(self):
         def action2sentence(action: Action):
@@ -98,7 +115,7 @@ class CombatTurn:
                 case Action.BIDE:
                     return "bided their time to boost their attack"
                 
-        def breakdown(coll: Dict[str, Modifier]):
+        def breakdown(coll: ModifierTable):
             keys = sorted(coll, key=lambda k: coll[k].final, reverse=True)
             sources = [
                 f"{k} ({int(coll[k].magnitude)}\*{coll[k].multiplier:.2f})"
@@ -125,24 +142,20 @@ class CombatTurn:
         """Set the attack_total, heal_total, and damage_total based on all
         sources in their respective collection.
         """
-        total = 0
-        for modifier in self.attacks.values():
-            modifier.apply()
-            total += modifier.final
+        totals = {"attacks" : 0, "heals" : 0, "damages" : 0}
+        for kind, modifier in zip(KINDS, self.modifiers):
+            if modifier is not None:
+                modifier.apply()
+                totals[kind] += modifier.final
+
+        total = totals["attacks"]
         defense = self.target.defense * (100 - self.actor.armor_pen) / 100
         total *= (100 - defense) / 100
         self.attack_total = int(total)
 
-        total = 0
-        for modifier in self.heals.values():
-            modifier.apply()
-            total += modifier.final
-        self.heal_total = int(total)
+        self.heal_total = int(totals["heals"])
 
-        total = 0
-        for modifier in self.damages.values():
-            modifier.apply()
-            total += modifier.final
+        total = totals["damages"]
         defense = self.actor.defense * (100 - self.target.armor_pen) / 100
         total *= (100 - defense) / 100
         self.damage_total = int(total)
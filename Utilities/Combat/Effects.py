@@ -3,8 +3,7 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING
 
-from Utilities.Combat.Belligerent import Belligerent
-from Utilities.Combat.CombatTurn import CombatTurn
+from Utilities.Combat.Modifier import Source
 
 if TYPE_CHECKING:
     from Utilities.Combat.Belligerent import Belligerent
@@ -19,6 +18,8 @@ class BaseStatus(ABC):
     target : Belligerent
         the belligerent this effect is being applied to
     """
+    __slots__ = ("target", "_counter")
+
     def __init__(self, target: Belligerent, duration: int):
         self.target = target
         self._counter = duration
@@ -63,6 +64,8 @@ class BaseStatus(ABC):
 
 class Brace(BaseStatus):
     """Status effect that raises DEF from Action.BRACE"""
+    __slots__ = ("defense_boost",)
+
     def __init__(self, target: Belligerent):
         super().__init__(target, 2)  # Brace always lasts 2 turns
         self.defense_boost = 25
@@ -83,6 +86,8 @@ class Brace(BaseStatus):
 
 class Bide(BaseStatus):
     """Raise ATK and SPD from Action.BIDE"""
+    __slots__ = ("attack_boost", "speed_boost")
+
     def __init__(self, target: Belligerent):
         super().__init__(target, 2)  # Bide always lasts 2 turns
         self.attack_boost = int(target.base_attack * 1.1)
@@ -112,6 +117,8 @@ class Slow(BaseStatus):
     amount: int
         a flat amount to reduce speed for the duration of the status
     """
+    __slots__ = ("amount",)
+
     def __init__(self, amount: int, **kwargs):
         self.amount = amount
         super().__init__(**kwargs)
@@ -132,6 +139,8 @@ class Slow(BaseStatus):
 
 class Break(BaseStatus):
     """Reduce DEF from Action.THRUST"""
+    __slots__ = ("amount",)
+
     def __init__(self, percentage: int, **kwargs):
         super().__init__(**kwargs)
         self.amount = int(self.target.defense * (percentage / 100))
@@ -152,6 +161,8 @@ class Break(BaseStatus):
 
 class Poison(BaseStatus):
     """Status effect that deals a flat damage to the target each turn."""
+    __slots__ = ("amount",)
+
     def __init__(self, amount: float, **kwargs):
         self.amount = amount
         super().__init__(**kwargs)
@@ -165,7 +176,7 @@ class Poison(BaseStatus):
     
     def on_turn(self, data: CombatTurn):
         damage = data.target.current_hp * self.amount
-        data.damages["Poison"].magnitude += damage
+        data.damages[Source.POISON].magnitude += damage
 
     def on_remove(self):
         return
@@ -173,6 +184,8 @@ class Poison(BaseStatus):
 
 class Bleed(BaseStatus):
     """Deal damage to target based off percent current HP each turn."""
+    __slots__ = ("amount",)
+
     def __init__(self, percentage: int, **kwargs):
         self.amount = percentage / 100
         super().__init__(**kwargs)
@@ -186,8 +199,8 @@ class Bleed(BaseStatus):
     
     def on_turn(self, data: CombatTurn):
         damage = int(data.target.current_hp * self.amount)
-        data.damages["Bleed"].magnitude += damage
-        data.damages["Bleed"].multiplier = 1
+        data.damages[Source.BLEED].magnitude += damage
+        data.damages[Source.BLEED].multiplier = 1
         self.counter -= 1
 
     def on_remove(self):
@@ -196,6 +209,8 @@ class Bleed(BaseStatus):
 
 class SpeedBoost(BaseStatus):
     """Raise SPD by a flat amount for a temporary period"""
+    __slots__ = ("amount",)
+
     def __init__(self, amount: int, **kwargs):
         self.amount = amount
         super().__init__(**kwargs)
@@ -0,0 +1,195 @@
+"""Acolyte effects for the combat engine.
+
+Each acolyte effect is a function registered to an Event with the `hook`
+decorator. Belligerents resolve the hooks of their equipped acolytes once
+when they are created, and the engine only runs the hooks that apply. To add
+an acolyte's combat effect, register a new hook here; the engine does not
+need to change. A hook that adds a new source of attacks, heals or damages
+also needs a member in Modifier.Source.
+"""
+from __future__ import annotations
+
+import random
+from collections import defaultdict
+from enum import Enum
+from typing import Callable, Dict, Iterable, List, Tuple, TYPE_CHECKING
+
+from Utilities.Combat import Effects
+from Utilities.Combat.Modifier import Source
+
+if TYPE_CHECKING:
+    from Utilities.AcolyteObject import EmptyAcolyte
+    from Utilities.Combat.CombatTurn import CombatTurn
+
+
+class Event(Enum):
+    """The points in combat at which acolyte hooks run.
+
+    ON_PLAYER_LOAD hooks take (acolyte, stats) and edit the dict of stats
+    passed to the Belligerent. All other hooks take (acolyte, data) where
+    data is the turn's CombatTurn. ON_ENEMY_TURN_END runs the target's hooks;
+    every other turn event runs the actor's.
+    """
+    ON_PLAYER_LOAD = 0
+    ON_CRIT = 1
+    ON_DAMAGE = 2
+    ON_ATTACK = 3
+    ON_BRACE = 4
+    ON_THRUST = 5
+    ON_HEAL = 6
+    ON_TURN_END = 7
+    ON_ENEMY_TURN_END = 8
+
+
+Hook = Callable[..., None]
+
+# Hooks run in the order they are registered
+_registry: Dict[Event, List[Tuple[str, Hook]]] = defaultdict(list)
+
+def hook(acolyte_name: str, event: Event):
+    """Register the decorated function as the effect of an acolyte."""
+    def decorator(func: Hook) -> Hook:
+        _registry[event].append((acolyte_name, func))
+        return func
+    return decorator
+
+def resolve_hooks(acolytes: Iterable[EmptyAcolyte]
+        ) -> Dict[Event, List[Tuple[Hook, EmptyAcolyte]]]:
+    """Returns the hooks of the given acolytes for each event they affect,
+    paired with the acolyte they belong to.
+    """
+    equipped = {acolyte.name : acolyte for acolyte in acolytes
+        if acolyte.name is not None}
+    hooks = {}
+    for event, registered in _registry.items():
+        applicable = [(func, equipped[name]) for name, func in registered
+            if name in equipped]
+        if applicable:
+            hooks[event] = applicable
+    return hooks
+
+
+# --- ON_PLAYER_LOAD ---
+
+@hook("Arsaces", Event.ON_PLAYER_LOAD)
+def arsaces(acolyte: EmptyAcolyte, stats: dict):
+    stats["attack"] += stats["crit_rate"] * acolyte.get_effect_modifier(0)
+    stats["hp"] += stats["crit_rate"] * acolyte.get_effect_modifier(1)
+    stats["crit_rate"] = 0
+
+@hook("Cheez", Event.ON_PLAYER_LOAD)
+def cheez(acolyte: EmptyAcolyte, stats: dict):
+    stats["crit_damage"] += int(
+        stats["crit_rate"] * acolyte.get_effect_modifier(0) / 100)
+
+
+# --- ON_CRIT ---
+
+@hook("Aulus", Event.ON_CRIT)
+def aulus(acolyte: EmptyAcolyte, data: CombatTurn):
+    data.actor.attack += acolyte.get_effect_modifier(0)
+
+@hook("Ayesha", Event.ON_CRIT)
+def ayesha(acolyte: EmptyAcolyte, data: CombatTurn):
+    heal = data.actor.attack * .01 * acolyte.get_effect_modifier(0)
+    data.heals[Source.AYESHA].magnitude += heal
+    data.heals[Source.AYESHA].multiplier += 1
+
+
+# --- ON_DAMAGE : Apply to all damage types ---
+
+@hook("Paterius", Event.ON_DAMAGE)
+def paterius(acolyte: EmptyAcolyte, data: CombatTurn):
+    buff = acolyte.get_effect_modifier(0) * .01
+    for attack in data.attacks:
+        data.attacks[attack].multiplier += buff
+    data.attacks[Source.PATERIUS].magnitude = 15
+    data.attacks[Source.PATERIUS].multiplier = 1
+
+
+# --- ON_ATTACK : Agent attacks ---
+
+@hook("Alia", Event.ON_ATTACK)
+def alia(acolyte: EmptyAcolyte, data: CombatTurn):
+    buff = Effects.SpeedBoost(
+        acolyte.get_effect_modifier(0),
+        target=data.actor,
+        duration=2
+    )
+    data.actor.status.add(buff)
+    buff.on_application()
+
+
+# --- ON_BRACE : Agent blocks ---
+
+@hook("Demi", Event.ON_BRACE)
+def demi(acolyte: EmptyAcolyte, data: CombatTurn):
+    damage = data.actor.defense * acolyte.get_effect_modifier(0) * .01
+    data.attacks[Source.DEMI].magnitude = damage
+    data.attacks[Source.DEMI].multiplier = 1
+
+
+# --- ON_THRUST : Agent parries ---
+
+@hook("Rea", Event.ON_THRUST)
+def rea(acolyte: EmptyAcolyte, data: CombatTurn):
+    if random.randint(1, 4) == 1:
+        bleed = Effects.Bleed(
+            acolyte.get_effect_modifier(0),
+            target=data.target,
+            duration=3
+        )
+        data.target.status.add(bleed)
+        bleed.on_application()
+
+
+# --- ON_HEAL : Agent heals ---
+
+@hook("Nyleptha", Event.ON_HEAL)
+def nyleptha(acolyte: EmptyAcolyte, data: CombatTurn):
+    reduction = acolyte.get_effect_modifier(0) * .01
+    for damage in data.damages:
+        data.damages[damage].multiplier -= reduction
+
+
+# --- ON_TURN_END : After everything else has been calculated ---
+
+@hook("Onion", Event.ON_TURN_END)
+def onion(acolyte: EmptyAcolyte, data: CombatTurn):
+    if data.turn == acolyte.get_effect_modifier(0):
+        data.actor.crit_rate *= 2
+
+@hook("Onion", Event.ON_ENEMY_TURN_END)
+def onion_targeted(acolyte: EmptyAcolyte, data: CombatTurn):
+    if data.turn == acolyte.get_effect_modifier(0):
+        data.target.crit_rate *= 2
+
+@hook("Ajar", Event.ON_TURN_END)
+def ajar(acolyte: EmptyAcolyte, data: CombatTurn):
+    data.actor.attack += acolyte.get_effect_modifier(1)
+    data.damages[Source.AJAR].magnitude = acolyte.get_effect_modifier(2)
+    data.damages[Source.AJAR].multiplier = 1
+
+@hook("Lauren", Event.ON_ENEMY_TURN_END)
+def lauren(acolyte: EmptyAcolyte, data: CombatTurn):
+    # If you take less than x dmg in a turn, increase ATK
+    data.apply()
+    if data.attack_total < acolyte.get_effect_modifier(1):
+        data.target.attack *= 1 + (acolyte.get_effect_modifier(0) * .01)
+
+@hook("Thorp", Event.ON_TURN_END)
+def thorp(acolyte: EmptyAcolyte, data: CombatTurn):
+    modifier = 100 + acolyte.get_effect_modifier(0)
+    match random.randint(1, 6):
+        case 1:
+            data.actor.attack = (data.actor.attack * modifier) // 100
+        case 2:
+            data.actor.crit_rate = (data.actor.crit_rate * modifier) // 100
+        case 3:
+            data.actor.current_hp = (data.actor.current_hp * modifier) // 100
+        case 4:
+            data.actor.defense = (data.actor.defense * modifier) // 100
+        case 5:
+            data.actor.crit_damage = (data.actor.crit_damage * modifier) // 100
+        case 6:
+            data.actor.speed = (data.actor.speed * modifier) // 100
@@ -1,8 +1,98 @@
+from enum import Enum
+from typing import Iterator, List, Optional
+
+
 class Modifier:
+    __slots__ = ("magnitude", "multiplier", "final")
+
     def __init__(self, magnitude: int = 0, multiplier: float = 0) -> None:
         self.magnitude = magnitude
         self.multiplier = multiplier
         self.final = 0
-    
+
     def apply(self):
-        self.final = int(self.magnitude * self.multiplier)
\ No newline at end of file
+        self.final = int(self.magnitude * self.multiplier)
+
+
+class Source(Enum):
+    """The sources of a CombatTurn's modifiers. Each is shown in the turn's
+    description by its name, and adds to only one of the turn's attacks,
+    heals or damages. A hook or status effect that modifies a turn in a new
+    way needs a member here.
+    """
+    ATTACK = ("Attack", "attacks")
+    PATERIUS = ("Paterius", "attacks")
+    DEMI = ("Demi", "attacks")
+    HEAL = ("Heal", "heals")
+    AYESHA = ("Ayesha", "heals")
+    DEFLECTION = ("Deflection", "damages")
+    DECAY = ("Decay", "damages")
+    ARMOR = ("Armor", "damages")
+    POISON = ("Poison", "damages")
+    BLEED = ("Bleed", "damages")
+    AJAR = ("Ajar", "damages")
+
+    def __init__(self, label: str, kind: str):
+        self.label = label
+        self.kind = kind
+        self.index = len(self.__class__.__members__)
+
+    def __str__(self) -> str:
+        return self.label
+
+
+class ModifierTable:
+    """The attacks, heals or damages of a CombatTurn, by Source.
+
+    The turn keeps one Modifier slot per Source, and a table is a view of
+    the slots of one kind. Reading a source that has not been set creates
+    its Modifier, as a defaultdict would; iterating yields only the sources
+    that have been set.
+
+    Parameters
+    ----------
+    modifiers : List[Optional[Modifier]]
+        the turn's modifiers, indexed by Source.index
+    kind : str
+        one of "attacks", "heals" or "damages"
+    """
+    __slots__ = ("_modifiers", "_sources")
+
+    def __init__(self, modifiers: List[Optional[Modifier]], kind: str):
+        self._modifiers = modifiers
+        self._sources = SOURCES[kind]
+
+    def __getitem__(self, source: Source) -> Modifier:
+        if source not in self._sources:
+            raise KeyError(source)
+        modifier = self._modifiers[source.index]
+        if modifier is None:
+            modifier = self._modifiers[source.index] = Modifier()
+        return modifier
+
+    def __iter__(self) -> Iterator[Source]:
+        modifiers = self._modifiers
+        return (s for s in self._sources if modifiers[s.index] is not None)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __bool__(self) -> bool:
+        for source in self._sources:
+            if self._modifiers[source.index] is not None:
+                return True
+        return False
+
+    def __repr__(self) -> str:
+        return repr({
+            s.label : (self[s].magnitude, self[s].multiplier) for s in self})
+
+    def values(self) -> Iterator[Modifier]:
+        return (self._modifiers[s.index] for s in self)
+
+
+SOURCES = {
+    kind : tuple(s for s in Source if s.kind == kind)
+    for kind in ("attacks", "heals", "damages")
+}
+KINDS = tuple(s.kind for s in Source)  # Indexed by Source.index
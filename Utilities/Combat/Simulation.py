@@ -0,0 +1,314 @@
+import copy
+from typing import Dict, Optional
+
+import numpy as np
+
+from Utilities import Vars
+from Utilities.Combat.Action import Action
+from Utilities.Combat.Belligerent import Belligerent
+from Utilities.Combat.CombatEngine import CombatEngine
+
+# Column order of the weights in CombatEngine.recommend_action
+ATTACK, BRACE, THRUST, HEAL, BIDE = range(5)
+
+
+class SimulationResult:
+    """The outcome of a batch of simulated battles.
+
+    Parameters
+    ----------
+    winners : np.ndarray
+        for each battle, 0 if player1 won and 1 if player2 won
+    turns : np.ndarray
+        the number of turns each battle lasted
+    hp1, hp2 : np.ndarray
+        the HP each combatant had remaining at the end of each battle. The
+        loser's HP will be 0 or lower.
+    max_hp1, max_hp2 : int
+        the max HP of each combatant
+    """
+    def __init__(self,
+            winners: np.ndarray,
+            turns: np.ndarray,
+            hp1: np.ndarray,
+            hp2: np.ndarray,
+            max_hp1: int,
+            max_hp2: int
+    ):
+        self.winners = winners
+        self.turns = turns
+        self.hp1 = hp1
+        self.hp2 = hp2
+        self.max_hp1 = max_hp1
+        self.max_hp2 = max_hp2
+
+    def __len__(self):
+        return len(self.winners)
+
+    def __str__(self) -> str:
+        return (
+            f"{len(self)} battles: P1 {self.win_rate:.2%} / "
+            f"P2 {1 - self.win_rate:.2%}, "
+            f"mean {self.turns.mean():.1f} turns"
+        )
+
+    @property
+    def win_rate(self) -> float:
+        """The fraction of battles won by player1."""
+        return float(np.mean(self.winners == 0))
+
+    def turn_distribution(self) -> Dict[int, float]:
+        """Returns the fraction of battles that ended on each turn count."""
+        counts = np.bincount(self.turns)
+        return {
+            turn : count / len(self)
+            for turn, count in enumerate(counts) if count
+        }
+
+    def hp_histogram(self, player: int = 1, bins: int = 10):
+        """Returns a histogram of the HP player 1 or 2 had left in the battles
+        they won, as `np.histogram` does: (counts, bin_edges).
+        """
+        hp, max_hp = (self.hp1, self.max_hp1) if player == 1 \
+            else (self.hp2, self.max_hp2)
+        won = hp[self.winners == player - 1]
+        return np.histogram(won, bins=bins, range=(0, max_hp))
+
+
+def is_vectorizable(belligerent: Belligerent) -> bool:
+    """Returns whether the batched simulation can model this combatant.
+    Acolyte hooks and existing status effects need the scalar engine.
+    """
+    return not belligerent.status and not belligerent.hooks
+
+
+def simulate(
+        player1: Belligerent,
+        player2: Belligerent,
+        n: int = 1000,
+        turn_limit: int = 50,
+        vectorized: Optional[bool] = None,
+        seed: Optional[int] = None
+) -> SimulationResult:
+    """Run `n` independent battles between two combatants, with both sides
+    choosing actions through `CombatEngine.recommend_action`. The combatants
+    passed are not modified.
+
+    Parameters
+    ----------
+    player1, player2 : Belligerent
+        the combatants, in the same order they would be passed to the engine
+    n : int, optional
+        the number of battles to run, by default 1000
+    turn_limit : int, optional
+        the engine's turn limit, by default 50
+    vectorized : Optional[bool], optional
+        True to force the batched path, False to force the scalar path. By
+        default the batched path is used whenever both combatants support it
+    seed : Optional[int], optional
+        seed for the batched path's random number generator
+
+    Returns
+    -------
+    SimulationResult
+
+    Raises
+    ------
+    ValueError
+        if the batched path is forced for combatants it cannot model
+    """
+    supported = is_vectorizable(player1) and is_vectorizable(player2)
+    if vectorized and not supported:
+        raise ValueError("These combatants need the scalar simulation.")
+    if vectorized is None:
+        vectorized = supported
+
+    if vectorized:
+        rng = np.random.default_rng(seed)
+        return simulate_batched(player1, player2, n, turn_limit, rng)
+    return simulate_scalar(player1, player2, n, turn_limit)
+
+
+def simulate_scalar(
+        player1: Belligerent,
+        player2: Belligerent,
+        n: int,
+        turn_limit: int = 50
+) -> SimulationResult:
+    """Run each battle through CombatEngine itself on copies of the
+    combatants. Supports everything the engine does.
+    """
+    winners = np.empty(n, dtype=np.int8)
+    turns = np.empty(n, dtype=np.int64)
+    hp1 = np.empty(n)
+    hp2 = np.empty(n)
+
+    for i in range(n):
+        p1, p2 = copy.deepcopy(player1), copy.deepcopy(player2)
+        engine, results = CombatEngine.initialize(p1, p2, turn_limit)
+        while engine:
+            action = engine.recommend_action(engine.actor, results)[0]
+            results = engine.process_turn(action)
+
+        winners[i] = 0 if engine.get_victor() is p1 else 1
+        turns[i] = engine.turn
+        hp1[i] = p1.current_hp
+        hp2[i] = p2.current_hp
+
+    return SimulationResult(
+        winners, turns, hp1, hp2, player1.max_hp, player2.max_hp)
+
+
+def simulate_batched(
+        player1: Belligerent,
+        player2: Belligerent,
+        n: int,
+        turn_limit: int,
+        rng: np.random.Generator
+) -> SimulationResult:
+    """Advance all `n` battles together, one turn per array step.
+
+    This reproduces the rules of `CombatEngine.process_turn` for combatants
+    without acolyte hooks. Since the engine resets the cooldown of both
+    combatants every turn, turns strictly alternate after the faster
+    combatant moves first, so every battle shares the same actor each step.
+    Statuses are tracked as follows:
+
+    - Brace and Bide last until their owner's next turn, so each is a flag
+      that is set by the owner's action that turn.
+    - Each Break lasts through two of its target's turns, so a target holds
+      at most a fresh and an expiring Break.
+    - Slow and the Bide speed boost only affect speed, which no longer
+      matters after the first turn is decided.
+    """
+    # Per-combatant constants, shaped (2, 1) to broadcast against battles
+    def stat(name):
+        return np.array(
+            [[getattr(player1, name)], [getattr(player2, name)]], dtype=float)
+
+    attack = stat("attack")
+    bide_boost = np.array([
+        [int(player1.base_attack * 1.1)], [int(player2.base_attack * 1.1)]])
+    crit_rate = stat("crit_rate")
+    base_defense = stat("defense")
+    armor_pen = stat("armor_pen")
+    max_hp = stat("max_hp")
+    occupations = (player1.occupation, player2.occupation)
+
+    crit_mult = stat("crit_damage") / 100.0
+    for side, (actor, target) in enumerate(
+            ((player1, player2), (player2, player1))):
+        if target.accessory.prefix == "Shiny":
+            r = Vars.ACCESSORY_BONUS["Shiny"][target.accessory.type] / 100
+            crit_mult[side] *= 1 - r
+
+    # Per-battle state
+    ids = np.arange(n)
+    hp = np.repeat(stat("current_hp"), n, axis=1)
+    brace = np.zeros((2, n), dtype=bool)
+    bide = np.zeros((2, n), dtype=bool)
+    fresh_break = np.zeros((2, n))
+    old_break = np.zeros((2, n))
+
+    # Results
+    winners = np.empty(n, dtype=np.int8)
+    turns = np.empty(n, dtype=np.int64)
+    final_hp = np.empty((2, n))
+
+    first = 0 if (player1.cooldown / player1.speed
+        <= player2.cooldown / player2.speed) else 1
+    turn = 0
+    while ids.size:
+        turn += 1
+        a = first if turn % 2 else 1 - first
+        b = 1 - a
+        m = ids.size
+        defense = base_defense + 25 * brace - fresh_break - old_break
+
+        # Choose actions as recommend_action does
+        x = hp[a] / max_hp[a] * 100
+        y = hp[b] / max_hp[b] * 100
+        weights = np.empty((m, 5))
+        weights[:, ATTACK] = np.maximum(30, x * y / 100)
+        weights[:, BRACE] = np.maximum(30, 100 - np.sqrt(75 * x))
+        weights[:, THRUST] = 4 * np.sqrt(np.maximum(defense[b], 0))
+        weights[:, HEAL] = np.where(
+            x >= 80, 0, 100 / (np.sqrt(np.abs(x - 10)) + 1))
+        weights[:, BIDE] = (x * y / 100) / 3
+        cum_weights = np.cumsum(weights, axis=1)
+        roll = rng.random(m) * cum_weights[:, -1]
+        action = (cum_weights <= roll[:, None]).sum(axis=1)
+
+        strikes = (action == ATTACK) | (action == THRUST)
+        heals = action == HEAL
+
+        # Raw damage
+        atk = attack[a] + bide_boost[a] * bide[a]
+        damage = rng.integers(
+            (atk * 3 // 4).astype(np.int64), 
+            (atk * 5 // 4).astype(np.int64) + 1) * strikes
+
+        deflects = (action == ATTACK) & brace[b]
+        target_atk = attack[b] + bide_boost[b] * bide[b]
+        deflection = rng.integers(
+            (target_atk * 3 // 16).astype(np.int64), 
+            (target_atk * 5 // 16).astype(np.int64) + 1) * deflects
+
+        # Thrust breaks the target's current defense
+        thrusts = action == THRUST
+        fresh_break[b] = np.where(
+            thrusts, np.trunc(defense[b] * 0.25), fresh_break[b])
+
+        # Crits and attack multipliers
+        crits = strikes & (rng.integers(1, 101, size=m) <= crit_rate[a])
+        multiplier = 1 + crits * crit_mult[a]
+        if turn <= 3 and occupations[a] == "Hunter":
+            multiplier = multiplier + 1
+        if occupations[b] == "Leatherworker":
+            multiplier = multiplier - .15
+        attack_final = np.trunc(damage * multiplier)
+
+        # The actor's statuses tick: old Brace/Bide/Break expire
+        brace[a] = action == BRACE
+        bide[a] = action == BIDE
+        old_break[a] = fresh_break[a]
+        fresh_break[a] = 0
+
+        # Heals and damage over time
+        heal_mult = 2.0 if occupations[a] == "Butcher" else 1.0
+        decay = 0
+        if turn >= turn_limit:
+            decay = int(100 * (1 + ((turn - turn_limit) / 10)**2))
+            heal_mult /= 5
+        heal_total = np.trunc(max_hp[a] * .2 * heal_mult) * heals
+
+        # Apply defense as CombatTurn.apply does
+        defense = base_defense + 25 * brace - fresh_break - old_break
+        target_def = defense[b] * (100 - armor_pen[a]) / 100
+        attack_total = np.trunc(attack_final * ((100 - target_def) / 100))
+        actor_def = defense[a] * (100 - armor_pen[b]) / 100
+        damage_total = np.trunc(
+            (deflection + decay) * ((100 - actor_def) / 100))
+
+        hp[a] = np.minimum(hp[a] + heal_total - damage_total, max_hp[a])
+        hp[b] = np.minimum(hp[b] - attack_total, max_hp[b])
+
+        # Victory conditions; the actor falling takes precedence
+        done = (hp[a] <= 0) | (hp[b] <= 0)
+        if done.any():
+            ended = ids[done]
+            winners[ended] = np.where(hp[a][done] <= 0, b, a)
+            turns[ended] = turn
+            final_hp[:, ended] = hp[:, done]
+
+            alive = ~done
+            ids = ids[alive]
+            hp = hp[:, alive]
+            brace = brace[:, alive]
+            bide = bide[:, alive]
+            fresh_break = fresh_break[:, alive]
+            old_break = old_break[:, alive]
+
+    return SimulationResult(
+        winners, turns, final_hp[0], final_hp[1],
+        player1.max_hp, player2.max_hp)
@@ -0,0 +1,162 @@
+import asyncpg
+
+import logging
+import re
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from Utilities import config
+from Utilities.RequestContext import get_current_command
+
+logger = logging.getLogger("discord.ayesha.queries")
+
+# Queries slower than this are written to the slow query log. Set
+# SLOW_QUERY_THRESHOLD in config to change it.
+SLOW_QUERY_THRESHOLD = getattr(config, "SLOW_QUERY_THRESHOLD", 0.25) # Seconds
+TIMING_SAMPLES = 1000 # Recent timings kept per statement for percentiles
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(query : str) -> str:
+    """Returns the query with its whitespace collapsed and its literals
+    replaced by `?`, so that statements differing only in formatting or in
+    values written into the SQL are counted together.
+    """
+    query = re.sub(r"'(?:[^']|'')*'", "?", query)
+    query = re.sub(r"(?<![\w$])\d+(?:\.\d+)?\b", "?", query)
+    return " ".join(query.split()).rstrip(";")
+
+
+class StatementStats:
+    """Timings of a single statement fingerprint.
+
+    Attributes
+    ----------
+    calls : int
+        the number of times the statement was run
+    total_time : float
+        the seconds spent running it
+    rows : int
+        the rows it returned
+    errors : int
+        the calls that raised, e.g. on a statement timeout
+    """
+    __slots__ = ("calls", "total_time", "rows", "errors", "_timings")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_time = 0.0
+        self.rows = 0
+        self.errors = 0
+        self._timings = deque(maxlen=TIMING_SAMPLES)
+
+    def record(self, seconds : float, rows : int, failed : bool = False):
+        self.calls += 1
+        self.total_time += seconds
+        self.rows += rows
+        self.errors += failed
+        self._timings.append(seconds)
+
+    @property
+    def mean(self) -> float:
+        return self.total_time / self.calls if self.calls else 0.0
+
+    @property
+    def p99(self) -> float:
+        """The 99th percentile of the most recent TIMING_SAMPLES timings."""
+        if not self._timings:
+            return 0.0
+        timings = sorted(self._timings)
+        return timings[min(len(timings) - 1, int(len(timings) * .99))]
+
+
+class QueryStats:
+    """Collects the timings of every statement run over an AyeshaConnection,
+    keyed by fingerprint, and logs statements slower than the threshold
+    along with the command that ran them. Statements that raise are timed
+    too, as timeouts and cancellations are often the slowest.
+    """
+    def __init__(self, slow_threshold : float = SLOW_QUERY_THRESHOLD):
+        self.slow_threshold = slow_threshold
+        self.statements : Dict[str, StatementStats] = {}
+
+    def record(self, query : str, seconds : float, rows : int,
+            error : Optional[BaseException] = None):
+        key = fingerprint(query)
+        stats = self.statements.get(key)
+        if stats is None:
+            stats = self.statements[key] = StatementStats()
+        stats.record(seconds, rows, error is not None)
+
+        if seconds >= self.slow_threshold:
+            failed = "" if error is None else f", {type(error).__name__}"
+            logger.warning(
+                f"Slow query ({seconds * 1000:.0f} ms{failed}) in "
+                f"/{get_current_command() or '(no command)'}: {key}")
+
+    def get_top(self, n : int = 10, key : str = "total_time"
+            ) -> List[tuple]:
+        """Returns a list of (fingerprint, StatementStats) for the n
+        statements with the highest value of `key`.
+        """
+        return sorted(self.statements.items(),
+            key=lambda item : getattr(item[1], key), reverse=True)[:n]
+
+    def reset(self):
+        self.statements.clear()
+
+
+query_stats = QueryStats()
+
+
+class AyeshaConnection(asyncpg.Connection):
+    """The connection class used by the bot's database pools. Counts the
+    queries made over the connection so that commands can report how many
+    queries they issued, and times each one into `query_stats`.
+
+    Attributes
+    ----------
+    query_count : int
+        the number of queries made over this connection since it was opened
+    """
+    query_count = 0
+
+    async def _timed(self, method, query : str, count_rows, *args, **kwargs):
+        """Run a query method of asyncpg.Connection, recording its time
+        and rows whether it succeeds or raises. `count_rows` returns the
+        number of rows in the method's result.
+        """
+        start = time.perf_counter()
+        rows, error = 0, None
+        try:
+            result = await method(query, *args, **kwargs)
+            rows = count_rows(result)
+            return result
+        except BaseException as e: # Including timeouts and cancellations
+            error = e
+            raise
+        finally:
+            self.query_count += 1
+            query_stats.record(
+                query, time.perf_counter() - start, rows, error)
+
+    async def execute(self, query, *args, **kwargs):
+        return await self._timed(super().execute, query, 
+            lambda result : 0, *args, **kwargs)
+
+    async def executemany(self, command, args, **kwargs):
+        return await self._timed(super().executemany, command, 
+            lambda result : 0, args, **kwargs)
+
+    async def fetch(self, query, *args, **kwargs):
+        return await self._timed(super().fetch, query, len, *args, **kwargs)
+
+    async def fetchval(self, query, *args, **kwargs):
+        return await self._timed(super().fetchval, query, 
+            lambda result : int(result is not None), *args, **kwargs)
+
+    async def fetchrow(self, query, *args, **kwargs):
+        return await self._timed(super().fetchrow, query, 
+            lambda result : int(result is not None), *args, **kwargs)
@@ -0,0 +1,187 @@
+import discord
+
+import aiohttp
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Dict, Hashable, Optional, Union
+
+logger = logging.getLogger("discord.ayesha.delivery")
+
+DELIVERY_WORKERS = 8
+MAX_ATTEMPTS = 3
+RETRY_DELAY = 2.0 # seconds, doubled on each attempt
+USER_CACHE_SIZE = 5000
+THROUGHPUT_WINDOW = 60 # seconds
+
+
+class _Message:
+    """A queued message and where it is going."""
+    __slots__ = ("target", "kwargs", "attempts")
+
+    def __init__(self, target : Union[int, discord.abc.Messageable],
+            kwargs : dict):
+        self.target = target # A user ID for DMs, else a Messageable
+        self.kwargs = kwargs
+        self.attempts = 0
+
+    @property
+    def route(self) -> Hashable:
+        """Messages on the same route share a rate limit. Every DM counts
+        against the same limit on opening DM channels.
+        """
+        if isinstance(self.target, int):
+            return "dm"
+        return ("channel", getattr(self.target, "id", id(self.target)))
+
+
+class DeliveryPipeline:
+    """Sends DMs and announcements from a queue with a fixed number of
+    workers, so that a burst of messages does not hold up its caller.
+
+    Users are looked up in the gateway cache first, then in a small cache of
+    users fetched over REST, and only then fetched. When Discord rate-limits
+    a route, every worker holds back from that route until the limit resets.
+    Messages that fail for a transient reason are retried with backoff;
+    messages a user cannot receive (e.g. closed DMs) are dropped.
+
+    Attributes
+    ----------
+    sent : int
+        the number of messages delivered
+    failed : int
+        the number of messages dropped after failing
+    retried : int
+        the number of retries made
+    """
+    def __init__(self, bot : discord.Client, workers : int = DELIVERY_WORKERS):
+        self.bot = bot
+        self.workers = workers
+        self._queue : asyncio.Queue = asyncio.Queue()
+        self._tasks = []
+        self._users : Dict[int, discord.User] = {}
+        self._route_resets : Dict[Hashable, float] = {}
+        self._sent_times = deque()
+
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    @property
+    def throughput(self) -> float:
+        """Messages delivered per second over the last THROUGHPUT_WINDOW."""
+        self._trim_sent_times()
+        return len(self._sent_times) / THROUGHPUT_WINDOW
+
+    def get_stats(self) -> dict:
+        return {
+            "queue_depth" : self.queue_depth,
+            "sent" : self.sent,
+            "failed" : self.failed,
+            "retried" : self.retried,
+            "throughput" : self.throughput
+        }
+
+    def start(self):
+        """Start the workers if they are not already running."""
+        self._tasks = [t for t in self._tasks if not t.done()]
+        for _ in range(self.workers - len(self._tasks)):
+            self._tasks.append(asyncio.create_task(self._work()))
+
+    def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    async def get_user(self, user_id : int) -> discord.User:
+        """Returns the user, preferring cached objects to a REST call."""
+        user = self.bot.get_user(user_id) or self._users.get(user_id)
+        if user is None:
+            user = await self.bot.fetch_user(user_id)
+            if len(self._users) >= USER_CACHE_SIZE:
+                self._users.pop(next(iter(self._users)))
+            self._users[user_id] = user
+        return user
+
+    def dm(self, user_id : int, content : str = None, **kwargs):
+        """Queue a DM to the user with this ID. Keyword arguments are passed
+        to `send`.
+        """
+        self._queue.put_nowait(
+            _Message(user_id, dict(content=content, **kwargs)))
+
+    def send(self, destination : discord.abc.Messageable,
+            content : str = None, **kwargs):
+        """Queue a message to a channel or other Messageable."""
+        self._queue.put_nowait(
+            _Message(destination, dict(content=content, **kwargs)))
+
+    def _trim_sent_times(self):
+        cutoff = time.monotonic() - THROUGHPUT_WINDOW
+        while self._sent_times and self._sent_times[0] < cutoff:
+            self._sent_times.popleft()
+
+    async def _deliver(self, message : _Message):
+        destination = message.target
+        if isinstance(destination, int):
+            destination = await self.get_user(destination)
+        await destination.send(**message.kwargs)
+
+    async def _work(self):
+        while True:
+            message = await self._queue.get()
+            try:
+                # Back off while this message's route is rate-limited
+                wait = self._route_resets.get(message.route, 0) \
+                    - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+
+                message.attempts += 1
+                await self._deliver(message)
+                self.sent += 1
+                self._sent_times.append(time.monotonic())
+                self._trim_sent_times()
+            except asyncio.CancelledError:
+                raise
+            except (discord.Forbidden, discord.NotFound):
+                # Closed DMs, deleted users and channels won't recover
+                self.failed += 1
+            except (discord.HTTPException, aiohttp.ClientError,
+                    asyncio.TimeoutError, OSError) as e:
+                self._retry(message, e)
+            except Exception:
+                self.failed += 1
+                logger.exception(f"Could not deliver to {message.target}")
+            finally:
+                self._queue.task_done()
+
+    def _retry(self, message : _Message, error : Exception):
+        if message.attempts >= MAX_ATTEMPTS:
+            self.failed += 1
+            logger.warning(
+                f"Gave up delivering to {message.target} after "
+                f"{message.attempts} attempts: {error}")
+            return
+
+        delay = RETRY_DELAY * 2 ** (message.attempts - 1)
+        if getattr(error, "status", None) == 429:
+            retry_after = _get_retry_after(error)
+            delay = max(delay, retry_after or 0)
+            self._route_resets[message.route] = time.monotonic() + delay
+
+        self.retried += 1
+        asyncio.get_running_loop().call_later(
+            delay, self._queue.put_nowait, message)
+
+
+def _get_retry_after(error : discord.HTTPException) -> Optional[float]:
+    try:
+        return float(error.response.headers["Retry-After"])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
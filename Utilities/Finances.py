@@ -1,8 +1,14 @@
 import asyncpg
 
-from typing import List
+import asyncio
+import logging
+import time
+from typing import List, Optional
 
 from Utilities import Checks, PlayerObject, Vars
+from Utilities.CacheBus import cache_bus
+
+logger = logging.getLogger("discord.ayesha.taxes")
 
 class Transaction:
     """A transaction class to streamline purchasing/selling things that
@@ -98,7 +104,7 @@ class Transaction:
             multiplier -= a_mult / 100.0
             reduction_sources.append("regal accessory")
         reduction = 1 - multiplier
-        tax_rate = float(await get_tax_rate(conn)) * multiplier
+        tax_rate = float(await tax_service.get_rate(conn)) * multiplier
         tax_amount = int(subtotal * tax_rate / 100)
 
         return cls(player, subtotal, tax_rate, tax_amount, reduction, 
@@ -148,12 +154,22 @@ class Transaction:
         else:
             raise Checks.InvalidTransactionType
 
-        psql = """
-                INSERT INTO tax_transactions
-                    (user_id, before_tax, tax_amount, tax_rate)
-                VALUES ($1, $2, $3, $4);
-                """
-        await conn.execute(psql, self.player.disc_id, self.subtotal, 
+        return await self._log_tax(conn)
+
+    async def log_purchase(self, conn : asyncpg.Connection) -> str:
+        """Charges the player for the purchase only if they can still afford
+        it, raising NotEnoughGold otherwise, and logs the transaction. Use 
+        this inside a database transaction when the price was quoted before
+        waiting on the player, so that the rest of the purchase is rolled
+        back if they can no longer pay.
+
+        Returns the same string as log_transaction.
+        """
+        await self.player.spend_gold(conn, self.paying_price)
+        return await self._log_tax(conn)
+
+    async def _log_tax(self, conn : asyncpg.Connection) -> str:
+        await tax_service.log(conn, self.player.disc_id, self.subtotal, 
             self.tax_amount, self.tax_rate)
 
         if len(self.reduction_sources) == 0:
@@ -165,51 +181,193 @@ class Transaction:
                 f"due to your `{', '.join(self.reduction_sources)}`.")
 
 
+# --- TAX SERVICE ---
+# Every purchase and sale reads the tax rate and logs its tax, so both are
+# served from memory. Only /tax changes the rate, so set_tax_rate updates the
+# cache; the TTL covers changes made by other processes.
+TAX_CACHE_TTL = 300 # Seconds
+TAX_LOG_BATCH_SIZE = 50
+TAX_LOG_MAX_DELAY = 30 # Seconds a logged transaction may wait to be written
+
+
+class TaxService:
+    """Caches the tax rate and the taxes collected this term, and buffers
+    the `tax_transactions` log so that rows are inserted in batches.
+
+    The collected total is loaded once per term and then kept up to date as
+    transactions are logged. Rows are timestamped when they are logged, so
+    that a row written after an election still counts towards the term it
+    was paid in. Once `start()` is called, a background task writes the
+    buffer every TAX_LOG_MAX_DELAY seconds, or sooner when it holds
+    TAX_LOG_BATCH_SIZE rows, over a connection of its own. The buffer is 
+    also written before the collected total is re-read and on `stop()`.
+    """
+    _INSERT = """
+            INSERT INTO tax_transactions
+                (user_id, before_tax, tax_amount, tax_rate, time)
+            VALUES ($1, $2, $3, $4, to_timestamp($5)::timestamp);
+            """
+
+    def __init__(self):
+        self._rate = None # (loaded_at, record of tax_rate, user_name, setdate)
+        self._collected = None # (loaded_at, int)
+        self._pending = [] # (user_id, before_tax, tax_amount, tax_rate, time)
+        self._pool : Optional[asyncpg.Pool] = None
+        self._task : Optional[asyncio.Task] = None
+        self._batch_full = asyncio.Event()
+
+    def _is_fresh(self, entry : Optional[tuple]) -> bool:
+        return entry is not None \
+            and time.monotonic() - entry[0] < TAX_CACHE_TTL
+
+    async def _get_rate_record(self, conn : asyncpg.Connection
+            ) -> asyncpg.Record:
+        if not self._is_fresh(self._rate):
+            psql = """
+                    SELECT tax_rates.tax_rate, players.user_name, 
+                        tax_rates.setdate
+                    FROM tax_rates
+                    LEFT JOIN players
+                        ON players.user_id = tax_rates.setby
+                    ORDER BY id DESC
+                    LIMIT 1;
+                    """
+            self._rate = (time.monotonic(), await conn.fetchrow(psql))
+        return self._rate[1]
+
+    async def get_rate(self, conn : asyncpg.Connection) -> float:
+        """Returns the current bot-wide tax rate."""
+        return (await self._get_rate_record(conn))['tax_rate']
+
+    async def get_collected(self, conn : asyncpg.Connection) -> int:
+        """Returns the taxes collected since the current mayor took office."""
+        if not self._is_fresh(self._collected):
+            await self.flush()
+            psql = """
+                    WITH start_date AS (
+                        SELECT setdate
+                        FROM officeholders
+                        WHERE office = 'Mayor'
+                        ORDER BY id DESC
+                        LIMIT 1
+                    )
+                    SELECT SUM(tax_amount)
+                    FROM tax_transactions
+                    WHERE time > (SELECT * FROM start_date);
+                    """
+            collected = await conn.fetchval(psql)
+            self._collected = (time.monotonic(), collected or 0)
+        return self._collected[1]
+
+    async def get_info(self, conn : asyncpg.Connection) -> dict:
+        """Returns the tax rate, who set it and when, and the taxes collected
+        this term. Keys: tax_rate, user_name, setdate, Collected
+        """
+        info = dict(await self._get_rate_record(conn))
+        info['Collected'] = await self.get_collected(conn)
+        return info
+
+    async def set_rate(self, conn : asyncpg.Connection, tax_rate : float, 
+            setby : int):
+        psql = """
+                INSERT INTO tax_rates (tax_rate, setby) 
+                VALUES ($1, $2);
+                """
+        await conn.execute(psql, tax_rate, setby)
+        self.invalidate_rate()
+
+    def invalidate_rate(self):
+        """Drop the cached tax rate."""
+        self._rate = None
+        cache_bus.publish("tax", "invalidate_rate")
+
+    async def log(self, conn : asyncpg.Connection, user_id : int, 
+            before_tax : int, tax_amount : int, tax_rate : float):
+        """Log a transaction's tax and count it towards the total collected
+        this term. Inside a database transaction the row is written over
+        `conn` so that it is rolled back along with the purchase; otherwise
+        it is buffered.
+        """
+        row = (user_id, before_tax, tax_amount, tax_rate, time.time())
+        if conn.is_in_transaction():
+            await conn.execute(self._INSERT, *row)
+            # Not known to be committed, so re-read the total once it is
+            self._collected = None
+            return
+
+        self._pending.append(row)
+        if self._collected is not None:
+            self._collected = (
+                self._collected[0], self._collected[1] + tax_amount)
+        if len(self._pending) >= TAX_LOG_BATCH_SIZE:
+            self._batch_full.set()
+
+    async def flush(self):
+        """Write every buffered transaction log."""
+        if not self._pending or self._pool is None:
+            return
+        rows, self._pending = self._pending, []
+        try:
+            async with self._pool.acquire() as conn:
+                await conn.executemany(self._INSERT, rows)
+        except Exception:
+            self._pending = rows + self._pending
+            raise
+
+    def start(self, pool : asyncpg.Pool):
+        """Start writing the buffer in the background if not already."""
+        self._pool = pool
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background task and write out the buffer."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._batch_full.wait(), TAX_LOG_MAX_DELAY)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_full.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception(
+                    f"Could not write {len(self._pending)} tax logs; "
+                    f"retrying in {TAX_LOG_MAX_DELAY} s.")
+
+    def invalidate_term(self):
+        """Drop the collected total. Call this when a new mayor is elected."""
+        self._collected = None
+        cache_bus.publish("tax", "invalidate_term")
+
+
+tax_service = TaxService()
+cache_bus.register("tax", tax_service)
+
+
 async def get_tax_rate(conn : asyncpg.Connection) -> float:
     """Returns the current bot-wide tax rate."""
-    psql = """
-            SELECT tax_rate 
-            FROM tax_rates 
-            ORDER BY id DESC 
-            LIMIT 1;
-            """
-    return await conn.fetchval(psql)
+    return await tax_service.get_rate(conn)
 
 async def get_tax_info(conn : asyncpg.Connection) -> dict:
     """Return info related to the curent tax rate.
     Dict Keys: tax_rate, user_name (who set the rate), setdate, 
         collected (total collected over this period)
     """
-    psql1 = """
-            SELECT tax_rates.tax_rate, players.user_name, tax_rates.setdate
-            FROM tax_rates
-            INNER JOIN players
-                ON players.user_id = tax_rates.setby
-            ORDER BY id DESC
-            LIMIT 1;
-            """
-    psql2 = """
-            WITH start_date AS (
-                SELECT setdate
-                FROM officeholders
-                WHERE office = 'Mayor'
-                ORDER BY setdate DESC
-                LIMIT 1
-            )
-            SELECT SUM(tax_amount)
-            FROM tax_transactions
-            WHERE time > (SELECT * FROM start_date);
-            """
-
-    tax_output = dict(await conn.fetchrow(psql1))
-    tax_output['Collected'] = await conn.fetchval(psql2)
-
-    return tax_output
+    return await tax_service.get_info(conn)
 
 async def set_tax_rate(conn : asyncpg.Connection, tax_rate: float, setby: int):
     """Sets the tax rate."""
-    psql = """INSERT INTO tax_rates (tax_rate, setby) VALUES ($1, $2);"""
-    await conn.execute(psql, tax_rate, setby)
+    await tax_service.set_rate(conn, tax_rate, setby)
 
 # async def calc_cost_with_tax_rate(conn : asyncpg.Connection, 
 #         subtotal : int, player_origin : str) -> dict:
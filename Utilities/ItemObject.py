@@ -4,6 +4,7 @@ import asyncpg
 import coolname
 
 import random
+from typing import List
 
 from Utilities import Checks, Vars
 
@@ -71,6 +72,28 @@ class Weapon:
         psql = "UPDATE items SET user_id = $1 WHERE item_id = $2;"
         await conn.execute(psql, user_id, self.weapon_id)
 
+    async def transfer(self, conn : asyncpg.Connection, from_id : int,
+            to_id : int):
+        """Gives this weapon to another player, provided that `from_id`
+        still owns it and does not have it equipped. Raises NotWeaponOwner
+        otherwise.
+        """
+        if self.is_empty:
+            raise Checks.EmptyObject
+
+        psql = """
+                UPDATE items
+                SET user_id = $1
+                WHERE item_id = $2 AND user_id = $3
+                    AND NOT EXISTS (
+                        SELECT 1 FROM players 
+                        WHERE user_id = $3 AND equipped_item = $2)
+                RETURNING item_id;
+                """
+        if await conn.fetchval(psql, to_id, self.weapon_id, from_id) is None:
+            raise Checks.NotWeaponOwner
+        self.owner_id = to_id
+
     async def set_name(self, conn : asyncpg.Connection, name : str):
         """Changes the name of the weapon. 'name' must be <= 20 characters."""
         if self.is_empty:
@@ -94,6 +117,26 @@ class Weapon:
         psql = "UPDATE items SET attack = $1 WHERE item_id = $2;"
         await conn.execute(psql, attack, self.weapon_id)
 
+    async def upgrade_attack(self, conn : asyncpg.Connection, owner_id : int,
+            attack : int):
+        """Changes the attack of the weapon, provided that it is still owned
+        by `owner_id` and its attack has not changed since it was loaded.
+        Raises ItemChanged otherwise.
+        """
+        if self.is_empty:
+            raise Checks.EmptyObject
+
+        psql = """
+                UPDATE items
+                SET attack = $1
+                WHERE item_id = $2 AND user_id = $3 AND attack = $4
+                RETURNING item_id;
+                """
+        if await conn.fetchval(psql, 
+                attack, self.weapon_id, owner_id, self.attack) is None:
+            raise Checks.ItemChanged
+        self.attack = attack
+
     async def destroy(self, conn : asyncpg.Connection):
         """Deletes this item from the database."""
         if self.is_empty:
@@ -168,6 +211,28 @@ class Armor:
         psql = "UPDATE armor SET user_id = $1 WHERE armor_id = $2;"
         await conn.execute(psql, user_id, self.id)
 
+    async def transfer(self, conn : asyncpg.Connection, from_id : int,
+            to_id : int):
+        """Gives this armor to another player, provided that `from_id` still
+        owns it and is not wearing it. Raises NotArmorOwner otherwise.
+        """
+        if self.is_empty:
+            raise Checks.EmptyObject
+
+        psql = """
+                UPDATE armor
+                SET user_id = $1
+                WHERE armor_id = $2 AND user_id = $3
+                    AND NOT EXISTS (
+                        SELECT 1 FROM equips
+                        WHERE user_id = $3 
+                            AND $2 IN (helmet, bodypiece, boots))
+                RETURNING armor_id;
+                """
+        if await conn.fetchval(psql, to_id, self.id, from_id) is None:
+            raise Checks.NotArmorOwner
+        self.owner_id = to_id
+
     async def destroy(self, conn : asyncpg.Connection):
         """Deletes this item from the database."""
         if self.is_empty:
@@ -379,6 +444,38 @@ async def get_accessory_by_id(conn : asyncpg.Connection,
     accessory_record = await conn.fetchrow(psql, accessory_id)
     return Accessory(accessory_record)
 
+async def get_accessories_by_owner(conn : asyncpg.Connection, user_id : int,
+        prefix : str = None, material : str = None) -> List[Accessory]:
+    """Returns every accessory the player owns, loaded in a single query, 
+    with the equipped accessory first and then the newest. Each accessory's 
+    `equipped` attribute is whether the player is wearing it.
+    
+    Pass a prefix or material to only return accessories with that effect 
+    or core material.
+    """
+    psql = """
+            SELECT 
+                accessories.accessory_id, accessories.accessory_type, 
+                accessories.accessory_name, accessories.user_id, 
+                accessories.prefix,
+                COALESCE(accessories.accessory_id = equips.accessory, false)
+                AS equipped
+            FROM accessories
+            LEFT JOIN equips
+                ON equips.user_id = accessories.user_id
+            WHERE accessories.user_id = $1
+                AND ($2::TEXT IS NULL OR accessories.prefix = $2)
+                AND ($3::TEXT IS NULL OR accessories.accessory_type = $3)
+            ORDER BY equipped DESC, accessories.accessory_id DESC;
+            """
+    records = await conn.fetch(psql, user_id, prefix, material)
+    accessories = []
+    for record in records:
+        accessory = Accessory(record)
+        accessory.equipped = record['equipped']
+        accessories.append(accessory)
+    return accessories
+
 async def create_accessory(conn : asyncpg.Connection, user_id : int, 
         type : str, prefix : str) -> Accessory:
     """Creates an accessory with the specified information and returns it."""
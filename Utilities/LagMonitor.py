@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+import weakref
+from collections import deque
+from typing import List, Optional
+
+from Utilities import config
+
+logger = logging.getLogger("discord.ayesha.lag")
+
+SAMPLE_INTERVAL = 0.1 # Seconds between heartbeats of the event loop
+# A stall longer than this has its stack captured. Set LAG_THRESHOLD in
+# config to change it.
+LAG_THRESHOLD = getattr(config, "LAG_THRESHOLD", 0.25) # Seconds
+MAX_STALLS = 50 # Recent stalls kept for inspection
+
+
+class Stall:
+    """A period in which the event loop was blocked.
+
+    Attributes
+    ----------
+    started_at : float
+        the time.time() at which the stall was detected
+    duration : float
+        how long the loop was blocked; grows until the loop recovers
+    command : Optional[str]
+        the command being run by the blocking task, if any
+    stack : List[str]
+        the loop thread's stack as it was blocked, innermost frame last
+    """
+    __slots__ = ("started_at", "duration", "command", "stack")
+
+    def __init__(self, duration : float, command : Optional[str],
+            stack : List[str]):
+        self.started_at = time.time()
+        self.duration = duration
+        self.command = command
+        self.stack = stack
+
+
+class LagMonitor:
+    """Measures how late the event loop runs a heartbeat scheduled every
+    SAMPLE_INTERVAL, and finds what is blocking it when it runs late.
+
+    A watchdog thread checks on the heartbeat. When the loop has gone
+    `threshold` seconds without one, the thread captures the stack of the
+    loop's thread, which is whatever synchronous code is hogging it, and
+    the command of the task that is running. Each stall is logged with its
+    stack once the loop recovers and is kept in `stalls`.
+
+    Attributes
+    ----------
+    lag : float
+        the scheduling delay of the latest heartbeat
+    lag_max : float
+        the largest scheduling delay seen
+    stall_count : int
+        the number of stalls longer than `threshold`
+    stalls : deque
+        the most recent Stalls
+    """
+    def __init__(self, threshold : float = LAG_THRESHOLD,
+            interval : float = SAMPLE_INTERVAL):
+        self.threshold = threshold
+        self.interval = interval
+        self.lag = 0.0
+        self.lag_max = 0.0
+        self.stall_count = 0
+        self.stalls = deque(maxlen=MAX_STALLS)
+
+        self._loop = None
+        self._loop_thread = None
+        self._last_beat = time.monotonic()
+        self._current_stall : Optional[Stall] = None
+        self._contexts = weakref.WeakKeyDictionary() # Task -> context
+        self._task = None
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        """Start the heartbeat and watchdog if they are not running. Must be
+        called from the event loop.
+        """
+        if self._task is not None and not self._task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._task = asyncio.create_task(self._heartbeat())
+
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._watch, name="ayesha-lag-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+
+    def track(self, context):
+        """Associate the current task with a command's ApplicationContext, so
+        that stalls during the task are attributed to the command.
+        """
+        task = asyncio.current_task()
+        if task is not None:
+            self._contexts[task] = context
+
+    async def _heartbeat(self):
+        while True:
+            self._last_beat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self.lag = max(
+                0.0, time.monotonic() - self._last_beat - self.interval)
+            self.lag_max = max(self.lag_max, self.lag)
+
+            stall, self._current_stall = self._current_stall, None
+            if stall is not None:
+                stall.duration = self.lag
+                logger.warning(
+                    f"Event loop blocked for {stall.duration * 1000:.0f} ms "
+                    f"in /{stall.command or '(no command)'}:\n"
+                    + "".join(stall.stack))
+
+    def _watch(self):
+        while not self._stopped.wait(self.interval):
+            stalled = time.monotonic() - self._last_beat - self.interval
+            if stalled < self.threshold or self._current_stall is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+
+            stall = Stall(stalled, self._get_blocking_command(),
+                traceback.format_stack(frame))
+            self.stall_count += 1
+            self.stalls.append(stall)
+            self._current_stall = stall
+
+    def _get_blocking_command(self) -> Optional[str]:
+        """Returns the command of the task the loop is running. Read from
+        the watchdog thread while the loop is blocked, so nothing it reads
+        can change underneath it.
+        """
+        try:
+            task = asyncio.tasks._current_tasks.get(self._loop)
+            context = self._contexts.get(task)
+        except (AttributeError, TypeError):
+            return None
+        command = getattr(context, "command", None)
+        return getattr(command, "qualified_name", None)
@@ -0,0 +1,210 @@
+import discord
+from discord.errors import ApplicationCommandInvokeError
+
+import bisect
+import logging
+from typing import Dict, Iterable, List, Tuple
+
+import asyncpg
+from aiohttp import web
+
+logger = logging.getLogger("discord.ayesha.metrics")
+
+METRICS_PORT = 8080 # Only used when the Vote cog's server is not running
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0) # Seconds
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value : str) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n")\
+        .replace('"', r'\"')
+
+def _format_value(value : float) -> str:
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(value)
+
+def _format_labels(labels : Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(
+        f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+class Histogram:
+    """A histogram of observations for each value of a single label, kept
+    as cumulative counts over fixed upper bounds.
+    """
+    def __init__(self, label : str, buckets : Iterable[float]):
+        self.label = label
+        self.buckets = tuple(sorted(buckets))
+        # Label value -> [bucket counts..., +Inf count], sum
+        self._series : Dict[str, Tuple[List[int], float]] = {}
+
+    def observe(self, label_value : str, value : float):
+        counts, total = self._series.get(
+            label_value, ([0] * (len(self.buckets) + 1), 0.0))
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self._series[label_value] = (counts, total + value)
+
+    def render(self, name : str) -> List[str]:
+        lines = []
+        for label_value, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                labels = _format_labels(
+                    {self.label : label_value, "le" : bound})
+                lines.append(f"{name}_bucket{labels} {cumulative}")
+            labels = _format_labels({self.label : label_value})
+            lines.append(f"{name}_sum{labels} {total}")
+            lines.append(f"{name}_count{labels} {cumulative}")
+        return lines
+
+
+class Metrics:
+    """Collects runtime statistics for the bot and serves them at /metrics
+    in the Prometheus text exposition format.
+
+    The route is added to the Vote cog's web server when it runs; otherwise
+    call `start_server()` to serve it on METRICS_PORT. Command latency and
+    errors are recorded by the bot as each command's RequestContext closes.
+    Pool, gateway and event loop figures are read when the endpoint is 
+    scraped.
+
+    Attributes
+    ----------
+    command_latency : Histogram
+        the time taken by each slash command, by command name
+    command_errors : Dict[Tuple[str, str], int]
+        the errors raised by each command, by (command, exception type)
+    """
+    def __init__(self, bot : discord.AutoShardedBot):
+        self.bot = bot
+        self.command_latency = Histogram("command", LATENCY_BUCKETS)
+        self.command_errors : Dict[Tuple[str, str], int] = {}
+        self._runner = None
+
+    def observe_command(self, command : str, seconds : float):
+        self.command_latency.observe(command, seconds)
+
+    def count_error(self, command : str, error : Exception):
+        """Count an error by the type of its underlying exception, so that
+        e.g. Checks.NotEnoughGold is counted rather than the invoke error
+        wrapping it.
+        """
+        if isinstance(error, ApplicationCommandInvokeError):
+            error = error.original
+        key = (command, type(error).__name__)
+        self.command_errors[key] = self.command_errors.get(key, 0) + 1
+
+    def add_routes(self, app : web.Application):
+        app.router.add_get("/metrics", self.handle)
+
+    async def start_server(self, port : int = METRICS_PORT):
+        """Serve /metrics from a web server of its own."""
+        if self._runner is not None:
+            return
+        app = web.Application()
+        self.add_routes(app)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, "0.0.0.0", port).start()
+        logger.info(f"Serving metrics on port {port}.")
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def handle(self, request : web.Request) -> web.Response:
+        return web.Response(body=self.render().encode("utf-8"),
+            headers={"Content-Type" : CONTENT_TYPE})
+
+    def render(self) -> str:
+        """Returns every metric in the text exposition format."""
+        lines = []
+        def metric(name : str, type : str, help : str,
+                samples : Iterable[Tuple[Dict[str, str], float]]):
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {type}")
+            for labels, value in samples:
+                lines.append(
+                    f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        lines.append("# HELP ayesha_command_latency_seconds "
+            "Time taken by slash commands.")
+        lines.append("# TYPE ayesha_command_latency_seconds histogram")
+        lines.extend(self.command_latency.render(
+            "ayesha_command_latency_seconds"))
+
+        metric("ayesha_command_errors_total", "counter",
+            "Errors raised by slash commands, by exception type.",
+            [({"command" : command, "error" : error}, count)
+                for (command, error), count
+                in sorted(self.command_errors.items())])
+
+        pools = {"db" : self.bot.db, "dictionary" : self.bot.dictionary}
+        pool_stats = {name : get_pool_stats(pool)
+            for name, pool in pools.items()}
+        for stat, help in (
+                ("size", "Connections open in the pool."),
+                ("max_size", "The most connections the pool will open."),
+                ("idle", "Open connections not in use."),
+                ("waiters", "Tasks waiting to acquire a connection.")):
+            metric(f"ayesha_pool_{stat}", "gauge", help,
+                [({"pool" : name}, stats[stat])
+                    for name, stats in pool_stats.items()])
+
+        metric("ayesha_gateway_latency_seconds", "gauge",
+            "Heartbeat latency of each shard.",
+            [({"shard" : shard}, latency)
+                for shard, latency in self.bot.latencies])
+
+        lag_monitor = self.bot.lag_monitor
+        metric("ayesha_event_loop_lag_seconds", "gauge",
+            "Scheduling delay of the event loop at the latest sample.",
+            [({}, lag_monitor.lag)])
+        metric("ayesha_event_loop_lag_max_seconds", "gauge",
+            "The largest scheduling delay of the event loop since startup.",
+            [({}, lag_monitor.lag_max)])
+        metric("ayesha_event_loop_stalls_total", "counter",
+            "Times the event loop was blocked past the lag threshold.",
+            [({}, lag_monitor.stall_count)])
+
+        metric("ayesha_startup_seconds", "gauge",
+            "Time taken by each stage of startup.",
+            [({"stage" : stage}, seconds)
+                for stage, seconds in self.bot.startup.stages])
+        metric("ayesha_startup_step_seconds", "gauge",
+            "Time taken by each step of a startup stage.",
+            [({"stage" : stage, "step" : step}, seconds)
+                for stage, step, seconds in self.bot.startup.steps])
+
+        delivery = self.bot.delivery.get_stats()
+        metric("ayesha_delivery_queue_depth", "gauge",
+            "Messages waiting to be delivered.",
+            [({}, delivery["queue_depth"])])
+        metric("ayesha_delivery_messages_total", "counter",
+            "Messages handled by the delivery pipeline, by outcome.",
+            [({"outcome" : outcome}, delivery[outcome])
+                for outcome in ("sent", "failed", "retried")])
+
+        return "\n".join(lines) + "\n"
+
+
+def get_pool_stats(pool : asyncpg.Pool) -> Dict[str, int]:
+    """Returns the size, max_size, idle and waiters of a connection pool.
+    asyncpg has no public count of waiters, so it is read from the pool's
+    queue of connection holders.
+    """
+    queue = getattr(pool, "_queue", None)
+    getters = getattr(queue, "_getters", ())
+    return {
+        "size" : pool.get_size(),
+        "max_size" : pool.get_max_size(),
+        "idle" : pool.get_idle_size(),
+        "waiters" : sum(1 for getter in getters if not getter.done())
+    }
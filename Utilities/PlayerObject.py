@@ -4,9 +4,10 @@ import asyncpg
 import time
 
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Iterable, List, Optional
 
-from Utilities import Checks, ItemObject, Vars, AssociationObject
+from Utilities import AcolyteObject, Analytics, Checks, ItemObject, Vars, \
+    AssociationObject
 from Utilities.ItemObject import Weapon
 from Utilities.AcolyteObject import EmptyAcolyte, InfoAcolyte, OwnedAcolyte
 from Utilities.AssociationObject import Association
@@ -106,27 +107,27 @@ class Player:
         self.daily_streak = record['daily_streak']
         self.last_daily = record['last_daily']
 
-    async def _load_equips(self, conn : asyncpg.Connection):
+    def _load_equips(self, record : asyncpg.Record):
         """Converts object variables from their IDs into the proper objects.
-        Run this upon instantiation or else >:(
+        The record must come from `_PLAYER_GRAPH_QUERY`, which joins every
+        equip onto the player row. Run this upon instantiation or else >:(
         """
-        self.equipped_item = await ItemObject.get_weapon_by_id(
-            conn, self.equipped_item)
-        self.helmet = await ItemObject.get_armor_by_id(conn, self.helmet)
-        self.bodypiece = await ItemObject.get_armor_by_id(conn, self.bodypiece)
-        self.boots = await ItemObject.get_armor_by_id(conn, self.boots)
-        self.accessory = await ItemObject.get_accessory_by_id(
-            conn, self.accessory)
-        try:
-            self.acolyte1 = await OwnedAcolyte.from_id(conn, self.acolyte1)
-        except Checks.EmptyObject:
-            self.acolyte1 = EmptyAcolyte()
-        try:
-            self.acolyte2 = await OwnedAcolyte.from_id(conn, self.acolyte2)
-        except Checks.EmptyObject:
-            self.acolyte2 = EmptyAcolyte()
-        self.assc = await AssociationObject.get_assc_by_id(conn, self.assc)
-        self.resources = dict(await self.get_backpack(conn))
+        self.equipped_item = Weapon(_get_subrecord(record, "weapon"))
+        self.helmet = ItemObject.Armor(_get_subrecord(record, "helmet"))
+        self.bodypiece = ItemObject.Armor(_get_subrecord(record, "bodypiece"))
+        self.boots = ItemObject.Armor(_get_subrecord(record, "boots"))
+        self.accessory = ItemObject.Accessory(
+            _get_subrecord(record, "accessory"))
+
+        acolyte1 = _get_subrecord(record, "acolyte1")
+        acolyte2 = _get_subrecord(record, "acolyte2")
+        self.acolyte1 = OwnedAcolyte.from_record(acolyte1) \
+            if acolyte1 is not None else EmptyAcolyte()
+        self.acolyte2 = OwnedAcolyte.from_record(acolyte2) \
+            if acolyte2 is not None else EmptyAcolyte()
+
+        self.assc = Association(_get_subrecord(record, "assc"))
+        self.resources = _get_subrecord(record, "resources") or {}
 
         # Radishes changes expedition time
         on_expedition = self.destination == "EXPEDITION"
@@ -168,6 +169,11 @@ class Player:
         else:
             return level
 
+    def _update_rank(self, stat : str, value : int):
+        """Move the player in the rank index of a stat that just changed."""
+        Analytics.rank_service.update(self.disc_id, stat, value, 
+            self.char_name)
+
     async def reload_xp(self, conn : asyncpg.Connection):
         """Updates the player's current xp.
         Since players might gain xp from multiple sources within a short time
@@ -199,24 +205,14 @@ class Player:
                 WHERE user_id = $2;
                 """
         await conn.execute(psql, xp, self.disc_id)
+        self._update_rank("xp", self.xp)
         self.level = self.get_level()
-        # if self.level > old_level: # Level up
-        gold, rubidics = 0, 0
-        if self.level > old_level:
-            # 500gold/level - Follows the sum of integers formula n(n+1)/2
-            gold = (self.level*(self.level+1) - old_level*(old_level+1)) * 250
-            rubidics = int(self.level/10) - int(old_level/10)
-
+        if self.level > old_level: # Level up
+            gold, rubidics = get_level_up_rewards(old_level, self.level)
             await self.give_gold(conn, gold)
             await self.give_rubidics(conn, rubidics)
 
-            embed = discord.Embed(
-                title = f"You have levelled up to level {self.level}!",
-                color = Vars.ABLUE)
-            embed.add_field(
-                name = f"{self.char_name}, you gained some rewards",
-                value = f"**Gold:** {gold}\n**Rubidics:** {rubidics}")
-
+            embed = get_level_up_embed(self, self.level, gold, rubidics)
             await ctx.respond(embed=embed)
 
     async def set_char_name(self, conn : asyncpg.Connection, name : str):
@@ -431,6 +427,7 @@ class Player:
                 WHERE user_id = $2;
                 """
         await conn.execute(psql, assc_id, self.disc_id)
+        Checks.check_cache.invalidate(self.disc_id)
 
         self.assc = assc
 
@@ -445,6 +442,7 @@ class Player:
                 WHERE user_id = $2;
                 """
         await conn.execute(psql, rank, self.disc_id)
+        Checks.check_cache.invalidate(self.disc_id)
 
     async def leave_assc(self, conn : asyncpg.Connection):
         """Makes the player leave their current association."""
@@ -493,6 +491,7 @@ class Player:
         in_bank = await conn.fetchval(psql5, self.disc_id)
         if in_bank is not None:
             await conn.execute(psql6, in_bank, self.disc_id)
+        Checks.check_cache.invalidate(self.disc_id)
 
         self.assc = Association()
 
@@ -507,6 +506,40 @@ class Player:
                 """
 
         await conn.execute(psql, gold, self.disc_id)
+        self._update_rank("gold", self.gold)
+
+    async def _spend(self, conn : asyncpg.Connection, table : str, 
+            column : str, amount : int) -> asyncpg.Record:
+        """Subtracts `amount` from the column only if the player still has
+        that much. Returns a record of `remaining`, which is NULL if nothing
+        was spent, and `current`, the value before the update.
+        """
+        psql = f"""
+                WITH spent AS (
+                    UPDATE {table}
+                    SET {column} = {column} - $1
+                    WHERE user_id = $2 AND {column} >= $1
+                    RETURNING {column}
+                )
+                SELECT 
+                    (SELECT {column} FROM spent) AS remaining,
+                    {column} AS current
+                FROM {table}
+                WHERE user_id = $2;
+                """
+        return await conn.fetchrow(psql, amount, self.disc_id)
+
+    async def spend_gold(self, conn : asyncpg.Connection, gold : int):
+        """Takes the passed amount of gold from the player if they can still
+        afford it, otherwise raises NotEnoughGold. Unlike give_gold, this
+        checks the database rather than this object, so it is safe to use
+        after waiting on the player.
+        """
+        record = await self._spend(conn, "players", "gold", gold)
+        if record['remaining'] is None:
+            raise Checks.NotEnoughGold(gold, record['current'])
+        self.gold = record['remaining']
+        self._update_rank("gold", self.gold)
 
     async def give_rubidics(self, conn : asyncpg.Connection, rubidics : int):
         """Gives the player the passed amount of rubidics."""
@@ -520,6 +553,16 @@ class Player:
 
         await conn.execute(psql, rubidics, self.disc_id)
 
+    async def spend_rubidics(self, conn : asyncpg.Connection, rubidics : int):
+        """Takes the passed amount of rubidics from the player if they still
+        have them, otherwise raises NotEnoughResources.
+        """
+        record = await self._spend(conn, "players", "rubidics", rubidics)
+        if record['remaining'] is None:
+            raise Checks.NotEnoughResources(
+                "rubidics", rubidics, record['current'])
+        self.rubidics = record['remaining']
+
     async def give_gravitas(self, conn : asyncpg.Connection, gravitas : int):
         """Gives the player the passed amount of gravitas."""
         if gravitas < 0 and gravitas*-1 > self.gravitas:
@@ -533,6 +576,7 @@ class Player:
                 WHERE user_id = $2;
                 """
         await conn.execute(psql, gravitas, self.disc_id)
+        self._update_rank("gravitas", self.gravitas)
 
     async def give_resource(self, conn : asyncpg.Connection, resource : str, 
             amount : int):
@@ -552,6 +596,20 @@ class Player:
                 """
         await conn.execute(psql, amount, self.disc_id)
 
+    async def spend_resource(self, conn : asyncpg.Connection, resource : str,
+            amount : int):
+        """Takes the passed amount of a resource from the player if they 
+        still have it, otherwise raises NotEnoughResources.
+        """
+        if resource not in self.resources:
+            raise Checks.InvalidResource(resource)
+
+        record = await self._spend(conn, "resources", resource, amount)
+        if record['remaining'] is None:
+            raise Checks.NotEnoughResources(
+                resource, amount, record['current'])
+        self.resources[resource] = record['remaining']
+
     async def get_backpack(self, conn : asyncpg.Connection) -> asyncpg.Record:
         """Returns a dict containg the player's resource amounts. Keys are:
         Wheat, Oat, Wood, Reeds, Pine, Moss, Iron, Cacao, Fur, Bone, Silver
@@ -632,6 +690,7 @@ class Player:
                 WHERE user_id = $3;
                 """
         await conn.execute(psql, adventure, destination, self.disc_id)
+        Checks.check_cache.invalidate(self.disc_id)
 
     async def log_pve(self, conn : asyncpg.Connection, victory : bool):
         """Increments the player's boss_fights counter, and boss_wins
@@ -655,6 +714,8 @@ class Player:
                     WHERE user_id = $1;
                     """
         await conn.execute(psql, self.disc_id)
+        if victory:
+            self._update_rank("bosswins", self.boss_wins)
 
     async def log_pvp(self, conn : asyncpg.Connection, victory : bool):
         """Increments the player's pvp_fights counter, and pvp_wins
@@ -678,6 +739,8 @@ class Player:
                     WHERE user_id = $1;
                     """
         await conn.execute(psql, self.disc_id)
+        if victory:
+            self._update_rank("pvpwins", self.pvp_wins)
 
     async def increment_pve_limit(self, conn : asyncpg.Connection):
         """Increase the player's PVE limit by 1"""
@@ -688,6 +751,7 @@ class Player:
                 WHERE user_id = $1;
                 """
         await conn.execute(psql, self.disc_id)
+        self._update_rank("pve_limit", self.pve_limit)
 
     def eligible_to_claim_daily(self) -> bool:
         """Return true if player can collect their daily."""
@@ -862,54 +926,367 @@ class Player:
             return None
 
 
+class PlayerUpdate:
+    """Collects changes to a player and writes them in one transaction, with
+    one UPDATE per table. Use this instead of several `give_*` calls when a
+    command hands out a batch of rewards, so that either every reward is
+    saved or none are.
+
+    Changes are staged with the methods below and saved with `flush`, which
+    also updates the Player object from the values the database returns.
+
+    Attributes
+    ----------
+    player : Player
+        the player being updated
+    items : dict
+        the items created by `flush`, keyed by the name given to `add_item`
+    level_up : tuple, optional
+        (old_level, new_level, gold, rubidics) if the xp given levelled the
+        player up, else None. Set by `flush`.
+    """
+    # Columns of `players` that can be changed, and their Player attributes
+    COUNTERS = {
+        'gold' : 'gold', 'xp' : 'xp', 'rubidics' : 'rubidics',
+        'gravitas' : 'gravitas', 'pvpwins' : 'pvp_wins',
+        'pvpfights' : 'pvp_fights', 'bosswins' : 'boss_wins',
+        'bossfights' : 'boss_fights', 'pve_limit' : 'pve_limit'
+    }
+    FIELDS = {
+        'loc' : 'location', 'adventure' : 'adventure',
+        'destination' : 'destination', 'daily_streak' : 'daily_streak',
+        'last_daily' : 'last_daily'
+    }
+
+    def __init__(self, player : Player):
+        self.player = player
+        self.deltas = {}
+        self.values = {}
+        self.resources = {}
+        self._items = []
+        self.items = {}
+        self.level_up = None
+        self._ranked = {} # Ranked stats written, for after the commit
+
+    def increment(self, column : str, amount : int = 1):
+        """Add to a numeric column of `players`."""
+        if column not in self.COUNTERS:
+            raise ValueError(f"{column} is not a counter of players.")
+        self.deltas[column] = self.deltas.get(column, 0) + amount
+
+    def give_gold(self, gold : int):
+        self.increment('gold', gold)
+
+    def give_rubidics(self, rubidics : int):
+        self.increment('rubidics', rubidics)
+
+    def give_gravitas(self, gravitas : int):
+        """Gravitas will not go below 0."""
+        self.increment('gravitas', gravitas)
+
+    def give_xp(self, xp : int):
+        """Level-up rewards are given by `flush`."""
+        self.increment('xp', xp)
+
+    def give_resource(self, resource : str, amount : int):
+        owned = (self.player.resources or {}).get(resource)
+        if owned is None:
+            raise Checks.InvalidResource(resource)
+        total = self.resources.get(resource, 0) + amount
+        if total < 0 and total*-1 > owned:
+            raise Checks.NotEnoughResources(resource, total*-1 - owned, owned)
+        self.resources[resource] = total
+
+    def log_pve(self, victory : bool):
+        self.increment('bossfights')
+        if victory:
+            self.increment('bosswins')
+
+    def set_location(self, location : str):
+        self.values['loc'] = location
+
+    def set_adventure(self, adventure : int, destination : str):
+        self.values['adventure'] = adventure
+        self.values['destination'] = destination
+
+    def add_item(self, name : str, create, *args, **kwargs):
+        """Create an item when the update is flushed. `create` is one of the
+        ItemObject `create_*` functions, and is called with the connection
+        followed by the arguments given. The item is stored in `items` under
+        `name`.
+        """
+        self._items.append((name, create, args, kwargs))
+
+    async def flush(self, conn : asyncpg.Connection):
+        """Write every staged change in one transaction."""
+        moved = 'adventure' in self.values or 'destination' in self.values
+        self._ranked = {}
+        async with conn.transaction():
+            for name, create, args, kwargs in self._items:
+                self.items[name] = await create(conn, *args, **kwargs)
+
+            if self.deltas or self.values:
+                record = await self._update_players(conn)
+                self._check_level_up(record)
+                if self.level_up is not None:
+                    gold, rubidics = self.level_up[2:]
+                    self.deltas = {'gold' : gold, 'rubidics' : rubidics}
+                    self.values = {}
+                    await self._update_players(conn)
+
+            if self.resources:
+                await self._update_resources(conn)
+
+        # Only committed values reach the rank indexes
+        for stat, value in self._ranked.items():
+            self.player._update_rank(stat, value)
+        if moved:
+            Checks.check_cache.invalidate(self.player.disc_id)
+        self.deltas, self.values, self.resources, self._items = {}, {}, {}, []
+
+    async def _update_players(self, conn : asyncpg.Connection
+            ) -> asyncpg.Record:
+        sets, args = [], []
+        for column, delta in self.deltas.items():
+            args.append(delta)
+            if column == 'gravitas':
+                sets.append(f"gravitas = GREATEST(gravitas + ${len(args)}, 0)")
+            else:
+                sets.append(f"{column} = {column} + ${len(args)}")
+        for column, value in self.values.items():
+            args.append(value)
+            sets.append(f"{column} = ${len(args)}")
+
+        columns = list(self.deltas) + list(self.values)
+        args.append(self.player.disc_id)
+        psql = f"""
+                UPDATE players
+                SET {", ".join(sets)}
+                WHERE user_id = ${len(args)}
+                RETURNING {", ".join(columns)};
+                """
+        record = await conn.fetchrow(psql, *args)
+        for column in columns:
+            attribute = self.COUNTERS.get(column) or self.FIELDS[column]
+            setattr(self.player, attribute, record[column])
+            if column in Analytics.RANKED_STATS:
+                self._ranked[column] = record[column]
+        return record
+
+    def _check_level_up(self, record : asyncpg.Record):
+        xp = self.deltas.get('xp', 0)
+        if xp == 0:
+            return
+        new_level = self.player.get_level()
+        self.player.xp = record['xp'] - xp
+        old_level = self.player.get_level()
+        self.player.xp = record['xp']
+        self.player.level = new_level
+        if new_level > old_level:
+            gold, rubidics = get_level_up_rewards(old_level, new_level)
+            self.level_up = (old_level, new_level, gold, rubidics)
+
+    async def _update_resources(self, conn : asyncpg.Connection):
+        sets, args = [], []
+        for resource, amount in self.resources.items():
+            args.append(amount)
+            sets.append(f"{resource} = {resource} + ${len(args)}")
+        args.append(self.player.disc_id)
+        psql = f"""
+                UPDATE resources
+                SET {", ".join(sets)}
+                WHERE user_id = ${len(args)}
+                RETURNING {", ".join(self.resources)};
+                """
+        record = await conn.fetchrow(psql, *args)
+        self.player.resources.update(record)
+
+    def get_level_up_embed(self) -> Optional[discord.Embed]:
+        """Returns the level-up message for the player, or None if they did
+        not level up.
+        """
+        if self.level_up is None:
+            return None
+        return get_level_up_embed(self.player, *self.level_up[1:])
+
+
+def get_level_up_rewards(old_level : int, new_level : int):
+    """Returns the gold and rubidics earned by levelling up."""
+    # 500gold/level - Follows the sum of integers formula n(n+1)/2
+    gold = (new_level*(new_level+1) - old_level*(old_level+1)) * 250
+    rubidics = int(new_level/10) - int(old_level/10)
+    return gold, rubidics
+
+def get_level_up_embed(player : Player, level : int, gold : int,
+        rubidics : int) -> discord.Embed:
+    embed = discord.Embed(
+        title = f"You have levelled up to level {level}!",
+        color = Vars.ABLUE)
+    embed.add_field(
+        name = f"{player.char_name}, you gained some rewards",
+        value = f"**Gold:** {gold}\n**Rubidics:** {rubidics}")
+    return embed
+
+
+# Loads the player along with everything _load_equips needs in one round trip.
+# Columns belonging to a joined object are aliased "<object>__<column>" so that
+# _get_subrecord can hand each object constructor the record it expects.
+_PLAYER_GRAPH_QUERY = """
+        SELECT
+            players.num,
+            players.user_id,
+            players.user_name,
+            players.xp,
+            players.equipped_item,
+            players.acolyte1,
+            players.acolyte2,
+            players.assc,
+            players.guild_rank,
+            players.gold,
+            players.occupation,
+            players.origin,
+            players.loc,
+            players.pvpwins,
+            players.pvpfights,
+            players.bosswins,
+            players.bossfights,
+            players.rubidics,
+            players.adventure,
+            players.destination,
+            players.gravitas,
+            players.pve_limit,
+            players.daily_streak,
+            players.last_daily,
+            equips.helmet,
+            equips.bodypiece,
+            equips.boots,
+            equips.accessory,
+            weapon.item_id AS weapon__item_id,
+            weapon.user_id AS weapon__user_id,
+            weapon.weapon_name AS weapon__weapon_name,
+            weapon.weapontype AS weapon__weapontype,
+            weapon.attack AS weapon__attack,
+            weapon.crit AS weapon__crit,
+            helmet.armor_id AS helmet__armor_id,
+            helmet.armor_type AS helmet__armor_type,
+            helmet.armor_slot AS helmet__armor_slot,
+            helmet.user_id AS helmet__user_id,
+            bodypiece.armor_id AS bodypiece__armor_id,
+            bodypiece.armor_type AS bodypiece__armor_type,
+            bodypiece.armor_slot AS bodypiece__armor_slot,
+            bodypiece.user_id AS bodypiece__user_id,
+            boots.armor_id AS boots__armor_id,
+            boots.armor_type AS boots__armor_type,
+            boots.armor_slot AS boots__armor_slot,
+            boots.user_id AS boots__user_id,
+            accessory.accessory_id AS accessory__accessory_id,
+            accessory.accessory_type AS accessory__accessory_type,
+            accessory.accessory_name AS accessory__accessory_name,
+            accessory.user_id AS accessory__user_id,
+            accessory.prefix AS accessory__prefix,
+            acolyte1.acolyte_id AS acolyte1__acolyte_id,
+            acolyte1.user_id AS acolyte1__user_id,
+            acolyte1.acolyte_name AS acolyte1__acolyte_name,
+            acolyte1.copies AS acolyte1__copies,
+            acolyte2.acolyte_id AS acolyte2__acolyte_id,
+            acolyte2.user_id AS acolyte2__user_id,
+            acolyte2.acolyte_name AS acolyte2__acolyte_name,
+            acolyte2.copies AS acolyte2__copies,
+            associations.assc_id AS assc__assc_id,
+            associations.assc_name AS assc__assc_name,
+            associations.assc_type AS assc__assc_type,
+            associations.assc_xp AS assc__assc_xp,
+            associations.leader_id AS assc__leader_id,
+            associations.assc_desc AS assc__assc_desc,
+            associations.assc_icon AS assc__assc_icon,
+            associations.join_status AS assc__join_status,
+            associations.base AS assc__base,
+            associations.base_set AS assc__base_set,
+            associations.min_level AS assc__min_level,
+            resources.wheat AS resources__wheat,
+            resources.oat AS resources__oat,
+            resources.wood AS resources__wood,
+            resources.reeds AS resources__reeds,
+            resources.pine AS resources__pine,
+            resources.moss AS resources__moss,
+            resources.iron AS resources__iron,
+            resources.cacao AS resources__cacao,
+            resources.fur AS resources__fur,
+            resources.bone AS resources__bone,
+            resources.silver AS resources__silver
+        FROM players
+        INNER JOIN equips
+            ON players.user_id = equips.user_id
+        LEFT JOIN items AS weapon
+            ON weapon.item_id = players.equipped_item
+        LEFT JOIN armor AS helmet
+            ON helmet.armor_id = equips.helmet
+        LEFT JOIN armor AS bodypiece
+            ON bodypiece.armor_id = equips.bodypiece
+        LEFT JOIN armor AS boots
+            ON boots.armor_id = equips.boots
+        LEFT JOIN accessories AS accessory
+            ON accessory.accessory_id = equips.accessory
+        LEFT JOIN acolytes AS acolyte1
+            ON acolyte1.acolyte_id = players.acolyte1
+        LEFT JOIN acolytes AS acolyte2
+            ON acolyte2.acolyte_id = players.acolyte2
+        LEFT JOIN associations
+            ON associations.assc_id = players.assc
+        LEFT JOIN resources
+            ON resources.user_id = players.user_id
+        """
+
+def _get_subrecord(record : asyncpg.Record, prefix : str) -> Optional[dict]:
+    """Returns the columns of `record` aliased under `prefix` with the prefix
+    stripped, or None if the LEFT JOIN for that object found no row.
+    """
+    prefix += "__"
+    subrecord = {key[len(prefix):] : value for key, value in record.items()
+        if key.startswith(prefix)}
+    if all(value is None for value in subrecord.values()):
+        return None
+    return subrecord
+
 async def get_player_by_id(conn : asyncpg.Connection, user_id : int) -> Player:
     """Return a player object of the player with the given Discord ID."""
-    psql = """
-            SELECT 
-                players.num,
-                players.user_id,
-                players.user_name,
-                players.xp,
-                players.equipped_item,
-                players.acolyte1,
-                players.acolyte2,
-                players.assc,
-                players.guild_rank,
-                players.gold,
-                players.occupation,
-                players.origin,
-                players.loc,
-                players.pvpwins,
-                players.pvpfights,
-                players.bosswins,
-                players.bossfights,
-                players.rubidics,
-                players.adventure,
-                players.destination,
-                players.gravitas,
-                players.pve_limit,
-                players.daily_streak,
-                players.last_daily,
-                equips.helmet,
-                equips.bodypiece,
-                equips.boots,
-                equips.accessory
-            FROM players
-            INNER JOIN equips
-                ON players.user_id = equips.user_id
-            WHERE players.user_id = $1;
-            """
-    
+    psql = _PLAYER_GRAPH_QUERY + "WHERE players.user_id = $1;"
+
     player_record = await conn.fetchrow(psql, user_id)
 
     if player_record is None:
         raise Checks.PlayerHasNoChar
 
+    await AcolyteObject.ensure_catalog(conn)
     player = Player(player_record)
-    await player._load_equips(conn)
+    player._load_equips(player_record)
 
     return player
 
+async def get_players_by_ids(conn : asyncpg.Connection, 
+        user_ids : Iterable[int]) -> List[Player]:
+    """Returns the players with the given Discord IDs, loaded in a single 
+    query however many there are.
+
+    Players are returned in the order their IDs were given. IDs without a
+    character are skipped, and an ID given more than once returns one Player.
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    if not user_ids:
+        return []
+
+    psql = _PLAYER_GRAPH_QUERY + "WHERE players.user_id = ANY($1::bigint[]);"
+    records = await conn.fetch(psql, user_ids)
+
+    await AcolyteObject.ensure_catalog(conn)
+    players = {}
+    for record in records:
+        player = Player(record)
+        player._load_equips(record)
+        players[player.disc_id] = player
+
+    return [players[user_id] for user_id in user_ids if user_id in players]
+
 async def create_character(conn : asyncpg.Connection, user_id : int, 
         name : str) -> Player:
     """Creates and returns a profile for the user with the given Discord ID."""
@@ -921,6 +1298,7 @@ async def create_character(conn : asyncpg.Connection, user_id : int,
     await conn.execute(psql2, user_id)
     await conn.execute(psql3, user_id)
     await conn.execute(psql4, user_id)
+    Checks.check_cache.invalidate(user_id)
 
     await ItemObject.create_weapon(
         conn, user_id, attack=20, crit=0, weapon_name="Wooden Spear", 
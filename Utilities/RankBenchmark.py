@@ -0,0 +1,108 @@
+"""Benchmark for the leaderboard rank indexes in Analytics.
+
+Generates a synthetic players table of each size, builds a RankIndex from
+it the way RankService does and times the operations commands use. No
+database connection is made. Run it with
+
+    python -m Utilities.RankBenchmark --sizes 1000 100000 1000000
+
+to print the build time and the median and 99th percentile latency of
+`get_rank`, `get_top` and `update` at each size.
+"""
+import argparse
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from Utilities.Analytics import RankIndex
+
+FIRST_USER_ID = 10**17 # Discord IDs are 18 digits
+
+
+def generate_players(n : int, rng : np.random.Generator
+        ) -> List[Tuple[int, int]]:
+    """Returns (user_id, gold) for `n` synthetic players, in the order the
+    rank query returns them: gold descending, then user_id.
+
+    Gold is log-normal, as a few players hold most of it, and a tenth of
+    players have none, so the index holds long runs of tied values.
+    """
+    user_ids = FIRST_USER_ID + rng.choice(
+        n * 10, size=n, replace=False).astype(np.int64)
+    gold = rng.lognormal(mean=8, sigma=2, size=n).astype(np.int64)
+    gold[rng.random(n) < 0.1] = 0
+    order = np.lexsort((user_ids, -gold))
+    return list(zip(user_ids[order].tolist(), gold[order].tolist()))
+
+
+def _time(operation : Callable, args : Iterable[tuple]) -> np.ndarray:
+    """Returns the seconds taken by each call of `operation`."""
+    timings = []
+    for arg in args:
+        start = time.perf_counter()
+        operation(*arg)
+        timings.append(time.perf_counter() - start)
+    return np.array(timings)
+
+
+def benchmark(n : int, operations : int = 10000,
+        seed : Optional[int] = None) -> Dict[str, float]:
+    """Time a RankIndex of `n` players.
+
+    Parameters
+    ----------
+    n : int
+        the number of players in the index
+    operations : int, optional
+        the calls timed per operation, by default 10000
+    seed : Optional[int], optional
+        seed for the generated players and the calls made
+
+    Returns
+    -------
+    Dict[str, float]
+        the build time in ms, and the median and 99th percentile of each
+        operation in µs
+    """
+    rng = np.random.default_rng(seed)
+    records = generate_players(n, rng)
+
+    start = time.perf_counter()
+    index = RankIndex("gold", records)
+    result = {"players" : n, "build_ms" : (time.perf_counter() - start) * 1000}
+
+    users = [records[i][0] for i in rng.integers(n, size=operations)]
+    values = rng.lognormal(mean=8, sigma=2, size=operations).astype(int)
+    timings = {
+        "get_rank" : _time(index.get_rank, ((u,) for u in users)),
+        "get_top" : _time(index.get_top, ((10,) for _ in users)),
+        "update" : _time(index.update, zip(users, values.tolist()))
+    }
+    for name, seconds in timings.items():
+        result[f"{name}_p50_us"] = float(np.median(seconds)) * 10**6
+        result[f"{name}_p99_us"] = float(np.percentile(seconds, 99)) * 10**6
+    return result
+
+
+def main(argv : Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Time the rank indexes at different player counts.")
+    parser.add_argument("--sizes", type=int, nargs="+",
+        default=[1000, 100000, 1000000], help="player counts to test")
+    parser.add_argument("--operations", type=int, default=10000,
+        help="calls timed per operation and size")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    columns = ("players", "build_ms", "get_rank_p50_us", "get_rank_p99_us",
+        "get_top_p50_us", "get_top_p99_us", "update_p50_us", "update_p99_us")
+    print("".join(f"{column:>16}" for column in columns))
+    for n in args.sizes:
+        result = benchmark(n, args.operations, args.seed)
+        print("".join(f"{result[column]:>16.1f}" if column != "players"
+            else f"{result[column]:>16}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import asyncpg
+
+import logging
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from Utilities import PlayerObject
+
+logger = logging.getLogger("discord.ayesha.requests")
+
+# The ApplicationContext of the command the current task is running, so that
+# code outside of the command can tell what it is running on behalf of
+current_context : ContextVar = ContextVar("current_context", default=None)
+
+
+def get_current_command() -> Optional[str]:
+    """Returns the qualified name of the command the current task is 
+    running, or None outside of a command.
+    """
+    command = getattr(current_context.get(), "command", None)
+    return getattr(command, "qualified_name", None)
+
+
+class RequestContext:
+    """State shared by the checks and the body of a single command invocation.
+    The bot attaches one to every ApplicationContext as `ctx.request` and
+    closes it once the command completes or errors.
+
+    A database connection is acquired the first time one is needed and is
+    shared by every check of the command. The bot releases it once the 
+    checks pass, so that a command body taking its own connection from the
+    pool never holds two; a body using `acquire()` takes a new one and holds
+    it until the command ends. Loaded players are memoized by ID.
+
+    Attributes
+    ----------
+    user_id : int
+        the ID of the user who invoked the command
+    connections_acquired : int
+        the number of times a connection was taken from the pool
+    queries : int
+        the number of queries made over this context's connections
+    """
+    def __init__(self, pool : asyncpg.Pool, user_id : int):
+        self._pool = pool
+        self.user_id = user_id
+        self._conn = None
+        self._start_count = 0
+        self._players : Dict[int, PlayerObject.Player] = {}
+        self._started_at = time.monotonic()
+
+        self.connections_acquired = 0
+        self.queries = 0
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the command was invoked."""
+        return time.monotonic() - self._started_at
+
+    async def get_conn(self) -> asyncpg.Connection:
+        """Returns the shared connection, acquiring one if there is none."""
+        if self._conn is None:
+            self._conn = await self._pool.acquire()
+            self._start_count = self._conn.query_count
+            self.connections_acquired += 1
+        return self._conn
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Drop-in replacement for `bot.db.acquire()`. The connection is not
+        released when the block exits; use `release()` to give it back early.
+        """
+        yield await self.get_conn()
+
+    async def release(self):
+        """Return the connection to the pool. Call this before waiting on
+        user input so that the connection is not held idle. A later call to
+        `acquire()` takes a new one.
+        """
+        if self._conn is None:
+            return
+        self.queries += self._conn.query_count - self._start_count
+        conn, self._conn = self._conn, None
+        await self._pool.release(conn)
+
+    async def get_player(self, user_id : Optional[int] = None
+            ) -> PlayerObject.Player:
+        """Returns the Player with the given ID, loading it only once per
+        command. Defaults to the invoking user.
+        """
+        user_id = user_id or self.user_id
+        if user_id not in self._players:
+            conn = await self.get_conn()
+            self._players[user_id] = await PlayerObject.get_player_by_id(
+                conn, user_id)
+        return self._players[user_id]
+
+    async def close(self, command_name : str = None):
+        """Release the connection and log what the command used."""
+        await self.release()
+        logger.info(
+            f"/{command_name} by {self.user_id}: "
+            f"{self.connections_acquired} connection(s), "
+            f"{self.queries} queries, "
+            f"{self.elapsed:.3f}s")
@@ -0,0 +1,152 @@
+import asyncpg
+
+import asyncio
+import heapq
+import logging
+import time
+from typing import Awaitable, Callable, List, Optional
+
+logger = logging.getLogger("discord.ayesha.reminders")
+
+# Reminders due within this many seconds are held in memory
+REFILL_WINDOW = 3600
+RETRY_DELAY = 15 # Seconds, doubled after each consecutive failure
+MAX_RETRY_DELAY = 300
+
+
+class ReminderScheduler:
+    """Delivers reminders at their `endtime` without polling the table.
+
+    Every reminder due before `horizon` is held in a min-heap keyed by
+    endtime. The task sleeps until the earliest of the next reminder and the
+    horizon; at the horizon it reloads the next REFILL_WINDOW seconds of
+    reminders from the database. Reminders created in the meantime are pushed
+    onto the heap with `add()`.
+
+    Due reminders are deleted by ID before they are delivered, and only the
+    ones the delete returns are sent, so a reminder removed with
+    `/remind delete` after being loaded is never delivered.
+
+    Parameters
+    ----------
+    pool : asyncpg.Pool
+        the pool holding the `reminders` table
+    deliver : Callable[[asyncpg.Record], Awaitable]
+        called with each due reminder's record: id, starttime, endtime,
+        user_id, content
+    window : int, optional
+        seconds of upcoming reminders to load at once, by default
+        REFILL_WINDOW
+    """
+    def __init__(self, pool : asyncpg.Pool,
+            deliver : Callable[[asyncpg.Record], Awaitable],
+            window : int = REFILL_WINDOW):
+        self._pool = pool
+        self._deliver = deliver
+        self.window = window
+        self.horizon = 0
+        self._heap = [] # (endtime, id, record)
+        self._wakeup = asyncio.Event()
+        self._task : Optional[asyncio.Task] = None
+
+    def __len__(self):
+        return len(self._heap)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start the scheduler if it is not already running."""
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self.running:
+            self._task.cancel()
+
+    def add(self, record : asyncpg.Record):
+        """Schedule a newly inserted reminder. Reminders past the horizon are
+        left for a later refill.
+        """
+        if record['endtime'] > self.horizon:
+            return
+        heapq.heappush(self._heap, (record['endtime'], record['id'], record))
+        if self._heap[0][1] == record['id']: # New earliest; reset the sleep
+            self._wakeup.set()
+
+    async def refill(self):
+        """Load every reminder due within the next window."""
+        previous, self.horizon = self.horizon, int(time.time()) + self.window
+        psql = """
+                SELECT id, starttime, endtime, user_id, content
+                FROM reminders
+                WHERE endtime <= $1;
+                """
+        try:
+            async with self._pool.acquire() as conn:
+                records = await conn.fetch(psql, self.horizon)
+        except BaseException:
+            self.horizon = previous # So that the next pass retries the load
+            raise
+        # Keep reminders added while the query ran
+        loaded = {r['id'] for r in records}
+        added = [entry for entry in self._heap if entry[1] not in loaded]
+        self._heap = added + [(r['endtime'], r['id'], r) for r in records]
+        heapq.heapify(self._heap)
+
+    async def _pop_due(self) -> List[asyncpg.Record]:
+        """Remove the reminders that have come due from the heap and the
+        table. Returns those that were still in the table.
+        """
+        now = time.time()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap)[2])
+        if not due:
+            return []
+
+        psql = """
+                DELETE FROM reminders
+                WHERE id = ANY($1)
+                RETURNING id;
+                """
+        async with self._pool.acquire() as conn:
+            deleted = {r['id'] for r in await conn.fetch(
+                psql, [r['id'] for r in due])}
+        return [r for r in due if r['id'] in deleted]
+
+    async def _sleep_until(self, when : float):
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(
+                self._wakeup.wait(), timeout=max(0, when - time.time()))
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self):
+        delay = RETRY_DELAY
+        while True:
+            try:
+                if time.time() >= self.horizon:
+                    await self.refill()
+
+                for reminder in await self._pop_due():
+                    try:
+                        await self._deliver(reminder)
+                    except Exception:
+                        logger.exception(
+                            f"Failed to deliver reminder {reminder['id']}")
+
+                next_due = self._heap[0][0] if self._heap else self.horizon
+                await self._sleep_until(min(next_due, self.horizon))
+                delay = RETRY_DELAY
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Anything escaping here would end the task and silently stop
+                # every reminder: back off and try again
+                logger.exception(
+                    f"Reminder scheduler failed; retrying in {delay} s")
+                await asyncio.sleep(delay)
+                delay = min(MAX_RETRY_DELAY, delay * 2)
@@ -0,0 +1,66 @@
+import time
+from contextlib import contextmanager
+from typing import List, Tuple
+
+
+class StartupReport:
+    """Timings of each step of the bot's boot, grouped into stages. Steps of
+    the same stage may overlap when they run concurrently, so a stage's
+    wall time is measured separately from the sum of its steps.
+
+    Attributes
+    ----------
+    steps : List[Tuple[str, str, float]]
+        (stage, step, seconds) for each step, in the order they finished
+    stages : List[Tuple[str, float]]
+        (stage, wall seconds) for each stage, in the order they finished
+    """
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self._last_stage_end = self.started_at
+        self.steps : List[Tuple[str, str, float]] = []
+        self.stages : List[Tuple[str, float]] = []
+
+    @contextmanager
+    def stage(self, stage : str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._last_stage_end = time.perf_counter()
+            self.stages.append((stage, self._last_stage_end - start))
+
+    def end_stage(self, stage : str):
+        """Record a stage that began when the previous stage ended, for
+        stages that are not run inside a block, e.g. waiting for the gateway.
+        """
+        start, self._last_stage_end = \
+            self._last_stage_end, time.perf_counter()
+        self.stages.append((stage, self._last_stage_end - start))
+
+    def has_stage(self, stage : str) -> bool:
+        return any(name == stage for name, _ in self.stages)
+
+    @contextmanager
+    def step(self, stage : str, step : str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append((stage, step, time.perf_counter() - start))
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    def format(self) -> str:
+        """Returns a table of every stage and its steps, slowest first."""
+        lines = ["Startup timings:"]
+        for stage, seconds in self.stages:
+            lines.append(f"  {stage:<28}{seconds * 1000:>9.0f} ms")
+            steps = sorted((s for s in self.steps if s[0] == stage),
+                key=lambda s : s[2], reverse=True)
+            for _, step, step_seconds in steps:
+                lines.append(f"    {step:<26}{step_seconds * 1000:>9.0f} ms")
+        lines.append(f"  {'total':<28}{self.elapsed * 1000:>9.0f} ms")
+        return "\n".join(lines)
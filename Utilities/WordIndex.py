@@ -0,0 +1,162 @@
+import asyncpg
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+import random
+import tempfile
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger("discord.ayesha.words")
+
+# Bump this whenever the layout of the saved artifact changes
+ARTIFACT_FORMAT = 1
+ARTIFACT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "Database", "word_index.json.gz")
+
+
+class WordIndex:
+    """An in-memory copy of the dictionary's `word_list` table, so that Word
+    Chain games make no database queries to validate or choose words.
+
+    Words are kept in a set for membership tests and in a sorted tuple per
+    starting letter for picking random words and counting them. The index is
+    saved to ARTIFACT_PATH with the dictionary's version, so a restart with
+    an unchanged dictionary reads the file instead of the whole table.
+
+    Attributes
+    ----------
+    words : frozenset
+        every word in the dictionary
+    by_letter : Dict[str, Tuple[str]]
+        the sorted words beginning with each letter
+    """
+    def __init__(self, words : Iterable[str] = ()):
+        buckets = {}
+        for word in words:
+            if word:
+                buckets.setdefault(word[0], []).append(word)
+
+        self.by_letter : Dict[str, Tuple[str]] = {
+            letter : tuple(sorted(bucket))
+            for letter, bucket in buckets.items()}
+        self.words = frozenset().union(*self.by_letter.values())
+
+    def __len__(self):
+        return len(self.words)
+
+    def __contains__(self, word : str):
+        return word in self.words
+
+    @classmethod
+    async def load(cls, conn : asyncpg.Connection) -> "WordIndex":
+        """Build the index from the `word_list` table."""
+        psql = """
+                SELECT word
+                FROM word_list
+                WHERE word IS NOT NULL;
+                """
+        return cls(record['word'] for record in await conn.fetch(psql))
+
+    @classmethod
+    async def load_cached(cls, conn : asyncpg.Connection,
+            path : str = ARTIFACT_PATH) -> "WordIndex":
+        """Load the index from the artifact at `path` if it was built from
+        the current dictionary, otherwise build it from the table and save a
+        new artifact. Failing to save the artifact is logged, and the index
+        built is returned regardless.
+        """
+        version = await get_dictionary_version(conn)
+        index = await asyncio.to_thread(cls.read_artifact, path, version)
+        if index is None:
+            index = await cls.load(conn)
+            try:
+                await asyncio.to_thread(index.write_artifact, path, version)
+            except OSError as e:
+                logger.warning(f"Could not save the word index to {path}: {e}")
+        return index
+
+    @classmethod
+    def read_artifact(cls, path : str, version : str
+            ) -> Optional["WordIndex"]:
+        """Returns the index saved at `path`, or None if there is no
+        artifact or it does not match the format and dictionary version.
+        """
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                artifact = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if artifact.get("format") != ARTIFACT_FORMAT \
+                or artifact.get("version") != version:
+            return None
+
+        # Buckets are saved sorted, so skip the sort in __init__
+        index = cls.__new__(cls)
+        index.by_letter = {letter : tuple(bucket)
+            for letter, bucket in artifact["words"].items()}
+        index.words = frozenset().union(*index.by_letter.values())
+        return index
+
+    def write_artifact(self, path : str, version : str):
+        """Save the index to `path`, tagged with the dictionary version."""
+        artifact = {
+            "format" : ARTIFACT_FORMAT,
+            "version" : version,
+            "letter_frequency" : self.letter_frequency,
+            "words" : self.by_letter
+        }
+        # Write then rename so a crash never leaves a partial artifact. The
+        # temporary file is unique, as cluster workers may save at once
+        fd, temp = tempfile.mkstemp(
+            dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with gzip.open(os.fdopen(fd, "wb"), "wt", encoding="utf-8") as f:
+                json.dump(artifact, f, separators=(",", ":"))
+            os.replace(temp, path)
+        except BaseException:
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+            raise
+
+    @property
+    def letter_frequency(self) -> Dict[str, int]:
+        """The amount of words that start with each letter."""
+        return {letter : len(bucket)
+            for letter, bucket in self.by_letter.items()}
+
+    def random_word(self, letter : str) -> Optional[str]:
+        """Returns a random word beginning with the given letter, or None if
+        there are none.
+        """
+        bucket = self.by_letter.get(letter)
+        return random.choice(bucket) if bucket else None
+
+
+async def get_dictionary_version(conn : asyncpg.Connection) -> str:
+    """Returns the version of the `word_list` table, which a trigger
+    replaces whenever the table changes (Migration 002). Without that
+    migration the row count and largest ID are used instead, which miss
+    words edited in place.
+    """
+    psql = """
+            SELECT version
+            FROM dictionary_version;
+            """
+    try:
+        return await conn.fetchval(psql)
+    except asyncpg.UndefinedTableError:
+        logger.warning("The dictionary has no version table; apply "
+            "Database/Migrations/002-Dictionary-Version.sql.")
+
+    psql = """
+            SELECT 'count:' || COUNT(*) || ':' || COALESCE(MAX(id), 0)
+            FROM word_list;
+            """
+    return await conn.fetchval(psql)
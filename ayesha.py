@@ -1,24 +1,12 @@
 import discord
 
+import argparse
+import asyncio
 import logging
-import sys
 
 from Utilities import config, Vars
 from Utilities.AyeshaBot import Ayesha
-
-# Create base logger
-logger = logging.getLogger('discord')
-logger.setLevel(logging.INFO)
-handler = logging.FileHandler(filename=config.LOG_FILE, 
-                              encoding='utf-8', 
-                              mode='w')
-handler.setFormatter(logging.Formatter(
-    '%(asctime)s:%(levelname)s:%(name)s: %(message)s'))
-logger.addHandler(handler)
-
-# Wipe error logger
-with open(config.ERROR_LOG_FILE, "w") as f:
-    pass
+from Utilities.Cluster import get_shard_count, plan_clusters, Supervisor
 
 # Load Cogs
 init_cogs = [
@@ -41,19 +29,51 @@ init_cogs = [
     "cogs.Vote"
 ]
 
-if "-b" in sys.argv: # Run beta version
-    init_cogs.remove("cogs.Reminders")
-    init_cogs.remove("cogs.Vote")
-
-bot = Ayesha(init_cogs)
-bot.run(config.TOKEN)
-
-# Ping command; currently not in use
-@bot.slash_command(guild_ids=[762118688567984151])
-async def ping(ctx):
-    """Ping to see if bot is working."""
-    fmt = f"Latency is {bot.latency * 1000:.2f} ms"
-    embed = discord.Embed(title="Pong!", 
-                           description=fmt, 
-                           color=Vars.ABLUE)
-    await ctx.respond(embed=embed)
\ No newline at end of file
+# Cluster workers are started with the spawn method, which imports this
+# file again in each of them, so nothing may run outside of this block
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-b", action="store_true", 
+        help="run the beta version")
+    parser.add_argument("--cluster", type=int, metavar="K",
+        help="run the shards in K worker processes")
+    parser.add_argument("--shards", type=int, metavar="N",
+        help="the total shards of a cluster; by default Discord's "
+            "recommendation")
+    args = parser.parse_args()
+
+    # Create base logger
+    logger = logging.getLogger('discord')
+    logger.setLevel(logging.INFO)
+    handler = logging.FileHandler(filename=config.LOG_FILE, 
+                                  encoding='utf-8', 
+                                  mode='w')
+    handler.setFormatter(logging.Formatter(
+        '%(asctime)s:%(levelname)s:%(name)s: %(message)s'))
+    logger.addHandler(handler)
+
+    # Wipe error logger
+    with open(config.ERROR_LOG_FILE, "w") as f:
+        pass
+
+    if args.b: # Run beta version
+        init_cogs.remove("cogs.Reminders")
+        init_cogs.remove("cogs.Vote")
+
+    if args.cluster:
+        shard_count = args.shards \
+            or asyncio.run(get_shard_count(config.TOKEN))
+        Supervisor(plan_clusters(init_cogs, args.cluster, shard_count)).run()
+    else:
+        bot = Ayesha(init_cogs)
+        bot.run(config.TOKEN)
+
+        # Ping command; currently not in use
+        @bot.slash_command(guild_ids=[762118688567984151])
+        async def ping(ctx):
+            """Ping to see if bot is working."""
+            fmt = f"Latency is {bot.latency * 1000:.2f} ms"
+            embed = discord.Embed(title="Pong!", 
+                                   description=fmt, 
+                                   color=Vars.ABLUE)
+            await ctx.respond(embed=embed)
\ No newline at end of file
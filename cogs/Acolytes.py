@@ -7,28 +7,22 @@ import asyncpg
 import random
 from typing import List
 
-from Utilities import Checks, Vars, PlayerObject
+from Utilities import AcolyteObject, Checks, Vars, PlayerObject
 from Utilities.AcolyteObject import EmptyAcolyte, InfoAcolyte, OwnedAcolyte
 from Utilities.AyeshaBot import Ayesha
 from Utilities.ConfirmationMenu import ConfirmationMenu
 
-def acolyte_equipped(player,acolyte_id):
-    id_1=player.acolyte1.id
-    id_2=player.acolyte2.id
-    return (acolyte_id==id_1 or acolyte_id==id_2)
-
 async def get_all_acolytes(conn : asyncpg.Connection, 
         user_id : int) -> List[OwnedAcolyte]:
     """Returns a list of Acolytes the player with the ID owns"""
     psql = """
-          SELECT acolyte_id
+          SELECT acolyte_id, user_id, acolyte_name, copies
           FROM acolytes
           WHERE user_id = $1
           ORDER BY acolyte_name;
           """
-    list_ids = await conn.fetch(psql, user_id)
-    temp=[record['acolyte_id'] for record in list_ids]
-    return [await OwnedAcolyte.from_id(conn, id) for id in temp]
+    records = await conn.fetch(psql, user_id)
+    return [OwnedAcolyte.from_record(record) for record in records]
 
 class Acolytes(commands.Cog):
     """
@@ -43,18 +37,19 @@ class Acolytes(commands.Cog):
         print("Acolyte is ready.")
 
     #add logic to add when not equipped
-    def write(self, start : int, inv: List[EmptyAcolyte], 
-            player : PlayerObject.Player) -> discord.Embed:
+    def write(self, start : int, inv: List[EmptyAcolyte], char_name : str,
+            equipped : tuple) -> discord.Embed:
         """
-        A helper function that creates the embeds for the tavern method
+        A helper function that creates the embeds for the tavern method.
+        equipped holds the IDs of the acolytes the player has equipped.
         """
-        embed = discord.Embed(title=f'{player.char_name}\'s Tavern', 
+        embed = discord.Embed(title=f'{char_name}\'s Tavern', 
                               color=Vars.ABLUE)
         iteration = 0
         while start < len(inv) and iteration < 5: 
             #Loop til 5 entries or none left
             #add whether acolyte is equipped or not. 
-            if acolyte_equipped(player,inv[start].id):
+            if inv[start].id is not None and inv[start].id in equipped:
                 embed.add_field(
                     name=f"({inv[start].stars}) {inv[start].name} [EQUIPPED]",
                     value=(
@@ -98,28 +93,34 @@ class Acolytes(commands.Cog):
         """View the list of acolytes"""
         psql = """
                 SELECT uid, name AS acolyte_name, acolytes.user_id, 
-                    acolytes.acolyte_id, acolytes.copies, attack, crit, hp, 
-                    effect, story, image
+                    acolytes.acolyte_id, acolytes.copies, players.user_name,
+                    players.acolyte1, players.acolyte2
                 FROM acolyte_list
+                CROSS JOIN players
                 LEFT JOIN acolytes 
                     ON acolyte_list.name = acolytes.acolyte_name 
-                        AND acolytes.user_id = $1
+                        AND acolytes.user_id = players.user_id
+                WHERE players.user_id = $1
                 ORDER BY (acolytes.acolyte_id IS NOT NULL) DESC, uid;
                """
-        # Creates the list of acolytes
+        # Creates the list of acolytes; base stats come from the catalog
         async with self.bot.db.acquire() as conn:
-            acolytes = await conn.fetch(psql, ctx.author.id)
-            new_acolytes = []
-            for record in acolytes:
-                if record['acolyte_id'] is not None:
-                    new_acolytes.append(
-                        await OwnedAcolyte.from_id(conn, record['acolyte_id']))
-                else:
-                    new_acolytes.append(await InfoAcolyte.from_name(
-                        conn, record['acolyte_name']))
-            acolytes = new_acolytes
-        
-            player = await PlayerObject.get_player_by_id(conn, ctx.author.id)
+            await AcolyteObject.ensure_catalog(conn)
+            records = await conn.fetch(psql, ctx.author.id)
+
+        if not records:
+            raise Checks.PlayerHasNoChar
+        char_name = records[0]['user_name']
+        equipped = (records[0]['acolyte1'], records[0]['acolyte2'])
+
+        new_acolytes = []
+        for record in records:
+            if record['acolyte_id'] is not None:
+                new_acolytes.append(OwnedAcolyte.from_record(record))
+            else:
+                new_acolytes.append(
+                    InfoAcolyte.from_catalog(record['acolyte_name']))
+        acolytes = new_acolytes
         
         # Sort according to argument passed
         BIGN = 9223372036854775807
@@ -140,11 +141,11 @@ class Acolytes(commands.Cog):
                 acolytes.sort(key=lambda x : x.id is None, reverse=True)
 
         acolytes.sort( # Put the equipped acolytes at the top
-            key=lambda x : x.id in (player.acolyte1.id, player.acolyte2.id),
+            key=lambda x : x.id is not None and x.id in equipped,
             reverse=True)
 
         # Display initial tavern embed
-        embeds = [self.write(i, new_acolytes, player) 
+        embeds = [self.write(i, new_acolytes, char_name, equipped) 
             for i in range(0, len(acolytes), 5)]
         
         paginator = pages.Paginator(pages=embeds, timeout=30)
@@ -161,8 +162,9 @@ class Acolytes(commands.Cog):
         """View an acolyte's detailed information."""
         # Validate acolyte
         acolyte = acolyte.title()
-        async with self.bot.db.acquire() as conn:
-            acolyte_info = await InfoAcolyte.from_name(conn, acolyte)
+        async with ctx.request.acquire() as conn:
+            await AcolyteObject.ensure_catalog(conn)
+        acolyte_info = InfoAcolyte.from_catalog(acolyte)
             
         # Create and send embed
         embed = discord.Embed(title=acolyte_info.name, color=Vars.ABLUE)
@@ -235,41 +237,50 @@ class Acolytes(commands.Cog):
                         if ctx.value.lower() in name.lower()]))):
         """Spend 1 rubidic to add a new acolyte to your tavern!"""
         name = name.title()
-        async with self.bot.db.acquire() as conn:
-            # Ensure player has sufficient rubidics
-            player = await PlayerObject.get_player_by_id(conn, ctx.author.id)
-            if player.rubidics < 1:
-                raise Checks.NotEnoughResources("rubidics", 1, player.rubidics)
+        # Ensure player has sufficient rubidics
+        player = await ctx.request.get_player()
+        if player.rubidics < 1:
+            raise Checks.NotEnoughResources("rubidics", 1, player.rubidics)
 
-            # Validate acolyte being summoned
-            acolyte_info = await InfoAcolyte.from_name(conn, name)
+        # Validate acolyte being summoned
+        async with ctx.request.acquire() as conn:
+            await AcolyteObject.ensure_catalog(conn)
+        acolyte_info = InfoAcolyte.from_catalog(name)
 
-            # Send confirmation box
-            embed = discord.Embed(
-                title=(
-                    f"Are you sure you want to add {acolyte_info.name} "
-                    "to your tavern?"),
-                description=(
-                    f"This action will cost `1` rubidic. You currently have "
-                    f"`{player.rubidics}` rubidics. "),
-                color=Vars.ABLUE)
-            if acolyte_info.image is not None:
-                embed.set_thumbnail(url=acolyte_info.image)
-            view = ConfirmationMenu(user=ctx.author, timeout=30.0)
-            msg = await ctx.respond(embed=embed, view=view)
+        # Send confirmation box. Don't hold a connection while they decide
+        await ctx.request.release()
+        embed = discord.Embed(
+            title=(
+                f"Are you sure you want to add {acolyte_info.name} "
+                "to your tavern?"),
+            description=(
+                f"This action will cost `1` rubidic. You currently have "
+                f"`{player.rubidics}` rubidics. "),
+            color=Vars.ABLUE)
+        if acolyte_info.image is not None:
+            embed.set_thumbnail(url=acolyte_info.image)
+        view = ConfirmationMenu(user=ctx.author, timeout=30.0)
+        msg = await ctx.respond(embed=embed, view=view)
 
-            await view.wait()
-            if view.value is None:
-                await msg.delete_original_response()
-                return await ctx.respond("Timed out.")
-            elif not view.value:
-                await msg.delete_original_response()
-                return await ctx.respond("Cancelled the transaction.")
+        await view.wait()
+        if view.value is None:
+            await msg.delete_original_response()
+            return await ctx.respond("Timed out.")
+        elif not view.value:
+            await msg.delete_original_response()
+            return await ctx.respond("Cancelled the transaction.")
 
-            # Add acolyte to player's tavern
+        async with ctx.request.acquire() as conn:
+            # Add acolyte to player's tavern, rechecking the rubidics and
+            # copies since the player may have used another command meanwhile
             try:
-                new_acolyte = await OwnedAcolyte.create_acolyte(conn, 
-                    ctx.author.id, name)
+                async with conn.transaction():
+                    await player.spend_rubidics(conn, 1)
+                    new_acolyte = await OwnedAcolyte.create_acolyte(conn, 
+                        ctx.author.id, name)
+            except Checks.NotEnoughResources:
+                await msg.delete_original_response()
+                raise
             except Checks.DuplicateAcolyte as e:
                 return await msg.edit_original_response(
                     content=(
@@ -297,7 +308,6 @@ class Acolytes(commands.Cog):
                 f"Equip {new_acolyte.name} with '/recruit {new_acolyte.name}'."))
 
             await msg.edit_original_response(embed=embed, view=None)
-            await player.give_rubidics(conn, -1)
 
 
 def setup(bot):
@@ -78,7 +78,9 @@ class Associations(commands.Cog):
                 interest_scheduler.run_pending()
                 await asyncio.sleep(interest_scheduler.idle_seconds)
 
-        asyncio.ensure_future(schedule_interest_updates())
+        # Only one process of a cluster pays the interest
+        if self.bot.is_primary:
+            asyncio.ensure_future(schedule_interest_updates())
 
 
     # EVENTS
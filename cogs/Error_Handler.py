@@ -224,6 +224,13 @@ class Error_Handler(commands.Cog):
                 await ctx.respond(message)
                 print_traceback = False
 
+            if isinstance(error.original, Checks.ItemChanged):
+                message = (
+                    f"This item changed while you were deciding, so nothing "
+                    f"was charged. Please try again.")
+                await ctx.respond(message)
+                print_traceback = False
+
             if isinstance(error.original, Checks.NotAdmin):
                 message = f"This command is reserved for admins."
                 await ctx.respond(message, ephemeral=True)
@@ -164,22 +164,6 @@ class Items(commands.Cog):
                     if armor_material is not None else ""}
             ORDER BY equipped DESC, armor_id DESC;
             """
-        accessory_query = f"""
-            SELECT accessory_id, 
-                (
-                    accessory_id = (
-                        SELECT accessory FROM equips WHERE user_id = $1
-                    )
-                ) 
-                AS equipped
-            FROM accessories
-            WHERE user_id = $1
-                {f"AND prefix = '{accessory_effect}'"
-                    if accessory_effect is not None else ""}
-                {f"AND accessory_type = '{accessory_material}'"
-                    if accessory_material is not None else ""}
-            ORDER BY equipped DESC, accessory_id DESC; 
-            """
 
         # Pull relevant records from db
         async with self.bot.db.acquire() as conn:
@@ -187,13 +171,8 @@ class Items(commands.Cog):
 
             armory = await conn.fetch(armor_query, ctx.author.id)
 
-            accessories = await conn.fetch(accessory_query, ctx.author.id)
-            wardrobe_items = []
-            for accessory in accessories:
-                temp = await ItemObject.get_accessory_by_id(conn, accessory['accessory_id'])
-                temp.equipped = accessory['equipped']
-                wardrobe_items.append(temp)
-            accessories = wardrobe_items
+            accessories = await ItemObject.get_accessories_by_owner(conn, 
+                ctx.author.id, accessory_effect, accessory_material)
 
         inventory_embeds = self.create_embed(weapons, "Your Weapons", 
             self.weapons_field_values, 5)
@@ -463,9 +442,9 @@ class Items(commands.Cog):
             item_id : Option(int,
                 description="The ID of the weapon you are offering")):
         """Offer an item or gold to another player."""
-        async with self.bot.db.acquire() as conn:
-            author = await PlayerObject.get_player_by_id(conn, ctx.author.id)
-            player_char = await PlayerObject.get_player_by_id(conn, player.id)
+        async with ctx.request.acquire() as conn:
+            author = await ctx.request.get_player()
+            player_char = await ctx.request.get_player(player.id)
             # Check for valid input
             if player_char.gold < price:
                 return await ctx.respond(
@@ -502,22 +481,37 @@ class Items(commands.Cog):
                 f"They are charging you `{price}` gold. Do you accept?\n"
                 f"(You currently have `{player_char.gold}` gold.)")
 
-            # Send player the offer
-            view = ConfirmationMenu(user=player, timeout=30.0)
-            self.bot.trading_players[ctx.author.id] = 0
-            msg = await ctx.respond(content=message, view=view)
-            await view.wait()
-            if view.value is None:
-                await ctx.respond("Timed out.")
-            elif view.value and not item.is_empty: # Works for Weapon and Armor
-                await item.set_owner(conn, player_char.disc_id)
-                await player_char.give_gold(conn, price*-1)
-                await author.give_gold(conn, price)
-                await ctx.respond("They accepted the offer.")
-            else:
-                await ctx.respond("They declined your offer.")
-            await msg.delete_original_response()
-            self.bot.trading_players.pop(ctx.author.id)
+        # Send player the offer. Don't hold a connection while they decide
+        await ctx.request.release()
+        view = ConfirmationMenu(user=player, timeout=30.0)
+        self.bot.trading_players[ctx.author.id] = 0
+        msg = await ctx.respond(content=message, view=view)
+        await view.wait()
+        await msg.delete_original_response()
+        self.bot.trading_players.pop(ctx.author.id)
+        if view.value is None:
+            return await ctx.respond("Timed out.")
+        elif not view.value or item.is_empty: # Works for Weapon and Armor
+            return await ctx.respond("They declined your offer.")
+
+        # Either party may have changed something while the offer was open, 
+        # so the trade is rechecked as it is made
+        async with ctx.request.acquire() as conn:
+            try:
+                async with conn.transaction():
+                    await item.transfer(
+                        conn, author.disc_id, player_char.disc_id)
+                    await player_char.spend_gold(conn, price)
+                    await author.give_gold(conn, price)
+            except (Checks.NotWeaponOwner, Checks.NotArmorOwner):
+                return await ctx.respond(
+                    "The offer fell through: the item is no longer yours to "
+                    "sell, or you have equipped it.")
+            except Checks.NotEnoughGold:
+                return await ctx.respond(
+                    f"The offer fell through: {player.mention} can no longer "
+                    f"afford your price.")
+        await ctx.respond("They accepted the offer.")
 
 
 def setup(bot):
@@ -9,6 +9,7 @@ import random
 
 from Utilities import ConfirmationMenu, Vars
 from Utilities.AyeshaBot import Ayesha
+from Utilities.WordIndex import WordIndex
 
 # The dictionary used is words_alpha given here: https://github.com/dwyl/english-words
 
@@ -89,9 +90,8 @@ class WordChain:
         The game mode type: Solo, Pubic, Lightning, or Scrabble
     conn : asyncpg.Connection
         A connection to the game's database
-    char_freq : dict
-        A dictionary containing the amount of words starting with each
-        letter
+    words : WordIndex
+        The dictionary of valid words
     timeout : float
         The time in seconds a player has to answer
     players : List[int]
@@ -101,7 +101,7 @@ class WordChain:
         This is used for Scrabble Mode
     """
     def __init__(self, bot : Ayesha, ctx : discord.Message,
-            type : str, conn : asyncpg.Connection, char_freq : dict):
+            type : str, conn : asyncpg.Connection, words : WordIndex):
         """
         Parameters
         ----------
@@ -113,16 +113,15 @@ class WordChain:
             The game mode type: Solo, Pubic, Lightning, or Scrabble
         conn : asyncpg.Connection
             A connection to the game's database
-        char_freq : dict
-            A dictionary containing the amount of words starting with each
-            letter
+        words : WordIndex
+            The dictionary of valid words
         """
         self.bot = bot
         self.ctx = ctx
         self.type = type
         self.host = ctx.author
         self.conn = conn
-        self.char_freq = char_freq
+        self.words = words
 
         # Useful information 
         self.timeout = 15.0 if self.type == "Lightning" else 30.0
@@ -165,20 +164,12 @@ class WordChain:
         else:
             await self.play_public()
 
-    async def check_validity(self, letter : str, word : str) -> bool:
+    def check_validity(self, letter : str, word : str) -> bool:
         """Checks to see if the given word meets the following criteria:
         1. Word begins with the passed letter
-        2. Word is in the dictionary database
+        2. Word is in the dictionary
         """
-        if not word.startswith(letter):
-            return False
-
-        psql = """
-                SELECT id
-                FROM word_list
-                WHERE word = $1;
-                """
-        return await self.conn.fetchval(psql, word) is not None
+        return word.startswith(letter) and word in self.words
 
     def calc_scrabble_score(self, word : str) -> int:
         """Calculates the points a word earns by scrabble character rules."""
@@ -262,7 +253,7 @@ class WordChain:
             except KeyError: # Word not yet given
                 used_words[word] = 1
 
-            if not await self.check_validity(next_letter, word):
+            if not self.check_validity(next_letter, word):
                 score = len(used_words) // 2
                 message = f"Invalid Word! | Score: {score}"
                 await interaction.reply(content=message)
@@ -274,22 +265,16 @@ class WordChain:
             # Now bot selects a word
                 # NB: You can find my qualms with this issue in the old version
                 # https://github.com/seanathan-discordbot/Ayesha_Bot/blob/main/cogs/Minigames.py
-                # Line 402 - I like this option as it seems to frontload the 
-                # work onto bot startup and I can take full advantage of the
-                # entire vocabulary this time. In fact, the query execution
-                # time seems to have been reduced from 100 ms to < 40. 
-            word_id = random.randint(1, self.char_freq[next_letter])
-            psql = f"""
-                    WITH valid_words AS (
-                        SELECT ROW_NUMBER() OVER () AS rank, word
-                        FROM word_list
-                        WHERE word LIKE '{next_letter}%'
-                    )
-                    SELECT word 
-                    FROM valid_words
-                    WHERE rank = $1;
-                    """
-            word = await self.conn.fetchval(psql, word_id)
+                # Line 402 - The whole dictionary is now held in memory, so
+                # the bot can draw from the entire vocabulary without a query.
+            word = self.words.random_word(next_letter)
+            if word is None: # No word begins with this letter
+                score = len(used_words) // 2
+                message = (
+                    f"I can't think of a word beginning with "
+                    f"**{next_letter}**!\nYou win! | Score : {score}")
+                await interaction.reply(content=message)
+                return await self.input_solo_game(score)
 
             try:
                 if used_words[word] > 0:
@@ -465,7 +450,7 @@ class WordChain:
                 self.players.pop(0)
                 eliminated = True
 
-            if not await self.check_validity(next_letter, word):
+            if not self.check_validity(next_letter, word):
                 await interaction.reply(
                     "Invalid word! | You have been eliminated.")
                 if self.type == "Scrabble":
@@ -498,22 +483,15 @@ class Minigames(commands.Cog):
     # Events
     @commands.Cog.listener()
     async def on_ready(self):
-        # Get the amount of words that start with each letter
-        async with self.bot.dictionary.acquire() as conn:
-            letter_frequency = {}
-            for letter in alphabet:
-                psql = f"""
-                        WITH ranks AS (
-                            SELECT ROW_NUMBER() OVER () AS rank, word
-                            FROM word_list
-                            WHERE word LIKE '{letter}%'
-                        )
-                        SELECT COUNT(*) FROM ranks LIMIT 10;
-                        """
-                letter_frequency[letter] = await conn.fetchval(psql)
-            self.letter_frequency = letter_frequency
         print("Minigames is ready.")
 
+    @property
+    def word_index(self) -> WordIndex:
+        """The dictionary held in memory so games make no word queries. The
+        bot loads it while warming up.
+        """
+        return self.bot.word_index
+
     @commands.Cog.listener()
     async def on_message(self, message : discord.Message):
         if message.author.bot:
@@ -541,7 +519,7 @@ class Minigames(commands.Cog):
                 mode = "Scrabble"
 
             async with self.bot.dictionary.acquire() as conn:
-                game = WordChain(self.bot, message, mode, conn, self.letter_frequency)
+                game = WordChain(self.bot, message, mode, conn, self.word_index)
                 await game.play()
 
             self.active_channels.pop(message.channel.id)
@@ -676,12 +654,8 @@ class Minigames(commands.Cog):
     async def _check(self, ctx, word : str):
         """See if a word exists in the Ayesha dictionary"""
         word = word.lower()
-        psql = "SELECT id FROM word_list WHERE word = $1;"
-
-        async with self.bot.dictionary.acquire() as conn:
-            word_id = await conn.fetchval(psql, word)
 
-        if word_id is None:
+        if word not in self.word_index:
             return await ctx.respond(f"**{word}** is not in our database.")
         else:
             points = sum([point_conversion[c] for c in word])
@@ -10,6 +10,7 @@ import schedule
 import time
 
 from Utilities import Analytics, Checks, PlayerObject, Vars
+from Utilities.Database import query_stats
 from Utilities.AyeshaBot import Ayesha
 
 class LeaderboardMenu(discord.ui.Select):
@@ -127,6 +128,47 @@ class Misc(commands.Cog):
             "Rubidics" : rubidics
         }
 
+    def stage_daily_rewards(self, player : PlayerObject.Player, 
+            rewards : dict, update : PlayerObject.PlayerUpdate) -> str:
+        """Adds association bonuses to the daily rewards and stages them in
+        the update. Returns the message listing what the player received.
+        """
+        gold_bonus, iron_bonus, gravitas_bonus = [], [], []
+        e_message = "From your bonus, you received:\n"
+
+        if player.assc.type == "Guild":
+            bonus = player.assc.get_level() * 30
+            rewards["Gold"] += bonus
+            gold_bonus.append((bonus, "Guild")) 
+        update.give_gold(rewards["Gold"])
+        e_message += Analytics.stringify_gains("gold", 
+                rewards["Gold"], gold_bonus) + "\n"
+
+        if rewards["Iron"] > 0:
+            if player.assc.type == "Brotherhood":
+                bonus = player.assc.get_level() * 20
+                rewards["Iron"] += bonus
+                iron_bonus.append((bonus, "Brotherhood"))
+            update.give_resource("iron", rewards["Iron"])
+            e_message += Analytics.stringify_gains("iron", 
+                    rewards["Iron"], iron_bonus) + "\n"
+
+        if rewards["Gravitas"] > 0:
+            if player.assc.type == "College":
+                bonus = int(player.assc.get_level() / 2)
+                rewards["Gravitas"] += bonus
+                gravitas_bonus.append((bonus, "College"))
+            update.give_gravitas(rewards["Gravitas"])
+            e_message += Analytics.stringify_gains("gravitas", 
+                    rewards["Gravitas"], gravitas_bonus) + "\n"
+        
+        if rewards["Rubidics"] > 0:
+            e_message += Analytics.stringify_gains("rubidic",
+                rewards["Rubidics"], [])
+            update.give_rubidics(rewards["Rubidics"])
+
+        return e_message
+
 
     # COMMANDS
     @commands.slash_command()
@@ -139,7 +181,13 @@ class Misc(commands.Cog):
             player = await PlayerObject.get_player_by_id(conn, ctx.author.id)
 
             try:
-                refresh_time = await player.collect_daily(conn)
+                async with conn.transaction():
+                    refresh_time = await player.collect_daily(conn)
+                    rewards = self.calc_daily_rewards(player)
+                    update = PlayerObject.PlayerUpdate(player)
+                    e_message = self.stage_daily_rewards(
+                        player, rewards, update)
+                    await update.flush(conn)
             except Checks.AlreadyClaimedDaily as e:
                 title = "You already claimed your daily today."
                 e_message = ""
@@ -148,42 +196,6 @@ class Misc(commands.Cog):
                 title = "You claimed your daily bonus!"
                 refresh_msg = refresh_str(refresh_time)
 
-                # Calculate and distribute rewards
-                rewards = self.calc_daily_rewards(player)
-                gold_bonus, iron_bonus, gravitas_bonus = [], [], []
-                e_message = "From your bonus, you received:\n"
-
-                if player.assc.type == "Guild":
-                    bonus = player.assc.get_level() * 30
-                    rewards["Gold"] += bonus
-                    gold_bonus.append((bonus, "Guild")) 
-                await player.give_gold(conn, rewards["Gold"])
-                e_message += Analytics.stringify_gains("gold", 
-                        rewards["Gold"], gold_bonus) + "\n"
-
-                if rewards["Iron"] > 0:
-                    if player.assc.type == "Brotherhood":
-                        bonus = player.assc.get_level() * 20
-                        rewards["Iron"] += bonus
-                        iron_bonus.append((bonus, "Brotherhood"))
-                    await player.give_resource(conn, "iron", rewards["Iron"])
-                    e_message += Analytics.stringify_gains("iron", 
-                            rewards["Iron"], iron_bonus) + "\n"
-
-                if rewards["Gravitas"] > 0:
-                    if player.assc.type == "College":
-                        bonus = int(player.assc.get_level() / 2)
-                        rewards["Gravitas"] += bonus
-                        gravitas_bonus.append((bonus, "College"))
-                    await player.give_gravitas(conn, rewards["Gravitas"])
-                    e_message += Analytics.stringify_gains("gravitas", 
-                            rewards["Gravitas"], gravitas_bonus) + "\n"
-                
-                if rewards["Rubidics"] > 0:
-                    e_message += Analytics.stringify_gains("rubidic",
-                        rewards["Rubidics"], [])
-                    await player.give_rubidics(conn, rewards["Rubidics"])
-
         # Create and send embed
         embed = discord.Embed(title=title, description=e_message, 
             color=Vars.ABLUE)
@@ -288,28 +300,26 @@ class Misc(commands.Cog):
     @commands.check(Checks.is_player)
     async def leaderboard(self, ctx):
         """See the leaderboards and other cool information."""
-        async with self.bot.db.acquire() as conn:
-            author = await PlayerObject.get_player_by_id(conn, ctx.author.id)
-            # Meta information
+        async with ctx.request.acquire() as conn:
+            author = await ctx.request.get_player()
+            Analytics.rank_service.sync_player(author)
+            # Meta information and top 10s are shared between callers
             servers = len(ctx.bot.guilds)
-            players = await PlayerObject.get_player_count(conn)
-            econ_info = await Analytics.get_econ_info(conn)
-            acolyte_info = await Analytics.get_acolyte_info(conn)
-            combat_info = await Analytics.get_combat_info(conn)
-            # Top xp
-            top_xp = await Analytics.get_top_xp(conn)
+            snapshot = await Analytics.get_leaderboard_snapshot(conn)
+            players = snapshot['players']
+            econ_info = snapshot['econ']
+            acolyte_info = snapshot['acolytes']
+            combat_info = snapshot['combat']
+            top_xp = snapshot['top_xp']
+            top_gold = snapshot['top_gold']
+            top_pve = snapshot['top_pve']
+            top_pvp = snapshot['top_pvp']
+            top_grav = snapshot['top_gravitas']
+            # Author ranks are in-memory lookups
             player_xp = await Analytics.get_xp_rank(conn, ctx.author.id)
-            # Top Gold
-            top_gold = await Analytics.get_top_gold(conn)
             player_gold = await Analytics.get_gold_rank(conn, ctx.author.id)
-            # Top PvE
-            top_pve = await Analytics.get_top_pve(conn)
             player_pve = await Analytics.get_bosswins_rank(conn, ctx.author.id)
-            # Top PvP
-            top_pvp = await Analytics.get_top_pvp(conn)
             player_pvp = await Analytics.get_pvpwins_rank(conn, ctx.author.id)
-            # Top Gravitas
-            top_grav = await Analytics.get_top_gravitas(conn)
             player_grav = await Analytics.get_gravitas_rank(conn, ctx.author.id)
 
         # Meta Embed
@@ -519,6 +529,46 @@ class Misc(commands.Cog):
                 f"Your heist at {place} was a {result}! You ran off with "
                 f"`{gold_delta}` gold.")
 
+    @commands.slash_command()
+    @commands.check(Checks.is_admin)
+    async def querystats(self, ctx,
+            top : Option(int,
+                description="The amount of statements to show",
+                default=10,
+                min_value=1,
+                max_value=10),
+            order : Option(str,
+                description="What to rank the statements by",
+                default="total_time",
+                choices=[
+                    OptionChoice("Total time", "total_time"),
+                    OptionChoice("99th percentile time", "p99"),
+                    OptionChoice("Calls", "calls")])):
+        """See which database statements take up the most time."""
+        statements = query_stats.get_top(top, order)
+        if not statements:
+            return await ctx.respond("No queries recorded yet.", 
+                ephemeral=True)
+
+        embed = discord.Embed(
+            title=f"Top {len(statements)} Statements by {order}",
+            description=(
+                f"Statements slower than "
+                f"`{query_stats.slow_threshold * 1000:.0f}` ms are logged."),
+            color=Vars.ABLUE)
+        for statement, stats in statements:
+            if len(statement) > 400:
+                statement = statement[:400] + "..."
+            errors = f", {stats.errors} errors" if stats.errors else ""
+            embed.add_field(
+                name=(
+                    f"{stats.total_time:.2f}s total, {stats.calls} calls, "
+                    f"p99 {stats.p99 * 1000:.1f} ms, {stats.rows} rows"
+                    f"{errors}"),
+                value=f"```sql\n{statement}```",
+                inline=False)
+        await ctx.respond(embed=embed, ephemeral=True)
+
 
 def setup(bot):
     bot.add_cog(Misc(bot))
\ No newline at end of file
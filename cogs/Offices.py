@@ -20,11 +20,12 @@ class Offices(commands.Cog):
             # Give payout to current mayor and comptroller
             async with self.bot.db.acquire() as conn:
                 comp_rec = await PlayerObject.get_comptroller(conn)
-                comptroller = await PlayerObject.get_player_by_id(
-                    conn, comp_rec['officeholder'])
                 mayor_rec = await PlayerObject.get_mayor(conn)
-                mayor = await PlayerObject.get_player_by_id(
-                    conn, mayor_rec['officeholder'])
+                officeholders = {player.disc_id : player for player in 
+                    await PlayerObject.get_players_by_ids(conn, (
+                        comp_rec['officeholder'], mayor_rec['officeholder']))}
+                comptroller = officeholders[comp_rec['officeholder']]
+                mayor = officeholders[mayor_rec['officeholder']]
                 tax_info = await Finances.get_tax_info(conn)
                 payout = int((tax_info['Collected'] or 0) / 33)
                 await comptroller.give_gold(conn, payout)
@@ -64,10 +65,12 @@ class Offices(commands.Cog):
                         """
                 new_mayor_id = await conn.fetchval(psql1)
                 new_comp_id = await conn.fetchval(psql2)
-                new_mayor = await self.bot.fetch_user(new_mayor_id)
-                new_comp = await self.bot.fetch_user(new_comp_id)
+                Checks.check_cache.invalidate_offices()
+                Finances.tax_service.invalidate_term()
+                new_mayor = await self.bot.delivery.get_user(new_mayor_id)
+                new_comp = await self.bot.delivery.get_user(new_comp_id)
 
-                await self.bot.announcement_channel.send(
+                self.bot.delivery.send(self.bot.announcement_channel,
                     f"Congratulations to our new mayor {new_mayor.mention} and "
                     f"comptroller {new_comp.mention}, who will be serving "
                     f"Aramithea for this week!")
@@ -82,7 +85,9 @@ class Offices(commands.Cog):
                 office_scheduler.run_pending()
                 await asyncio.sleep(office_scheduler.idle_seconds)
 
-        asyncio.ensure_future(schedule_office_updates())
+        # Only one process of a cluster holds the elections
+        if self.bot.is_primary:
+            asyncio.ensure_future(schedule_office_updates())
 
 
     # EVENTS
@@ -97,9 +102,9 @@ class Offices(commands.Cog):
         async with self.bot.db.acquire() as conn:
             comptroller_rec = await PlayerObject.get_comptroller(conn)
             mayor_rec = await PlayerObject.get_mayor(conn)
-            comptroller = await self.bot.fetch_user(
+            comptroller = await self.bot.delivery.get_user(
                 comptroller_rec['officeholder'])
-            mayor = await self.bot.fetch_user(mayor_rec['officeholder'])
+            mayor = await self.bot.delivery.get_user(mayor_rec['officeholder'])
             tax_info = await Finances.get_tax_info(conn)
 
         embed = discord.Embed(
@@ -157,9 +162,10 @@ class Offices(commands.Cog):
         """See which brotherhoods control the outlying areas of the map."""
         async with self.bot.db.acquire() as conn:
             # Tuple with area and the accompanying owner Association Object
+            controllers = await \
+                AssociationObject.territory_service.get_snapshot(conn)
             te_list = [
-                (area, await AssociationObject.get_territory_controller(
-                    conn, area))
+                (area, controllers.get(area) or AssociationObject.Association())
                 for area in Vars.TERRITORIES]
             
             embed = discord.Embed(
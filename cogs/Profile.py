@@ -25,11 +25,12 @@ class Profile(commands.Cog):
         """Loads and prints the player's profile."""
         await ctx.defer()
 
-        async with self.bot.db.acquire() as conn:
+        async with ctx.request.acquire() as conn:
             # Load information
-            profile = await PlayerObject.get_player_by_id(conn, player.id)
+            profile = await ctx.request.get_player(player.id)
             level, dist = profile.get_level(get_next=True)
-            pack = await profile.get_backpack(conn)
+            pack = profile.resources
+            Analytics.rank_service.sync_player(profile)
             gold_rank = Analytics.stringify_rank(
                 await Analytics.get_gold_rank(conn, player.id))
             gravitas_rank = Analytics.stringify_rank(
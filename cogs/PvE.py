@@ -9,7 +9,7 @@ import random
 import time
 from typing import Iterable, Tuple
 
-from Utilities import Checks, Vars, ItemObject
+from Utilities import Checks, Vars, ItemObject, PlayerObject
 from Utilities.Analytics import stringify_gains
 from Utilities.AyeshaBot import Ayesha
 from Utilities.Combat import Action, Belligerent, CombatEngine
@@ -90,8 +90,9 @@ class PvE(commands.Cog):
         ):
         """Fight an enemy for gold, xp, and items!"""
         # Create Belligerents
-        async with self.bot.db.acquire() as conn:
-            player = await Belligerent.CombatPlayer.from_id(conn, ctx.author.id)
+        player = Belligerent.CombatPlayer(await ctx.request.get_player())
+        # Don't hold a connection while the battle is being played
+        await ctx.request.release()
 
         if level > player.player.pve_limit:
             ctx.command.reset_cooldown(ctx)
@@ -176,8 +177,9 @@ class PvE(commands.Cog):
         # Process Game End; `results` will hold last turn info
         victor = engine.get_victor()
 
-        async with self.bot.db.acquire() as conn:
-            armor = accessory = weapon = None
+        # Rewards are staged and written together once they are known
+        rewards = PlayerObject.PlayerUpdate(player.player)
+        async with ctx.request.acquire() as conn:
             if isinstance(victor, Belligerent.CombatPlayer):  # Victory condition
                 victory = True
                 gold = self.gold(level)
@@ -185,34 +187,32 @@ class PvE(commands.Cog):
 
                 armor_type, accessory_type = self.level2items(level)
                 if random.randint(1, 15) == 1:
-                    armor = await ItemObject.create_armor(
-                        conn=conn,
+                    rewards.add_item("armor", ItemObject.create_armor,
                         user_id=player.player.disc_id,
                         type=random.choice(("Helmet", "Bodypiece", "Boots")),
                         material=armor_type
                     )
                 if random.randint(1, 20) == 1:
-                    accessory = await ItemObject.create_accessory(
-                        conn=conn,
+                    rewards.add_item("accessory", ItemObject.create_accessory,
                         user_id=player.player.disc_id,
                         type=accessory_type,
                         prefix=random.choice(list(Vars.ACCESSORY_BONUS))
                     )
                 if random.randint(1, 10) == 1 or player.occupation == "Merchant":
                     if level <= 30:
-                        weapon = await ItemObject.create_weapon(
-                            conn, player.player.disc_id)
+                        rewards.add_item("weapon", ItemObject.create_weapon,
+                            player.player.disc_id)
                     elif level <= 50:
                         attack = random.randint(120, 140)
                         crit_rate = random.randint(10, 20)
-                        weapon = await ItemObject.create_weapon(
-                            conn, player.player.disc_id, attack, crit_rate
+                        rewards.add_item("weapon", ItemObject.create_weapon,
+                            player.player.disc_id, attack, crit_rate
                         )
                     else:
                         attack = random.randint(130, 150)
                         crit_rate = random.randint(15, 20)
-                        weapon = await ItemObject.create_weapon(
-                            conn, player.player.disc_id, attack, crit_rate
+                        rewards.add_item("weapon", ItemObject.create_weapon,
+                            player.player.disc_id, attack, crit_rate
                         )
 
                 title = f"You have defeated {boss.name}!"
@@ -256,7 +256,7 @@ class PvE(commands.Cog):
                 gold_bonus_sources.append((bonus, "Lucky Accessory"))
             if player.accessory.prefix == "Old" and level >= 25 and victory:
                 gravitas = Vars.ACCESSORY_BONUS["Old"][player.accessory.type]
-                await player.player.give_gravitas(conn, gravitas)
+                rewards.give_gravitas(gravitas)
             try: # 20% booster for 30 minutes after voting for bot
                 if int(time.time()) < self.bot.recent_voters[player.player.disc_id]:
                     bonus = xp // 5
@@ -270,9 +270,20 @@ class PvE(commands.Cog):
             gold += gold_bonus
             xp += xp_bonus
 
-            await player.player.give_gold(conn, gold)
-            await player.player.check_xp_increase(conn, ctx, xp)
-            await player.player.log_pve(conn, victory)
+            rewards.give_gold(gold)
+            rewards.give_xp(xp)
+            rewards.log_pve(victory)
+            unlocked = level == player.player.pve_limit and victory
+            if unlocked:
+                rewards.increment("pve_limit")
+            await rewards.flush(conn)
+
+            level_up = rewards.get_level_up_embed()
+            if level_up is not None:
+                await ctx.respond(embed=level_up)
+            weapon = rewards.items.get("weapon")
+            armor = rewards.items.get("armor")
+            accessory = rewards.items.get("accessory")
 
             # Create and send result embed
             gold_gains_str = stringify_gains("gold", gold, gold_bonus_sources)
@@ -305,8 +316,7 @@ class PvE(commands.Cog):
                         f"`{accessory.id}`: **{accessory.name}**"),
                     inline=False)
 
-            if level == player.player.pve_limit and victory:
-                await player.player.increment_pve_limit(conn)
+            if unlocked:
                 embed.set_footer(
                     text=f"You have unlocked PvE level {player.player.pve_limit}.")
 
@@ -216,18 +216,16 @@ class PvP(commands.Cog):
                 "Not enough people joined the tournament.")
 
         async with self.bot.db.acquire() as conn:
+            # Load every entrant at once; those without a character are left out
+            users = {user.id : user for user in view.players}
             players = [] # List of dicts containing User, Player, Belligerent
-            for user in view.players:
-                try:
-                    player = await PlayerObject.get_player_by_id(conn, user.id)
-                    p_dict = { # These dicts are bloated  
-                        "User" : user, # Should be removed
-                        "Player" : player,
-                        "Belligerent" : None
-                    }
-                    players.append(p_dict)
-                except Checks.PlayerHasNoChar:
-                    continue
+            for player in await PlayerObject.get_players_by_ids(conn, users):
+                p_dict = { # These dicts are bloated  
+                    "User" : users[player.disc_id], # Should be removed
+                    "Player" : player,
+                    "Belligerent" : None
+                }
+                players.append(p_dict)
 
             # Add fake players until some number 2^n is hit
             n = 1
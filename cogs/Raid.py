@@ -61,7 +61,7 @@ class Raid(commands.Cog):
         await ctx.respond((
             f"Your attack dealt **{damage}** damage to the "
             f"**{self.raid_info['Enemy']}**."))
-        await self.bot.announcement_channel.send((
+        self.bot.delivery.send(self.bot.announcement_channel, (
             f"**{ctx.author.name}#{ctx.author.discriminator}** dealt "
             f"**{damage}** attack, for a total of "
             f"**{self.raid_participants[ctx.author.id]}** damage this "
@@ -1,7 +1,7 @@
 import discord
 from discord import Option
 
-from discord.ext import commands, pages, tasks
+from discord.ext import commands, pages
 
 import asyncio
 import time
@@ -9,6 +9,7 @@ from datetime import timedelta
 
 from Utilities import Vars
 from Utilities.AyeshaBot import Ayesha
+from Utilities.Scheduler import ReminderScheduler
 
 
 class Reminders(commands.Cog):
@@ -16,43 +17,30 @@ class Reminders(commands.Cog):
 
     def __init__(self, bot : Ayesha):
         self.bot = bot
+        self.scheduler = ReminderScheduler(bot.db, self.send_reminder)
 
-    @tasks.loop(seconds=15.0)
-    async def check_for_reminders(self):
-        # Every 15 seconds, get every reminder that has passed
-        now = int(time.time())
-        psql = """
-                DELETE FROM reminders
-                WHERE endtime <= $1
-                RETURNING starttime, user_id, content;
-                """
-        async with self.bot.db.acquire() as conn:
-            reminders = await conn.fetch(psql, now)
-
-        # DM each reminder
-        for reminder in reminders:
-            # Get the person in question
-            user = await self.bot.fetch_user(reminder['user_id'])
-
-            # Create a string telling them the time passed
-            elapsed_time = now - reminder['starttime']
-            delta = timedelta(seconds=elapsed_time)
-            days = f"0{delta.days}" if delta.days < 10 else str(delta.days)
-            short_elapsed = time.gmtime(elapsed_time % 86400)
-            time_str = days + ":" + time.strftime("%H:%M:%S", short_elapsed)
-
-            # Send a DM
-            if not user.dm_channel:
-                await user.create_dm()
-            await user.send((
-                f"`{time_str}` ago, you wanted to be reminded of:\n"
-                f"{reminder['content']}"))
+    def cog_unload(self):
+        self.scheduler.stop()
+
+    async def send_reminder(self, reminder):
+        """DM a reminder that has come due to the person who set it."""
+        # Create a string telling them the time passed
+        elapsed_time = reminder['endtime'] - reminder['starttime']
+        delta = timedelta(seconds=elapsed_time)
+        days = f"0{delta.days}" if delta.days < 10 else str(delta.days)
+        short_elapsed = time.gmtime(elapsed_time % 86400)
+        time_str = days + ":" + time.strftime("%H:%M:%S", short_elapsed)
+
+        # Send a DM
+        self.bot.delivery.dm(reminder['user_id'], (
+            f"`{time_str}` ago, you wanted to be reminded of:\n"
+            f"{reminder['content']}"))
 
     
     # EVENTS
     @commands.Cog.listener()
     async def on_ready(self):
-        self.check_for_reminders.start()
+        self.scheduler.start()
         print("Reminders is ready.")
 
     # AUXILIARY FUNCTIONS
@@ -149,10 +137,13 @@ class Reminders(commands.Cog):
         psql = """
                 INSERT INTO reminders 
                     (starttime, endtime, user_id, content)
-                VALUES ($1, $2, $3, $4);
+                VALUES ($1, $2, $3, $4)
+                RETURNING id, starttime, endtime, user_id, content;
                 """
         async with self.bot.db.acquire() as conn:
-            await conn.execute(psql, starttime, endtime, ctx.author.id, content)
+            reminder = await conn.fetchrow(
+                psql, starttime, endtime, ctx.author.id, content)
+        self.scheduler.add(reminder)
 
     @r.command(name="list", )
     async def _list(self, ctx):
@@ -169,19 +169,24 @@ class Travel(commands.Cog):
                     gold_bonus = int(gold * (mult / 100.0))
                     gold += gold_bonus
                     gold_bonus_sources.append((gold_bonus, "Lucky Accessory"))
+                update = PlayerObject.PlayerUpdate(player)
                 if rewards['weapon'] >= random.randint(1,100):
-                    new_weapon = await ItemObject.create_weapon(
-                        conn=conn,
+                    update.add_item("weapon", ItemObject.create_weapon,
                         user_id=player.disc_id)
-                else:
-                    new_weapon = ItemObject.Weapon()
+                update.give_gold(gold)
+                update.give_xp(xp)
+                update.set_location(player.destination)
+                update.set_adventure(None, None)
+                destination = player.destination
+                await update.flush(conn)
+                new_weapon = update.items.get("weapon", ItemObject.Weapon())
 
                 # Give the rewards
                 xp_gains_str = stringify_gains("xp", xp, xp_bonus_sources)
                 gold_gains_str = stringify_gains(
                     "gold", gold, gold_bonus_sources)
                 message = (
-                    f"You arrived at **{player.destination}**! On the way "
+                    f"You arrived at **{destination}**! On the way "
                     f"you earned {gold_gains_str} and {xp_gains_str}! ")
                 if not new_weapon.is_empty:
                     message += (
@@ -191,10 +196,9 @@ class Travel(commands.Cog):
                         f" and `{new_weapon.crit}` CRIT.")
                 # Sending this first so level-up messages come after
                 await ctx.respond(message) 
-                await player.give_gold(conn, gold)
-                await player.check_xp_increase(conn, ctx, xp)
-                await player.set_location(conn, player.destination)
-                await player.set_adventure(conn, None, None)
+                level_up = update.get_level_up_embed()
+                if level_up is not None:
+                    await ctx.respond(embed=level_up)
                 
             # EXPEDITION TYPE ADV IS OVER
             else: # End the expedition, nothing really matters for this one
@@ -566,8 +570,8 @@ class Travel(commands.Cog):
                 max_value=15,
                 default=1)):
         """Upgrade a weapon's ATK stat. Costs 10\*ATK iron and 40\*ATK gold."""
-        async with self.bot.db.acquire() as conn:
-            player = await PlayerObject.get_player_by_id(conn, ctx.author.id)
+        async with ctx.request.acquire() as conn:
+            player = await ctx.request.get_player()
             if player.location not in ("Aramithea", "Riverburn", "Thenuille"):
                 return await ctx.respond(
                     "You can only upgrade items in an urban center!")
@@ -592,48 +596,51 @@ class Travel(commands.Cog):
 
             purchase = await Transaction.calc_cost(conn, player, gold_cost)
 
-            # Prompt player to continue or cancel the operation
-            key = str(random.random())
-            self.bot.training_players[ctx.author.id] = key
-            view = LockedConfirmationMenu(ctx.author, key, timeout=15.0)
-            message = (
-                f"Upgrading your `{weapon.weapon_id}`: **{weapon.name}** "
-                f"{iter} {verb} to increase its AK to {weapon.attack + iter} "
-                f"will cost `{purchase.paying_price}` (`{purchase.tax_amount}` "
-                f"from taxes) gold and `{iron_cost}` iron.\n"
-                f"You currently have `{player.gold}` gold and "
-                f"`{player.resources['iron']}` iron. Proceed with the upgrade?"
-            )
-            interaction = await ctx.respond(message, view=view)
-            interaction.custom_id = key
-            await view.wait()
-            self.bot.training_players.pop(ctx.author.id)
-            if view.value is None:
-                return await interaction.edit_original_response(
-                    content="Timed out.", view=None)
-            elif not view.value:
-                return await interaction.edit_original_response(
-                    content="You cancelled the upgrade.", view=None)
-
-            if player.gold < purchase.paying_price:
-                await interaction.edit_original_response(view=None)
-                raise Checks.NotEnoughGold(purchase.paying_price, player.gold)
-            if player.resources["iron"] < iron_cost:
+        # Prompt player to continue or cancel the operation. Don't hold a 
+        # connection while they decide
+        await ctx.request.release()
+        key = str(random.random())
+        self.bot.training_players[ctx.author.id] = key
+        view = LockedConfirmationMenu(ctx.author, key, timeout=15.0)
+        message = (
+            f"Upgrading your `{weapon.weapon_id}`: **{weapon.name}** "
+            f"{iter} {verb} to increase its AK to {weapon.attack + iter} "
+            f"will cost `{purchase.paying_price}` (`{purchase.tax_amount}` "
+            f"from taxes) gold and `{iron_cost}` iron.\n"
+            f"You currently have `{player.gold}` gold and "
+            f"`{player.resources['iron']}` iron. Proceed with the upgrade?"
+        )
+        interaction = await ctx.respond(message, view=view)
+        interaction.custom_id = key
+        await view.wait()
+        self.bot.training_players.pop(ctx.author.id)
+        if view.value is None:
+            return await interaction.edit_original_response(
+                content="Timed out.", view=None)
+        elif not view.value:
+            return await interaction.edit_original_response(
+                content="You cancelled the upgrade.", view=None)
+
+        # If all else clears, upgrade the item. The weapon, gold and iron are 
+        # rechecked as they are spent, and nothing is spent if one falls short
+        async with ctx.request.acquire() as conn:
+            try:
+                async with conn.transaction():
+                    await weapon.upgrade_attack(
+                        conn, player.disc_id, weapon.attack + iter)
+                    await player.spend_resource(conn, "iron", iron_cost)
+                    print_tax = await purchase.log_purchase(conn)
+            except (Checks.ItemChanged, Checks.NotEnoughGold, 
+                    Checks.NotEnoughResources):
                 await interaction.edit_original_response(view=None)
-                raise Checks.NotEnoughResources(
-                    "iron", iron_cost, player.resources["iron"])
-
-            # If all else clears, upgrade the item
-            await weapon.set_attack(conn, weapon.attack + iter)
-            print_tax = await purchase.log_transaction(conn, "purchase")
-            message = (
-                f"You upgraded your `{weapon.weapon_id}`: **{weapon.name}** "
-                f"{iter} {verb} for `{purchase.paying_price}` gold and "
-                f"`{iron_cost}` iron, increasing its ATK to "
-                f"`{weapon.attack}`! {print_tax}")
-            await player.give_resource(conn, "iron", iron_cost*-1)
-            await interaction.edit_original_response(
-                content=message, view=None)
+                raise
+        message = (
+            f"You upgraded your `{weapon.weapon_id}`: **{weapon.name}** "
+            f"{iter} {verb} for `{purchase.paying_price}` gold and "
+            f"`{iron_cost}` iron, increasing its ATK to "
+            f"`{weapon.attack}`! {print_tax}")
+        await interaction.edit_original_response(
+            content=message, view=None)
 
 def setup(bot):
     bot.add_cog(Travel(bot))
\ No newline at end of file
@@ -22,13 +22,16 @@ class Vote_Handler:
         async def webserver():
             self.app = web.Application(loop = self.bot.loop)
             self.app.router.add_post('/vote', self.post_handler)
+            self.bot.metrics.add_routes(self.app)
             runner = web.AppRunner(self.app)
             await runner.setup()
             self.site = web.TCPSite(runner, '0.0.0.0', 8080)
             await self.bot.wait_until_ready()
             await self.site.start()
 
-        asyncio.ensure_future(webserver())
+        # Votes are received by one process of a cluster
+        if self.bot.is_primary:
+            asyncio.ensure_future(webserver())
 
         self.bot.vote_wbhook = Webhook.from_url(
             url=config.PWBHK, session=self.session)
@@ -39,21 +42,48 @@ class Vote_Handler:
         await self.bot.wait_until_ready()
         while not self.bot.is_closed():
             async with aiohttp.ClientSession() as client:
-                async with self.bot.db.acquire() as conn:
-                    await client.post(url=l,
-                        data = {
-                            "guilds" : len(self.bot.guilds),
-                            "users" : await PlayerObject.get_player_count(conn)
-                        },
-                        headers = {"Authorization" : config.DBL_TOKEN}
-                        )
+                if self.bot.cluster is None:
+                    async with self.bot.db.acquire() as conn:
+                        await client.post(url=l,
+                            data = {
+                                "guilds" : len(self.bot.guilds),
+                                "users" : await PlayerObject.get_player_count(
+                                    conn)
+                            },
+                            headers = {"Authorization" : config.DBL_TOKEN}
+                            )
                     await client.post(url=t,
                         data = {"server_count" : len(self.bot.guilds)},
                         headers = {"Authorization" : config.TOPGG_TOKEN})
+                else:
+                    await self.post_shard_stats(client, l, t)
                 # print(resp.status)
 
             await asyncio.sleep(1800)
 
+    async def post_shard_stats(self, client : aiohttp.ClientSession, 
+            l : str, t : str):
+        """Post each of this process's shards separately, since a process 
+        of a cluster only sees the guilds on its own shards. The lists add 
+        up the shards' stats, so the player count is sent with shard 0 only.
+        """
+        for shard_id in self.bot.shards:
+            guilds = sum(1 for guild in self.bot.guilds 
+                if guild.shard_id == shard_id)
+            data = {"guilds" : guilds, "shard_id" : shard_id}
+            if shard_id == 0:
+                async with self.bot.db.acquire() as conn:
+                    data["users"] = await PlayerObject.get_player_count(conn)
+            await client.post(url=l, data = data,
+                headers = {"Authorization" : config.DBL_TOKEN})
+            await client.post(url=t,
+                data = {
+                    "server_count" : guilds,
+                    "shard_id" : shard_id,
+                    "shard_count" : self.bot.shard_count
+                },
+                headers = {"Authorization" : config.TOPGG_TOKEN})
+
     async def post_handler(self, request: web.Request):
         auth = request.headers.get('Authorization')
         if f"dbl_{config.WBHKS}" != auth:
@@ -0,0 +1,176 @@
+"""Tests for the cluster supervisor. Workers are stand-ins for `run_worker`
+that report themselves connected, so no gateway or database is needed.
+
+Run with `python -m pytest tests` from the repository root.
+"""
+import aiohttp
+
+import asyncio
+import os
+import queue
+import socket
+import time
+import types
+
+from Utilities import Cluster
+from Utilities.Cluster import Supervisor, plan_clusters
+
+
+def stub_worker(spec : Cluster.ClusterSpec, reports):
+    """Report the worker ready, with ten guilds per shard, until killed."""
+    while True:
+        reports.put({
+            "cluster_id" : spec.cluster_id,
+            "pid" : os.getpid(),
+            "ready" : True,
+            "shards" : len(spec.shard_ids),
+            "guilds" : 10 * len(spec.shard_ids)
+        })
+        time.sleep(0.1)
+
+
+class FakeProcess:
+    """Stands in for a worker's multiprocessing.Process."""
+    def __init__(self, pid : int, alive : bool):
+        self.pid = pid
+        self.alive = alive
+        self.exitcode = None if alive else 1
+
+    def is_alive(self) -> bool:
+        return self.alive
+
+    def kill(self):
+        self.alive = False
+        self.exitcode = -9
+
+
+def make_supervisor(monkeypatch, alive : bool) -> tuple:
+    """Returns a supervisor of one worker whose processes are FakeProcesses
+    and whose clock is the returned list's only item.
+    """
+    clock = [1000.0]
+    monkeypatch.setattr(Cluster, "time",
+        types.SimpleNamespace(monotonic=lambda : clock[0]))
+    supervisor = Supervisor(plan_clusters(["cogs.Misc"], 1, 1), port=None)
+    supervisor._reports = queue.Queue()
+
+    def start(worker):
+        worker.process = FakeProcess(worker.restarts + 1, alive)
+        worker.started_at = clock[0]
+        worker.health = None
+        worker.last_report = None
+    monkeypatch.setattr(supervisor, "_start", start)
+    start(supervisor.workers[0])
+    return supervisor, clock
+
+
+def test_restart_delay_doubles_until_ready(monkeypatch):
+    supervisor, clock = make_supervisor(monkeypatch, alive=False)
+    worker = supervisor.workers[0]
+
+    delays = []
+    for _ in range(9):
+        supervisor.poll() # Finds the process has exited
+        assert worker.process is None
+        delays.append(worker.restart_at - clock[0])
+        clock[0] = worker.restart_at - 0.1
+        supervisor.poll() # Too early to restart
+        assert worker.process is None
+        clock[0] += 0.1
+        supervisor.poll()
+        assert worker.process is not None
+    assert delays == [min(Cluster.MAX_RESTART_DELAY,
+        Cluster.RESTART_DELAY * 2**i) for i in range(9)]
+    assert worker.restarts == 9
+
+    # Connecting resets the delay
+    supervisor._reports.put(
+        {"cluster_id" : 0, "pid" : worker.process.pid, "ready" : True})
+    supervisor.poll()
+    assert worker.restart_at - clock[0] == Cluster.RESTART_DELAY
+
+
+def test_silent_worker_is_killed(monkeypatch):
+    supervisor, clock = make_supervisor(monkeypatch, alive=True)
+    worker = supervisor.workers[0]
+    supervisor._reports.put(
+        {"cluster_id" : 0, "pid" : worker.process.pid, "ready" : True})
+    supervisor.poll()
+    assert worker.ready
+
+    # Reports from a process that has been replaced are ignored
+    clock[0] += Cluster.HEALTH_TIMEOUT
+    supervisor._reports.put(
+        {"cluster_id" : 0, "pid" : worker.process.pid + 1, "ready" : True})
+    supervisor.poll()
+    assert worker.process.is_alive()
+
+    clock[0] += 1
+    supervisor.poll()
+    assert not worker.process.is_alive()
+    supervisor.poll()
+    assert worker.process is None and not worker.ready
+
+
+def get_free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def wait_for(condition, timeout : float = 60):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out"
+        await asyncio.sleep(0.1)
+
+
+def test_killed_worker_is_restarted(monkeypatch):
+    monkeypatch.setattr(Cluster, "RESTART_DELAY", 3)
+    port = get_free_port()
+    supervisor = Supervisor(plan_clusters(["cogs.Misc"], 2, 4),
+        target=stub_worker, port=port)
+    workers = supervisor.workers.values()
+
+    async def get_health():
+        async with aiohttp.ClientSession() as session:
+            async with session.get(
+                    f"http://127.0.0.1:{port}/health") as resp:
+                return resp.status, await resp.json()
+
+    async def scenario():
+        task = asyncio.create_task(supervisor.main())
+        try:
+            await wait_for(lambda : all(worker.ready for worker in workers))
+            status, health = await get_health()
+            assert status == 200
+            assert health["status"] == "ok"
+            assert health["workers_ready"] == 2
+            assert health["guilds"] == 40
+            assert [c["shards"] for c in health["clusters"]] \
+                == [[0, 1], [2, 3]]
+
+            victim = supervisor.workers[1]
+            pid = victim.process.pid
+            victim.process.kill()
+            await wait_for(lambda : victim.process is None)
+            status, health = await get_health()
+            assert status == 503
+            assert health["status"] == "degraded"
+            assert health["workers_ready"] == 1
+            assert health["clusters"][1]["pid"] is None
+            assert not health["clusters"][1]["alive"]
+
+            await wait_for(lambda : victim.ready)
+            assert victim.process.pid != pid
+            assert victim.restarts == 1
+            status, health = await get_health()
+            assert status == 200
+            assert health["clusters"][1]["restarts"] == 1
+            assert health["clusters"][0]["restarts"] == 0
+        finally:
+            supervisor.stop()
+            await task
+        assert not any(worker.process.is_alive() for worker in workers)
+
+    asyncio.run(scenario())
@@ -0,0 +1,324 @@
+"""Query plan regression tests for the indexes in Database/Migrations.
+
+Loads Main-Schema.sql and the migrations into a scratch database, seeds it
+with synthetic players and their items, acolytes, reminders and history,
+and checks with EXPLAIN that each hot query is served by the index meant
+for it rather than a sequential scan.
+
+These need a Postgres server on which the test user can create databases.
+Set AYESHA_TEST_DSN to its DSN, e.g.
+
+    AYESHA_TEST_DSN=postgresql://postgres@localhost/postgres \\
+        python -m pytest tests/test_query_plans.py
+
+AYESHA_TEST_PLAYERS sets the number of players seeded, by default 1M. The
+other tables are sized from it. Much smaller datasets may let the planner
+prefer sequential scans legitimately.
+"""
+import asyncpg
+import pytest
+
+import asyncio
+import json
+import os
+import re
+import time
+from typing import Dict, List, Optional
+
+from Utilities.PlayerObject import _PLAYER_GRAPH_QUERY
+
+DSN = os.environ.get("AYESHA_TEST_DSN")
+PLAYERS = int(os.environ.get("AYESHA_TEST_PLAYERS", 1000000))
+TEST_DATABASE = "ayesha_query_plans"
+DATABASE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Database")
+MAIN_MIGRATIONS = ["001-Lookup-Indexes.sql"]
+
+FIRST_USER_ID = 10**17
+USER_ID = FIRST_USER_ID + PLAYERS // 2 # A player in the middle of the table
+
+pytestmark = pytest.mark.skipif(
+    DSN is None, reason="Set AYESHA_TEST_DSN to run query plan tests.")
+
+SEED = """
+        INSERT INTO associations (assc_id, assc_name, assc_type, leader_id,
+            assc_icon, base)
+        SELECT g, 'Association ' || g, 'Guild', {first_user_id} + g, '',
+            'Aramithea'
+        FROM generate_series(1, {associations}) g;
+
+        INSERT INTO players (num, user_id, user_name, xp, gold, gravitas,
+            pvpwins, bosswins, pve_limit, assc, guild_rank, equipped_item)
+        SELECT g, {first_user_id} + g, 'Player ' || g,
+            (random() * 10^6)::int, (random() * 10^5)::int,
+            (random() * 1000)::int, (random() * 100)::int,
+            (random() * 100)::int, 25 + (random() * 75)::int,
+            CASE WHEN random() < 0.3
+                THEN 1 + (random() * ({associations} - 1))::int END,
+            'Member', 3 * g - 2
+        FROM generate_series(1, {players}) g;
+
+        INSERT INTO equips (user_id, helmet, bodypiece, boots, accessory)
+        SELECT {first_user_id} + g, 3 * g - 2, 3 * g - 1, 3 * g, g
+        FROM generate_series(1, {players}) g;
+
+        INSERT INTO items (item_id, weapontype, user_id, attack, crit,
+            weapon_name)
+        SELECT g, 'Spear', {first_user_id} + (g + 2) / 3,
+            10 + (random() * 140)::int, (random() * 20)::int, 'Spear'
+        FROM generate_series(1, 3 * {players}) g;
+
+        INSERT INTO armor (armor_id, armor_type, armor_slot, user_id)
+        SELECT g, 'Wool', (ARRAY['Helmet', 'Bodypiece', 'Boots'])[g % 3 + 1],
+            {first_user_id} + (g + 2) / 3
+        FROM generate_series(1, 3 * {players}) g;
+
+        INSERT INTO accessories (accessory_id, accessory_type,
+            accessory_name, user_id, prefix)
+        SELECT g, 'Wood', 'Lucky Wood Ring', {first_user_id} + g, 'Lucky'
+        FROM generate_series(1, {players}) g;
+
+        INSERT INTO acolytes (acolyte_id, user_id, acolyte_name)
+        SELECT g, {first_user_id} + (g + 1) / 2,
+            (ARRAY['Ajar', 'Aulus'])[g % 2 + 1]
+        FROM generate_series(1, 2 * {players}) g;
+
+        -- Two elections a week for ten years, the newest last
+        INSERT INTO officeholders (id, officeholder, office, setdate)
+        SELECT g, {first_user_id} + 1 + (random() * ({players} - 1))::int,
+            (ARRAY['Mayor', 'Comptroller'])[g % 2 + 1],
+            CURRENT_DATE - 7 * ((1040 - g) / 2)
+        FROM generate_series(1, 1040) g;
+
+        INSERT INTO area_control (id, area, owner, reign_begin)
+        SELECT g, 'Area ' || g % 15, 1 + g % {associations},
+            now() - (20000 - g) * interval '3 hours'
+        FROM generate_series(1, 20000) g;
+
+        -- Some areas are attacked far more than others; Area 14 least
+        INSERT INTO area_attacks (id, area, attacker, defender, winner,
+            battle_date)
+        SELECT g, 'Area ' || floor(15 * random()^4)::int, 1, 2, 1,
+            now() - (100000 - g) * interval '10 minutes'
+        FROM generate_series(1, 100000) g;
+
+        -- A year of taxes, the newest last
+        INSERT INTO tax_transactions (id, "time", user_id, before_tax,
+            tax_amount, tax_rate)
+        SELECT g, now() - (2 * {players} - g) * interval '15 seconds',
+            {first_user_id} + 1 + (random() * ({players} - 1))::int,
+            1000, 50, 0.05
+        FROM generate_series(1, 2 * {players}) g;
+
+        -- Reminders spread over the next three months
+        INSERT INTO reminders (id, starttime, endtime, user_id, content)
+        SELECT g, extract(epoch FROM now())::bigint,
+            extract(epoch FROM now())::bigint + (random() * 7776000)::int,
+            {first_user_id} + 1 + (random() * ({players} - 1))::int,
+            'Reminder'
+        FROM generate_series(1, {players} / 5) g;
+
+        ANALYZE;
+        """
+
+# Each hot query as the code runs it, its arguments, and the indexes that
+# must appear in its plan. A tuple lists indexes that serve equally well.
+# The two offices alternate, so walking officeholders' primary key
+# backwards finds the newest of either within a couple of rows.
+CASES = {
+    "player by id" : (
+        _PLAYER_GRAPH_QUERY + "WHERE players.user_id = $1;",
+        lambda : [USER_ID], ["Players_user_id_key"]),
+    "check cache player" : ("""
+        SELECT players.user_id, players.adventure,
+            players.destination, players.assc, players.guild_rank,
+            associations.assc_type
+        FROM players
+        LEFT JOIN associations
+            ON players.assc = associations.assc_id
+        WHERE players.user_id = $1;
+        """, lambda : [USER_ID], ["Players_user_id_key"]),
+    "weapon inventory" : ("""
+        SELECT item_id, weapontype, user_id, attack, crit, weapon_name,
+            (
+                item_id = (
+                    SELECT equipped_item
+                    FROM players
+                    WHERE user_id = $1
+                )
+            )
+            AS equipped
+        FROM items
+        WHERE user_id = $1
+        ORDER BY equipped DESC, attack DESC;
+        """, lambda : [USER_ID], ["items_user_id_idx"]),
+    "weapon ownership" : ("""
+        SELECT item_id FROM items
+        WHERE user_id = $1 AND item_id = $2;
+        """, lambda : [USER_ID, 3 * (PLAYERS // 2)], ["Items_pkey"]),
+    "armor inventory" : ("""
+        WITH helmet AS (SELECT helmet FROM equips WHERE user_id = $1),
+        bodypiece AS (SELECT bodypiece FROM equips WHERE user_id = $1),
+        boots AS (SELECT boots FROM equips WHERE user_id = $1)
+        SELECT armor_id, armor_type, armor_slot,
+            CASE
+                WHEN armor_slot = 'Helmet'
+                THEN armor_id = (SELECT * FROM helmet)
+                ELSE CASE
+                    WHEN armor_slot = 'Bodypiece'
+                    THEN armor_id = (SELECT * FROM bodypiece)
+                    ELSE CASE
+                        WHEN armor_slot = 'Boots'
+                        THEN armor_id = (SELECT * FROM boots)
+                        ELSE false
+                    END
+                END
+            END
+            AS equipped
+        FROM armor
+        WHERE user_id = $1
+        ORDER BY equipped DESC, armor_id DESC;
+        """, lambda : [USER_ID], ["armor_user_id_idx"]),
+    "accessory inventory" : ("""
+        SELECT
+            accessories.accessory_id, accessories.accessory_type,
+            accessories.accessory_name, accessories.user_id,
+            accessories.prefix,
+            COALESCE(accessories.accessory_id = equips.accessory, false)
+            AS equipped
+        FROM accessories
+        LEFT JOIN equips
+            ON equips.user_id = accessories.user_id
+        WHERE accessories.user_id = $1
+            AND ($2::TEXT IS NULL OR accessories.prefix = $2)
+            AND ($3::TEXT IS NULL OR accessories.accessory_type = $3)
+        ORDER BY equipped DESC, accessories.accessory_id DESC;
+        """, lambda : [USER_ID, None, None], ["accessories_user_id_idx"]),
+    "owned acolyte" : ("""
+        SELECT acolyte_id, user_id, acolyte_name, copies
+        FROM acolytes
+        WHERE user_id = $1 AND acolyte_name = $2;
+        """, lambda : [USER_ID, "Ajar"],
+        ["acolytes_user_id_acolyte_name_key"]),
+    "tavern" : ("""
+        SELECT acolyte_id, user_id, acolyte_name, copies
+        FROM acolytes
+        WHERE user_id = $1
+        ORDER BY acolyte_name;
+        """, lambda : [USER_ID], ["acolytes_user_id_acolyte_name_key"]),
+    "association members" : ("""
+        SELECT user_id
+        FROM players
+        WHERE assc = $1;
+        """, lambda : [1], ["players_assc_idx"]),
+    "current mayor" : ("""
+        SELECT officeholders.officeholder, players.user_name
+        FROM officeholders
+        INNER JOIN players
+            ON officeholders.officeholder = players.user_id
+        WHERE office = 'Mayor'
+        ORDER BY id DESC
+        LIMIT 1;
+        """, lambda : [],
+        [("officeholders_office_id_idx", "officeholders_pkey")]),
+    "taxes collected" : ("""
+        WITH start_date AS (
+            SELECT setdate
+            FROM officeholders
+            WHERE office = 'Mayor'
+            ORDER BY id DESC
+            LIMIT 1
+        )
+        SELECT SUM(tax_amount)
+        FROM tax_transactions
+        WHERE time > (SELECT * FROM start_date);
+        """, lambda : [],
+        [("officeholders_office_id_idx", "officeholders_pkey"),
+            "tax_transactions_time_idx"]),
+    "last area attack" : ("""
+        SELECT battle_date
+        FROM area_attacks
+        WHERE area = $1
+        ORDER BY id DESC
+        LIMIT 1;
+        """, lambda : ["Area 14"], ["area_attacks_area_id_idx"]),
+    "reminder refill" : ("""
+        SELECT id, starttime, endtime, user_id, content
+        FROM reminders
+        WHERE endtime <= $1;
+        """, lambda : [int(time.time()) + 3600], ["reminders_endtime_idx"]),
+    "reminder list" : ("""
+        SELECT id, starttime, endtime, user_id, content
+        FROM reminders
+        WHERE user_id = $1
+        ORDER BY endtime;
+        """, lambda : [USER_ID], ["reminders_user_id_endtime_idx"])
+}
+
+
+def walk(plan : dict) -> List[dict]:
+    """Returns every node of a JSON plan."""
+    nodes = [plan]
+    for child in plan.get("Plans", []):
+        nodes.extend(walk(child))
+    return nodes
+
+
+async def run_script(filename : str):
+    """Run a SQL file over a connection of its own, since pg_dump's output
+    changes settings such as the search_path. Changes of owner are skipped,
+    so the production roles need not exist.
+    """
+    with open(os.path.join(DATABASE_DIR, filename)) as f:
+        script = re.sub(r"(?m)^ALTER .* OWNER TO .*;$", "", f.read())
+    conn = await asyncpg.connect(DSN, database=TEST_DATABASE)
+    try:
+        await conn.execute(script)
+    finally:
+        await conn.close()
+
+
+async def collect_plans() -> Dict[str, dict]:
+    admin = await asyncpg.connect(DSN)
+    try:
+        await admin.execute(f"DROP DATABASE IF EXISTS {TEST_DATABASE};")
+        await admin.execute(f"CREATE DATABASE {TEST_DATABASE};")
+
+        await run_script("Main-Schema.sql")
+        for migration in MAIN_MIGRATIONS:
+            await run_script(os.path.join("Migrations", migration))
+
+        conn = await asyncpg.connect(DSN, database=TEST_DATABASE)
+        try:
+            await conn.execute(SEED.format(players=PLAYERS,
+                associations=max(2, PLAYERS // 50),
+                first_user_id=FIRST_USER_ID))
+            plans = {}
+            for name, (query, args, _) in CASES.items():
+                plan = await conn.fetchval(
+                    "EXPLAIN (FORMAT JSON) " + query, *args())
+                plans[name] = json.loads(plan)[0]["Plan"]
+            return plans
+        finally:
+            await conn.close()
+    finally:
+        await admin.execute(f"DROP DATABASE IF EXISTS {TEST_DATABASE};")
+        await admin.close()
+
+
+@pytest.fixture(scope="module")
+def plans() -> Optional[Dict[str, dict]]:
+    return asyncio.run(collect_plans())
+
+
+@pytest.mark.parametrize("name", list(CASES))
+def test_query_uses_index(plans, name):
+    nodes = walk(plans[name])
+    used = {node["Index Name"] for node in nodes if "Index Name" in node}
+    scanned = {node["Relation Name"] for node in nodes
+        if node["Node Type"] == "Seq Scan"}
+    for expected in CASES[name][2]:
+        options = {expected} if isinstance(expected, str) else set(expected)
+        assert used & options, (
+            f"{name} does not use {' or '.join(sorted(options))}; it uses "
+            f"{sorted(used)} and scans {sorted(scanned)}")